@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+CompOp ごとの合成スループット計測
+
+背景を塗った Image に半透明の矩形を画面全体へ繰り返し合成し、
+CompOp ごとの Mpix/s を Markdown の表で表示します。
+`--source image` を指定すると単色ではなく Pattern (画像) を合成します。
+
+    uv run python benchmarks/bench_comp_op.py
+    uv run python benchmarks/bench_comp_op.py --source image --thread-count 4
+"""
+
+import argparse
+import time
+
+from blend2d import CompOp, Context, ExtendMode, Gradient, Image, Pattern
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def make_source(width: int, height: int) -> Pattern:
+    src = Image(width, height)
+    gradient = Gradient()
+    gradient.create_linear(0, 0, width, height)
+    gradient.add_stop(0.0, 255, 0, 0, 200)
+    gradient.add_stop(1.0, 0, 0, 255, 120)
+    with Context(src) as ctx:
+        ctx.set_comp_op(CompOp.SRC_COPY)
+        ctx.set_fill_style_gradient(gradient)
+        ctx.fill_all()
+    pattern = Pattern()
+    pattern.create(src, ExtendMode.REPEAT)
+    return pattern
+
+
+def prepare(img: Image) -> None:
+    with Context(img) as ctx:
+        ctx.set_comp_op(CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(40, 120, 200, 220)
+        ctx.fill_all()
+
+
+def bench(
+    img: Image, op: CompOp, pattern: Pattern | None, thread_count: int, iterations: int
+) -> float:
+    width, height = img.width, img.height
+    prepare(img)
+    start = time.perf_counter()
+    with Context(img, thread_count=thread_count) as ctx:
+        ctx.set_comp_op(op)
+        if pattern is None:
+            ctx.set_fill_style_rgba(255, 160, 32, 160)
+        else:
+            ctx.set_fill_style_pattern(pattern)
+        for _ in range(iterations):
+            ctx.fill_rect(0, 0, width, height)
+    elapsed = time.perf_counter() - start
+    return width * height * iterations / elapsed / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CompOp ごとの合成スループット計測")
+    parser.add_argument(
+        "--resolution", choices=RESOLUTIONS.keys(), default="1080p", help="画像の解像度"
+    )
+    parser.add_argument("--iterations", type=int, default=50, help="CompOp ごとの合成回数")
+    parser.add_argument("--thread-count", type=int, default=0, help="Context のスレッド数")
+    parser.add_argument(
+        "--source", choices=("solid", "image"), default="solid", help="合成するソース"
+    )
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    img = Image(width, height)
+    pattern = make_source(256, 256) if args.source == "image" else None
+
+    print(
+        f"{args.resolution} ({width}x{height}), source={args.source}, "
+        f"thread_count={args.thread_count}, {args.iterations} iterations"
+    )
+    print()
+    print("| CompOp | Mpix/s |")
+    print("|--------|-------:|")
+    for op in CompOp:
+        mpix = bench(img, op, pattern, args.thread_count, args.iterations)
+        print(f"| {op.name} | {mpix:8.1f} |")
+
+
+if __name__ == "__main__":
+    main()
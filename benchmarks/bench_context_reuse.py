@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+フレームごとの Context 作成と Context の使い回しの比較
+
+1. フレームごとに `with Context(img, thread_count=N)` で Context を作成する
+2. 1 つの Context を `reset()` で使い回す
+
+描画内容は少量にして、フレームごとのセットアップコストの差が見えるようにしています。
+
+    uv run python benchmarks/bench_context_reuse.py
+    uv run python benchmarks/bench_context_reuse.py --thread-count 0
+"""
+
+import argparse
+import time
+
+from blend2d import CompOp, Context, Image
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def draw(ctx: Context, frame: int) -> None:
+    ctx.set_comp_op(CompOp.SRC_OVER)
+    ctx.set_fill_style_rgba(255, 128, 0, 200)
+    ctx.fill_rect(frame % 200, 10, 100, 100)
+
+
+def bench_new_context(img: Image, thread_count: int, frames: int) -> float:
+    start = time.perf_counter()
+    for frame in range(frames):
+        with Context(img, thread_count=thread_count) as ctx:
+            draw(ctx, frame)
+    return (time.perf_counter() - start) / frames
+
+
+def bench_reuse_context(img: Image, thread_count: int, frames: int) -> float:
+    ctx = Context(img, thread_count=thread_count)
+    start = time.perf_counter()
+    for frame in range(frames):
+        # reset() で前のフレームの描画完了を待ち、状態を初期化する
+        ctx.reset()
+        draw(ctx, frame)
+    ctx.end()
+    return (time.perf_counter() - start) / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Context の使い回しによるセットアップコストの比較")
+    parser.add_argument("--thread-count", type=int, default=4, help="Context の thread_count")
+    parser.add_argument("--frames", type=int, default=500, help="計測するフレーム数")
+    args = parser.parse_args()
+
+    print(f"thread_count={args.thread_count}, {args.frames} frames")
+    print()
+    print("| resolution | new Context (us/frame) | reset() (us/frame) | speedup |")
+    print("|------------|-----------------------:|-------------------:|--------:|")
+    for name, (width, height) in RESOLUTIONS.items():
+        img = Image(width, height)
+        new_ctx = bench_new_context(img, args.thread_count, args.frames)
+        reuse_ctx = bench_reuse_context(img, args.thread_count, args.frames)
+        print(
+            f"| {name:10s} | {new_ctx * 1e6:22.1f} | {reuse_ctx * 1e6:18.1f} "
+            f"| {new_ctx / reuse_ctx:6.2f}x |"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+RenderProfile.PREVIEW と RenderProfile.QUALITY の描画スループット比較
+
+examples/ のデモと同じ種類の描画 (グラデーション、パターン、曲線のパス) を
+1080p に拡大したシーンで、プロファイルごとの frames/sec を Markdown の表で表示します。
+
+- gradients: examples/animated_gradients.py の線形 / 放射状 / 円錐グラデーション
+- patterns: examples/pattern_demo.py のチェック柄パターンを回転して描画
+- paths: examples/path_drawing.py / examples/stroke_demo.py の曲線の塗りつぶしとストローク
+
+    uv run python benchmarks/bench_render_profile.py
+    uv run python benchmarks/bench_render_profile.py --thread-count 4
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from math import cos, pi, sin
+
+from blend2d import (
+    CompOp,
+    Context,
+    ExtendMode,
+    Gradient,
+    Image,
+    Path,
+    Pattern,
+    RenderProfile,
+)
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def make_checkerboard(size: int) -> Image:
+    img = Image(size, size)
+    half = size // 2
+    with Context(img) as ctx:
+        ctx.set_comp_op(CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(255, 100, 100)
+        ctx.fill_all()
+        ctx.set_fill_style_rgba(100, 100, 255)
+        ctx.fill_rect(0, 0, half, half)
+        ctx.fill_rect(half, half, half, half)
+    return img
+
+
+def draw_gradients(ctx: Context, frame: int) -> None:
+    angle = frame * 0.02
+    for i in range(12):
+        x = 160 + (i % 4) * 520
+        y = 180 + (i // 4) * 360
+        linear = Gradient()
+        linear.create_linear(x, y, x + cos(angle + i) * 200, y + sin(angle + i) * 200)
+        linear.add_stop(0.0, 255, 0, 0)
+        linear.add_stop(0.5, 0, 255, 0)
+        linear.add_stop(1.0, 0, 0, 255)
+        ctx.set_fill_style_gradient(linear)
+        ctx.fill_rect(x - 150, y - 150, 300, 300)
+
+        conic = Gradient()
+        conic.create_conic(x + 150, y, angle)
+        conic.add_stop(0.0, 255, 0, 0)
+        conic.add_stop(0.5, 0, 0, 255)
+        conic.add_stop(1.0, 255, 0, 0)
+        ctx.set_fill_style_gradient(conic)
+        ctx.fill_circle(x + 150, y, 120)
+
+    radial = Gradient()
+    radial.create_radial(WIDTH / 2, HEIGHT / 2, WIDTH / 2, HEIGHT / 2, 500)
+    radial.add_stop(0.0, 255, 255, 0, 160)
+    radial.add_stop(1.0, 255, 0, 255, 0)
+    ctx.set_fill_style_gradient(radial)
+    ctx.fill_all()
+
+
+def make_draw_patterns() -> Callable[[Context, int], None]:
+    pattern = Pattern()
+    pattern.create(make_checkerboard(64), ExtendMode.REPEAT)
+
+    def draw(ctx: Context, frame: int) -> None:
+        ctx.save()
+        ctx.translate(WIDTH / 2, HEIGHT / 2)
+        ctx.rotate(frame * 0.01)
+        ctx.set_fill_style_pattern(pattern)
+        ctx.fill_rect(-WIDTH, -HEIGHT, WIDTH * 2, HEIGHT * 2)
+        ctx.restore()
+
+    return draw
+
+
+def make_draw_paths() -> Callable[[Context, int], None]:
+    paths = []
+    for i in range(40):
+        cx = 120 + (i % 8) * 240
+        cy = 140 + (i // 8) * 200
+        path = Path()
+        path.move_to(cx - 100, cy)
+        path.cubic_to(cx - 60, cy - 120, cx + 60, cy + 120, cx + 100, cy)
+        path.quad_to(cx, cy + 160, cx - 100, cy)
+        path.close()
+        paths.append(path)
+
+    def draw(ctx: Context, frame: int) -> None:
+        ctx.set_stroke_width(6)
+        for i, path in enumerate(paths):
+            ctx.save()
+            ctx.rotate((frame + i) * 0.001)
+            ctx.set_fill_style_rgba(100 + i * 3, 255 - i * 4, 100, 200)
+            ctx.fill_path(path)
+            ctx.set_stroke_style_rgba(255, 255, 255, 180)
+            ctx.stroke_path(path)
+            ctx.restore()
+        ctx.set_fill_style_rgba(255, 220, 0)
+        for i in range(200):
+            angle = i * pi / 100
+            ctx.fill_circle(WIDTH / 2 + cos(angle) * 450, HEIGHT / 2 + sin(angle) * 450, 12)
+
+    return draw
+
+
+def bench(
+    draw: Callable[[Context, int], None],
+    profile: RenderProfile,
+    thread_count: int,
+    frames: int,
+) -> float:
+    img = Image(WIDTH, HEIGHT)
+    ctx = Context(img, thread_count=thread_count)
+    ctx.set_profile(profile)
+    start = time.perf_counter()
+    for frame in range(frames):
+        ctx.reset()
+        ctx.set_comp_op(CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(16, 16, 16)
+        ctx.fill_all()
+        ctx.set_comp_op(CompOp.SRC_OVER)
+        draw(ctx, frame)
+    ctx.end()
+    return frames / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RenderProfile ごとの描画スループット比較")
+    parser.add_argument("--frames", type=int, default=60, help="シーンごとの描画フレーム数")
+    parser.add_argument("--thread-count", type=int, default=0, help="Context のスレッド数")
+    args = parser.parse_args()
+
+    scenes = {
+        "gradients": draw_gradients,
+        "patterns": make_draw_patterns(),
+        "paths": make_draw_paths(),
+    }
+
+    print(f"{WIDTH}x{HEIGHT}, thread_count={args.thread_count}, {args.frames} frames")
+    print()
+    print("| scene | QUALITY fps | PREVIEW fps | speedup |")
+    print("|-------|------------:|------------:|--------:|")
+    for name, draw in scenes.items():
+        quality = bench(draw, RenderProfile.QUALITY, args.thread_count, args.frames)
+        preview = bench(draw, RenderProfile.PREVIEW, args.thread_count, args.frames)
+        print(f"| {name} | {quality:11.1f} | {preview:11.1f} | {preview / quality:6.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
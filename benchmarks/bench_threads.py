@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Python スレッド数ごとの描画スループット計測
+
+各スレッドが専用の Image / Context で 1080p のフレームを描画し、
+全スレッド合計の frames/sec を表示します。
+描画メソッドは GIL を解放するため、GIL 有効ビルドでもスレッド数に応じてスループットが伸びます。
+
+GIL 有効ビルドと Free-Threading ビルドの両方で実行して比較します。
+
+    uv run python benchmarks/bench_threads.py
+    uv run --python 3.14t python benchmarks/bench_threads.py
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from math import cos, pi, sin
+
+from blend2d import CompOp, Context, Image, Path
+
+
+def make_star_path(cx: float, cy: float, r: float) -> Path:
+    path = Path()
+    for i in range(10):
+        angle = i * pi / 5
+        radius = r if i % 2 == 0 else r * 0.4
+        x = cx + radius * cos(angle)
+        y = cy + radius * sin(angle)
+        if i == 0:
+            path.move_to(x, y)
+        else:
+            path.line_to(x, y)
+    path.close()
+    return path
+
+
+def render_frame(ctx: Context, width: int, height: int, frame: int, star: Path) -> None:
+    ctx.set_comp_op(CompOp.SRC_COPY)
+    ctx.set_fill_style_rgba(16, 16, 16, 255)
+    ctx.fill_all()
+
+    ctx.set_comp_op(CompOp.SRC_OVER)
+    for i in range(64):
+        x = (i * 97 + frame * 7) % width
+        y = (i * 53 + frame * 3) % height
+        ctx.set_fill_style_rgba((i * 37) % 256, (i * 91) % 256, (i * 13) % 256, 160)
+        ctx.fill_circle(x, y, 80)
+        ctx.fill_rect(width - x, height - y, 160, 90)
+
+    ctx.set_fill_style_rgba(255, 220, 0, 200)
+    ctx.fill_path(star)
+
+
+def worker(width: int, height: int, frames: int, barrier: threading.Barrier) -> None:
+    img = Image(width, height)
+    star = make_star_path(width / 2, height / 2, min(width, height) * 0.4)
+    barrier.wait()
+    for frame in range(frames):
+        with Context(img) as ctx:
+            render_frame(ctx, width, height, frame, star)
+
+
+def run(num_threads: int, width: int, height: int, frames: int) -> float:
+    barrier = threading.Barrier(num_threads + 1)
+    threads = [
+        threading.Thread(target=worker, args=(width, height, frames, barrier))
+        for _ in range(num_threads)
+    ]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return num_threads * frames / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Python スレッド数ごとの描画スループット計測")
+    parser.add_argument("--width", type=int, default=1920, help="画像の幅")
+    parser.add_argument("--height", type=int, default=1080, help="画像の高さ")
+    parser.add_argument("--frames", type=int, default=60, help="スレッドごとの描画フレーム数")
+    parser.add_argument(
+        "--max-threads", type=int, default=os.cpu_count() or 4, help="計測する最大スレッド数"
+    )
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]} (GIL {'enabled' if gil_enabled else 'disabled'})")
+    print(f"{args.width}x{args.height}, {args.frames} frames/thread")
+    print()
+    print("| threads | frames/sec | speedup |")
+    print("|--------:|-----------:|--------:|")
+
+    base = None
+    n = 1
+    while n <= args.max_threads:
+        fps = run(n, args.width, args.height, args.frames)
+        if base is None:
+            base = fps
+        print(f"| {n:7d} | {fps:10.1f} | {fps / base:6.2f}x |")
+        n *= 2
+
+
+if __name__ == "__main__":
+    main()
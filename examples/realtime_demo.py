@@ -7,76 +7,99 @@ Blend2D でリアルタイムに図形とテキストを描画し、raw-player 
 
 import argparse
 import time
+from functools import lru_cache
 from math import pi, sin
 
+import numpy as np
+
 from blend2d import CompOp, Context, Image, Path
 from raw_player import VideoPlayer
 
 
-def draw_7segment(ctx: Context, digit: int, x: float, y: float, w: float, h: float) -> None:
-    # 7 セグメント (a,b,c,d,e,f,g)
-    #  aaa
-    # f   b
-    #  ggg
-    # e   c
-    #  ddd
-    if digit < 0 or digit > 9:
-        return
-
+# 7 セグメント (a,b,c,d,e,f,g)
+#  aaa
+# f   b
+#  ggg
+# e   c
+#  ddd
+SEGMENTS = [
+    # a,    b,     c,     d,     e,     f,     g
+    [True, True, True, True, True, True, False],  # 0
+    [False, True, True, False, False, False, False],  # 1
+    [True, True, False, True, True, False, True],  # 2
+    [True, True, True, True, False, False, True],  # 3
+    [False, True, True, False, False, True, True],  # 4
+    [True, False, True, True, False, True, True],  # 5
+    [True, False, True, True, True, True, True],  # 6
+    [True, True, True, False, False, False, False],  # 7
+    [True, True, True, True, True, True, True],  # 8
+    [True, True, True, True, False, True, True],  # 9
+]
+
+
+@lru_cache
+def segment_paths(w: float, h: float) -> list[Path]:
+    # 原点基準のセグメントのパスを桁のサイズごとに 1 度だけ作成し、フレーム間で使い回す
     thickness = w * 0.15
     gap = thickness * 0.2
+    half = thickness * 0.5
 
-    segments = [
-        # a,    b,     c,     d,     e,     f,     g
-        [True, True, True, True, True, True, False],  # 0
-        [False, True, True, False, False, False, False],  # 1
-        [True, True, False, True, True, False, True],  # 2
-        [True, True, True, True, False, False, True],  # 3
-        [False, True, True, False, False, True, True],  # 4
-        [True, False, True, True, False, True, True],  # 5
-        [True, False, True, True, True, True, True],  # 6
-        [True, True, True, False, False, False, False],  # 7
-        [True, True, True, True, True, True, True],  # 8
-        [True, True, True, True, False, True, True],  # 9
-    ]
-
-    def draw_h(sx: float, sy: float) -> None:
+    # 頂点をまとめて NumPy 配列で渡し、1 回の呼び出しで多角形を追加する
+    def horizontal(sy: float) -> Path:
         p = Path()
-        p.move_to(sx + gap, sy)
-        p.line_to(sx + w - gap, sy)
-        p.line_to(sx + w - gap - thickness * 0.5, sy + thickness * 0.5)
-        p.line_to(sx + w - gap, sy + thickness)
-        p.line_to(sx + gap, sy + thickness)
-        p.line_to(sx + gap + thickness * 0.5, sy + thickness * 0.5)
-        p.close()
-        ctx.fill_path(p)
-
-    def draw_v(sx: float, sy: float, sh: float) -> None:
+        p.add_polygon(
+            np.array(
+                [
+                    [gap, sy],
+                    [w - gap, sy],
+                    [w - gap - half, sy + half],
+                    [w - gap, sy + thickness],
+                    [gap, sy + thickness],
+                    [gap + half, sy + half],
+                ],
+                dtype=np.float64,
+            )
+        )
+        return p
+
+    def vertical(sx: float, sy: float, sh: float) -> Path:
         p = Path()
-        p.move_to(sx, sy + gap)
-        p.line_to(sx + thickness * 0.5, sy + gap + thickness * 0.5)
-        p.line_to(sx + thickness, sy + gap)
-        p.line_to(sx + thickness, sy + sh - gap)
-        p.line_to(sx + thickness * 0.5, sy + sh - gap - thickness * 0.5)
-        p.line_to(sx, sy + sh - gap)
-        p.close()
-        ctx.fill_path(p)
-
-    on = segments[digit]
-    if on[0]:
-        draw_h(x, y)
-    if on[1]:
-        draw_v(x + w - thickness, y, h * 0.5)
-    if on[2]:
-        draw_v(x + w - thickness, y + h * 0.5, h * 0.5)
-    if on[3]:
-        draw_h(x, y + h - thickness)
-    if on[4]:
-        draw_v(x, y + h * 0.5, h * 0.5)
-    if on[5]:
-        draw_v(x, y, h * 0.5)
-    if on[6]:
-        draw_h(x, y + h * 0.5 - thickness * 0.5)
+        p.add_polygon(
+            np.array(
+                [
+                    [sx, sy + gap],
+                    [sx + half, sy + gap + half],
+                    [sx + thickness, sy + gap],
+                    [sx + thickness, sy + sh - gap],
+                    [sx + half, sy + sh - gap - half],
+                    [sx, sy + sh - gap],
+                ],
+                dtype=np.float64,
+            )
+        )
+        return p
+
+    return [
+        horizontal(0),  # a
+        vertical(w - thickness, 0, h * 0.5),  # b
+        vertical(w - thickness, h * 0.5, h * 0.5),  # c
+        horizontal(h - thickness),  # d
+        vertical(0, h * 0.5, h * 0.5),  # e
+        vertical(0, 0, h * 0.5),  # f
+        horizontal(h * 0.5 - half),  # g
+    ]
+
+
+def draw_7segment(ctx: Context, digit: int, x: float, y: float, w: float, h: float) -> None:
+    if digit < 0 or digit > 9:
+        return
+
+    ctx.save()
+    ctx.translate(x, y)
+    for on, path in zip(SEGMENTS[digit], segment_paths(w, h)):
+        if on:
+            ctx.fill_path(path)
+    ctx.restore()
 
 
 def draw_colon(ctx: Context, x: float, y: float, h: float) -> None:
@@ -3,15 +3,33 @@ from .blend2d_ext import (
     Image,
     Context,
     Path,
+    StrokeOptions,
+    PathCmd,
     CompOp,
+    Format,
+    PixelFormat,
+    YuvMatrix,
+    ScaleFilter,
+    Scaler,
     ExtendMode,
     GradientType,
     Gradient,
     Pattern,
     StrokeCap,
     StrokeJoin,
+    FillRule,
+    RenderingQuality,
+    GradientQuality,
+    PatternQuality,
+    RenderProfile,
     FontFace,
+    FontManager,
     Font,
+    FontMetrics,
+    GlyphRun,
+    FrameRing,
+    DisplayList,
+    DirtyRegion,
 )
 
 __all__ = [
@@ -19,15 +37,33 @@ __all__ = [
     "Image",
     "Context",
     "Path",
+    "StrokeOptions",
+    "PathCmd",
     "CompOp",
+    "Format",
+    "PixelFormat",
+    "YuvMatrix",
+    "ScaleFilter",
+    "Scaler",
     "ExtendMode",
     "GradientType",
     "Gradient",
     "Pattern",
     "StrokeCap",
     "StrokeJoin",
+    "FillRule",
+    "RenderingQuality",
+    "GradientQuality",
+    "PatternQuality",
+    "RenderProfile",
     "FontFace",
+    "FontManager",
     "Font",
+    "FontMetrics",
+    "GlyphRun",
+    "FrameRing",
+    "DisplayList",
+    "DirtyRegion",
 ]
 
 
@@ -2,23 +2,115 @@
 
 using namespace nb::literals;
 
+// ExternalBuffer 実装
+ExternalBuffer* ExternalBuffer::acquire(nb::handle obj, bool writable) {
+  ExternalBuffer* holder = new ExternalBuffer();
+  int flags = PyBUF_C_CONTIGUOUS | (writable ? PyBUF_WRITABLE : 0);
+  if (PyObject_GetBuffer(obj.ptr(), &holder->view, flags) != 0) {
+    delete holder;
+    throw nb::python_error();
+  }
+  return holder;
+}
+
+void ExternalBuffer::destroy(void* impl, void* external_data, void* user_data) noexcept {
+  (void)impl;
+  (void)external_data;
+  ExternalBuffer* holder = static_cast<ExternalBuffer*>(user_data);
+  // インタープリタ終了後は Python オブジェクトに触れられないため、ホルダーだけ解放する
+  if (Py_IsInitialized()) {
+    nb::gil_scoped_acquire acquire;
+    PyBuffer_Release(&holder->view);
+  }
+  delete holder;
+}
+
+// フォーマットごとの 1 ピクセルあたりのバイト数
+static int format_bytes_per_pixel(BLFormat format) {
+  switch (format) {
+    case BL_FORMAT_PRGB32:
+    case BL_FORMAT_XRGB32:
+      return 4;
+    case BL_FORMAT_A8:
+      return 1;
+    default:
+      throw std::invalid_argument("unsupported format: " + std::to_string((int)format));
+  }
+}
+
 // PyImage 実装
-PyImage::PyImage(int w, int h) : width(w), height(h) {
-  BLResult r = img.create(w, h, BL_FORMAT_PRGB32);
+PyImage::PyImage(int w, int h, BLFormat fmt) : width(w), height(h), format(fmt) {
+  BLResult r = img.create(w, h, fmt);
   if (r != BL_SUCCESS) {
     throw std::runtime_error("BLImage.create failed: " + std::to_string(r));
   }
 }
 
-nb::object PyImage::memoryview() {
+PyImage* PyImage::from_buffer(nb::handle obj, int w, int h, intptr_t stride, BLFormat fmt) {
+  if (w <= 0 || h <= 0) {
+    throw std::invalid_argument("width and height must be positive");
+  }
+  intptr_t row_bytes = (intptr_t)w * format_bytes_per_pixel(fmt);
+  if (stride == 0) {
+    stride = row_bytes;
+  }
+  if (stride < row_bytes) {
+    throw std::invalid_argument("stride must be at least width * bytes_per_pixel: " +
+                                std::to_string(stride) + " < " + std::to_string(row_bytes));
+  }
+
+  ExternalBuffer* holder = ExternalBuffer::acquire(obj, true);
+  intptr_t required = stride * (intptr_t)(h - 1) + row_bytes;
+  if ((intptr_t)holder->view.len < required) {
+    Py_ssize_t len = holder->view.len;
+    PyBuffer_Release(&holder->view);
+    delete holder;
+    throw std::invalid_argument("buffer is too small: " + std::to_string(len) + " < " +
+                                std::to_string(required));
+  }
+
+  PyImage* image = new PyImage();
+  image->width = w;
+  image->height = h;
+  image->format = fmt;
+  BLResult r = image->img.create_from_data(w, h, fmt, holder->view.buf, stride,
+                                           BL_DATA_ACCESS_RW, ExternalBuffer::destroy, holder);
+  if (r != BL_SUCCESS) {
+    PyBuffer_Release(&holder->view);
+    delete holder;
+    delete image;
+    throw std::runtime_error("BLImage.create_from_data failed: " + std::to_string(r));
+  }
+  return image;
+}
+
+// Image のバッファプロトコル (1D, size=stride*(height-1)+width*bytes_per_pixel)
+// from_buffer で受け取ったバッファは最終行の stride の余白を含まない場合があるため、
+// 最終行は width 分だけを公開する。
+// Py_buffer が Image への参照を保持するため、memoryview が残っている間は Image が解放されない
+static int image_getbuffer(PyObject* exporter, Py_buffer* view, int flags) {
+  PyImage* self = nb::inst_ptr<PyImage>(exporter);
   BLImageData d;
-  BLResult r = img.get_data(&d);
+  BLResult r = self->img.get_data(&d);
   if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLImage.get_data failed: " + std::to_string(r));
+    view->obj = nullptr;
+    PyErr_SetString(PyExc_BufferError,
+                    ("BLImage.get_data failed: " + std::to_string(r)).c_str());
+    return -1;
   }
-  Py_ssize_t size = (Py_ssize_t)d.stride * (Py_ssize_t)height;
-  PyObject* mv =
-      PyMemoryView_FromMemory((char*)d.pixel_data, size, PyBUF_WRITE);
+  Py_ssize_t row_bytes = (Py_ssize_t)self->width * format_bytes_per_pixel(self->format);
+  Py_ssize_t size = (Py_ssize_t)d.stride * (Py_ssize_t)(self->height - 1) + row_bytes;
+  return PyBuffer_FillInfo(view, exporter, d.pixel_data, size, 0, flags);
+}
+
+static PyType_Slot image_slots[] = {
+    {Py_bf_getbuffer, (void*)image_getbuffer},
+    {0, nullptr},
+};
+
+nb::object PyImage::memoryview() {
+  nb::object self = nb::find(this);
+  PyObject* mv = PyMemoryView_FromObject(self.ptr());
   if (!mv) {
     throw nb::python_error();
   }
@@ -31,26 +123,472 @@ nb::ndarray<nb::numpy, uint8_t> PyImage::asarray() {
   if (r != BL_SUCCESS) {
     throw std::runtime_error("BLImage.get_data failed: " + std::to_string(r));
   }
+  // ビューが Image への参照を保持するため、ビューが残っている間は Image が解放されない
+  nb::object owner = nb::find(this);
+  if (format == BL_FORMAT_A8) {
+    // shape: (height, width)
+    size_t shape[2] = {(size_t)height, (size_t)width};
+    int64_t strides[2] = {(int64_t)d.stride, 1};
+    return nb::ndarray<nb::numpy, uint8_t>(d.pixel_data, 2, shape, owner,
+                                           strides);
+  }
+
   // shape: (height, width, 4)
   size_t shape[3] = {(size_t)height, (size_t)width, 4};
   // strides: (stride, 4, 1) バイト単位
   int64_t strides[3] = {(int64_t)d.stride, 4, 1};
 
-  return nb::ndarray<nb::numpy, uint8_t>(d.pixel_data, 3, shape, nb::handle(),
+  return nb::ndarray<nb::numpy, uint8_t>(d.pixel_data, 3, shape, owner,
                                          strides);
 }
 
+// ピクセルフォーマット変換
+// PRGB32 / XRGB32 のメモリ上の並びは B, G, R, A
+// 変換は GIL を解放して 1 パスで行い、変換先は呼び出し側が確保した配列に書き込む
+
+// 乗算済みアルファを戻すための係数表 (16 bit 固定小数点の 255 / a)
+static const uint32_t* unpremultiply_table() {
+  static const std::array<uint32_t, 256> table = [] {
+    std::array<uint32_t, 256> t{};
+    for (uint32_t a = 1; a < 256; a++) {
+      t[a] = ((255u << 16) + a / 2) / a;
+    }
+    return t;
+  }();
+  return table.data();
+}
+
+static inline uint8_t unpremultiply(uint32_t c, uint32_t scale) {
+  uint32_t v = (c * scale + 0x8000u) >> 16;
+  return (uint8_t)(v > 255 ? 255 : v);
+}
+
+// R, G, B, A は変換先での各チャンネルの位置。A が負の場合はアルファなし
+template <int R, int G, int B, int A>
+static void convert_rows(const BLImageData& d, int w, int h, uint8_t* dst, bool premultiplied) {
+  constexpr int channels = A < 0 ? 3 : 4;
+  const uint32_t* table = unpremultiply_table();
+  for (int y = 0; y < h; y++) {
+    const uint8_t* s = (const uint8_t*)d.pixel_data + (intptr_t)y * d.stride;
+    uint8_t* o = dst + (size_t)y * (size_t)w * channels;
+    for (int x = 0; x < w; x++, s += 4, o += channels) {
+      uint32_t b = s[0], g = s[1], r = s[2];
+      if constexpr (A >= 0) {
+        uint32_t a = premultiplied ? s[3] : 255;
+        if (a != 255) {
+          uint32_t scale = table[a];
+          b = unpremultiply(b, scale);
+          g = unpremultiply(g, scale);
+          r = unpremultiply(r, scale);
+        }
+        o[A] = (uint8_t)a;
+      }
+      o[R] = (uint8_t)r;
+      o[G] = (uint8_t)g;
+      o[B] = (uint8_t)b;
+    }
+  }
+}
+
+// 8 bit 固定小数点 (x256) のリミテッドレンジ係数
+struct YuvCoeffs {
+  int yr, yg, yb;
+  int ur, ug, ub;
+  int vr, vg, vb;
+};
+
+static const YuvCoeffs& yuv_coeffs(YuvMatrix matrix) {
+  static const YuvCoeffs bt601{66, 129, 25, -38, -74, 112, 112, -94, -18};
+  static const YuvCoeffs bt709{47, 157, 16, -26, -87, 112, 112, -102, -10};
+  return matrix == YuvMatrix::BT709 ? bt709 : bt601;
+}
+
+static inline uint8_t clamp_u8(int v) {
+  return (uint8_t)(v < 0 ? 0 : (v > 255 ? 255 : v));
+}
+
+// YUV 4:2:0 に変換する。クロマは 2x2 ピクセルの平均を使う
+// I420 は u / v を別プレーン (uv_step=1)、NV12 は u / v を交互に並べたプレーン (uv_step=2) に書き込む
+// 乗算済みアルファの色をそのまま使うため、黒背景に合成した色になる
+static void convert_yuv420(const BLImageData& d,
+                           int w,
+                           int h,
+                           YuvMatrix matrix,
+                           uint8_t* y_plane,
+                           uint8_t* u_plane,
+                           uint8_t* v_plane,
+                           size_t uv_stride,
+                           size_t uv_step) {
+  const YuvCoeffs& k = yuv_coeffs(matrix);
+  int cw = (w + 1) / 2;
+  int ch = (h + 1) / 2;
+  for (int cy = 0; cy < ch; cy++) {
+    int y0 = cy * 2;
+    int y1 = y0 + 1 < h ? y0 + 1 : y0;
+    const uint8_t* s0 = (const uint8_t*)d.pixel_data + (intptr_t)y0 * d.stride;
+    const uint8_t* s1 = (const uint8_t*)d.pixel_data + (intptr_t)y1 * d.stride;
+    uint8_t* yo0 = y_plane + (size_t)y0 * (size_t)w;
+    uint8_t* yo1 = y_plane + (size_t)y1 * (size_t)w;
+    uint8_t* uo = u_plane + (size_t)cy * uv_stride;
+    uint8_t* vo = v_plane + (size_t)cy * uv_stride;
+    for (int cx = 0; cx < cw; cx++) {
+      int x0 = cx * 2;
+      int x1 = x0 + 1 < w ? x0 + 1 : x0;
+      const uint8_t* p[4] = {s0 + x0 * 4, s0 + x1 * 4, s1 + x0 * 4, s1 + x1 * 4};
+      uint8_t* yo[4] = {yo0 + x0, yo0 + x1, yo1 + x0, yo1 + x1};
+      int sr = 0, sg = 0, sb = 0;
+      for (int i = 0; i < 4; i++) {
+        int b = p[i][0], g = p[i][1], r = p[i][2];
+        *yo[i] = clamp_u8(((k.yr * r + k.yg * g + k.yb * b + 128) >> 8) + 16);
+        sr += r;
+        sg += g;
+        sb += b;
+      }
+      sr = (sr + 2) >> 2;
+      sg = (sg + 2) >> 2;
+      sb = (sb + 2) >> 2;
+      uo[cx * uv_step] = clamp_u8(((k.ur * sr + k.ug * sg + k.ub * sb + 128) >> 8) + 128);
+      vo[cx * uv_step] = clamp_u8(((k.vr * sr + k.vg * sg + k.vb * sb + 128) >> 8) + 128);
+    }
+  }
+}
+
+// 読み出し用に Image のピクセルデータを取得する
+static BLImageData source_image_data(const PyImage& image) {
+  BLImageData d;
+  BLResult r = image.img.get_data(&d);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLImage.get_data failed: " + std::to_string(r));
+  }
+  return d;
+}
+
+// 変換元の Image のピクセルデータを取得する (A8 は変換できない)
+static BLImageData convert_source_data(const PyImage& image) {
+  if (image.format == BL_FORMAT_A8) {
+    throw std::invalid_argument("A8 image cannot be converted");
+  }
+  return source_image_data(image);
+}
+
+static void check_plane(const char* name, size_t rows, size_t cols, size_t h, size_t w) {
+  if (rows != h || cols != w) {
+    throw std::invalid_argument(std::string(name) + " must have shape (" + std::to_string(h) +
+                                ", " + std::to_string(w) + "), got (" + std::to_string(rows) +
+                                ", " + std::to_string(cols) + ")");
+  }
+}
+
+void PyImage::convert_to(ByteArray dst, PixelFormat pixel_format) {
+  size_t channels =
+      (pixel_format == PixelFormat::BGR24 || pixel_format == PixelFormat::RGB24) ? 3 : 4;
+  if (dst.ndim() != 3 || dst.shape(0) != (size_t)height || dst.shape(1) != (size_t)width ||
+      dst.shape(2) != channels) {
+    throw std::invalid_argument("dst must be a C-contiguous uint8 array of shape (" +
+                                std::to_string(height) + ", " + std::to_string(width) + ", " +
+                                std::to_string(channels) + ")");
+  }
+  BLImageData d = convert_source_data(*this);
+  bool premultiplied = format == BL_FORMAT_PRGB32;
+  uint8_t* out = dst.data();
+
+  nb::gil_scoped_release release;
+  switch (pixel_format) {
+    case PixelFormat::BGRA32:
+      convert_rows<2, 1, 0, 3>(d, width, height, out, premultiplied);
+      break;
+    case PixelFormat::RGBA32:
+      convert_rows<0, 1, 2, 3>(d, width, height, out, premultiplied);
+      break;
+    case PixelFormat::BGR24:
+      convert_rows<2, 1, 0, -1>(d, width, height, out, premultiplied);
+      break;
+    case PixelFormat::RGB24:
+      convert_rows<0, 1, 2, -1>(d, width, height, out, premultiplied);
+      break;
+  }
+}
+
+void PyImage::to_i420(PlaneArray y, PlaneArray u, PlaneArray v, YuvMatrix matrix) {
+  size_t cw = (size_t)(width + 1) / 2;
+  size_t ch = (size_t)(height + 1) / 2;
+  check_plane("y", y.shape(0), y.shape(1), height, width);
+  check_plane("u", u.shape(0), u.shape(1), ch, cw);
+  check_plane("v", v.shape(0), v.shape(1), ch, cw);
+  BLImageData d = convert_source_data(*this);
+  uint8_t* yp = y.data();
+  uint8_t* up = u.data();
+  uint8_t* vp = v.data();
+
+  nb::gil_scoped_release release;
+  convert_yuv420(d, width, height, matrix, yp, up, vp, cw, 1);
+}
+
+void PyImage::to_nv12(PlaneArray y, ByteArray uv, YuvMatrix matrix) {
+  size_t cw = (size_t)(width + 1) / 2;
+  size_t ch = (size_t)(height + 1) / 2;
+  check_plane("y", y.shape(0), y.shape(1), height, width);
+  // uv は (ch, cw * 2) と (ch, cw, 2) のどちらでもよい
+  bool uv_ok = (uv.ndim() == 2 && uv.shape(0) == ch && uv.shape(1) == cw * 2) ||
+               (uv.ndim() == 3 && uv.shape(0) == ch && uv.shape(1) == cw && uv.shape(2) == 2);
+  if (!uv_ok) {
+    throw std::invalid_argument("uv must have shape (" + std::to_string(ch) + ", " +
+                                std::to_string(cw * 2) + ") or (" + std::to_string(ch) + ", " +
+                                std::to_string(cw) + ", 2)");
+  }
+  BLImageData d = convert_source_data(*this);
+  uint8_t* yp = y.data();
+  uint8_t* uvp = uv.data();
+
+  nb::gil_scoped_release release;
+  convert_yuv420(d, width, height, matrix, yp, uvp, uvp + 1, cw * 2, 2);
+}
+
+// 拡大縮小
+// 横方向 → 縦方向の順に分離可能なフィルタを適用する。
+// PRGB32 は乗算済みのまま補間し、BICUBIC / LANCZOS のオーバーシュートで色がアルファを超えないように丸める
+static constexpr int kResampleBits = 14;
+static constexpr double kPi = 3.14159265358979323846;
+
+static double filter_support(ScaleFilter filter) {
+  switch (filter) {
+    case ScaleFilter::BILINEAR:
+      return 1.0;
+    case ScaleFilter::BICUBIC:
+      return 2.0;
+    case ScaleFilter::LANCZOS:
+      return 3.0;
+    default:
+      return 0.5;
+  }
+}
+
+static double sinc(double x) {
+  if (x == 0.0) {
+    return 1.0;
+  }
+  x *= kPi;
+  return std::sin(x) / x;
+}
+
+static double filter_value(ScaleFilter filter, double x) {
+  x = std::fabs(x);
+  switch (filter) {
+    case ScaleFilter::BILINEAR:
+      return x < 1.0 ? 1.0 - x : 0.0;
+    case ScaleFilter::BICUBIC: {
+      // Keys (a = -0.5)
+      const double a = -0.5;
+      if (x < 1.0) {
+        return ((a + 2.0) * x - (a + 3.0)) * x * x + 1.0;
+      }
+      if (x < 2.0) {
+        return (((x - 5.0) * x + 8.0) * x - 4.0) * a;
+      }
+      return 0.0;
+    }
+    case ScaleFilter::LANCZOS:
+      return x < 3.0 ? sinc(x) * sinc(x / 3.0) : 0.0;
+    default:
+      return x < 0.5 ? 1.0 : 0.0;
+  }
+}
+
+static ResampleWeights compute_weights(int in_size, int out_size, ScaleFilter filter) {
+  ResampleWeights w;
+  w.start.resize(out_size);
+  w.count.resize(out_size);
+  double scale = (double)in_size / out_size;
+
+  if (filter == ScaleFilter::NEAREST) {
+    w.taps = 1;
+    w.coeffs.assign(out_size, 1 << kResampleBits);
+    for (int i = 0; i < out_size; i++) {
+      w.start[i] = std::min((int)((i + 0.5) * scale), in_size - 1);
+      w.count[i] = 1;
+    }
+    return w;
+  }
+
+  // 縮小する場合はフィルタを広げて入力の全画素を参照する
+  double filter_scale = std::max(scale, 1.0);
+  double support = filter_support(filter) * filter_scale;
+  w.taps = (int)std::ceil(support) * 2 + 1;
+  w.coeffs.assign((size_t)out_size * w.taps, 0);
+  std::vector<double> k(w.taps);
+  for (int i = 0; i < out_size; i++) {
+    double center = (i + 0.5) * scale;
+    int begin = std::max((int)(center - support + 0.5), 0);
+    int end = std::min((int)(center + support + 0.5), in_size);
+    int count = std::min(end - begin, w.taps);
+    double total = 0.0;
+    for (int j = 0; j < count; j++) {
+      k[j] = filter_value(filter, (j + begin - center + 0.5) / filter_scale);
+      total += k[j];
+    }
+    for (int j = 0; j < count; j++) {
+      double v = total != 0.0 ? k[j] / total : 0.0;
+      w.coeffs[(size_t)i * w.taps + j] = (int32_t)std::lround(v * (1 << kResampleBits));
+    }
+    w.start[i] = begin;
+    w.count[i] = count;
+  }
+  return w;
+}
+
+static inline uint8_t resample_round(int32_t acc) {
+  return clamp_u8((acc + (1 << (kResampleBits - 1))) >> kResampleBits);
+}
+
+// 1 行を横方向にリサンプリングする
+static void resample_row(const uint8_t* src, uint8_t* dst, int out_size, int channels,
+                         const ResampleWeights& w) {
+  for (int x = 0; x < out_size; x++) {
+    const int32_t* c = &w.coeffs[(size_t)x * w.taps];
+    const uint8_t* s = src + (size_t)w.start[x] * channels;
+    int32_t acc[4] = {0, 0, 0, 0};
+    for (int j = 0; j < w.count[x]; j++, s += channels) {
+      for (int ch = 0; ch < channels; ch++) {
+        acc[ch] += c[j] * s[ch];
+      }
+    }
+    for (int ch = 0; ch < channels; ch++) {
+      dst[(size_t)x * channels + ch] = resample_round(acc[ch]);
+    }
+  }
+}
+
+// 書き込み先の Image のピクセルデータを取得する。
+// Pattern や複製した Image とデータを共有している場合は make_mutable でコピーしてから書き込む
+static BLImageData dest_image_data(PyImage& image) {
+  if (image.attached.load()) {
+    throw std::runtime_error("dst is attached to a Context; end() it first");
+  }
+  BLImageData d;
+  BLResult r = image.img.make_mutable(&d);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLImage.make_mutable failed: " + std::to_string(r));
+  }
+  return d;
+}
+
+PyScaler::PyScaler(int src_width, int src_height, int dst_width, int dst_height, ScaleFilter filter)
+    : src_width(src_width),
+      src_height(src_height),
+      dst_width(dst_width),
+      dst_height(dst_height),
+      filter(filter) {
+  if (src_width <= 0 || src_height <= 0 || dst_width <= 0 || dst_height <= 0) {
+    throw std::invalid_argument("image sizes must be positive");
+  }
+  horizontal = compute_weights(src_width, dst_width, filter);
+  vertical = compute_weights(src_height, dst_height, filter);
+}
+
+void PyScaler::scale(PyImage& src, PyImage& dst) {
+  if (&src == &dst) {
+    throw std::invalid_argument("src and dst must be different images");
+  }
+  if (src.width != src_width || src.height != src_height) {
+    throw std::invalid_argument("src must be " + std::to_string(src_width) + "x" +
+                                std::to_string(src_height));
+  }
+  if (dst.width != dst_width || dst.height != dst_height) {
+    throw std::invalid_argument("dst must be " + std::to_string(dst_width) + "x" +
+                                std::to_string(dst_height));
+  }
+  if (src.format != dst.format) {
+    throw std::invalid_argument("src and dst must have the same format");
+  }
+  BLImageData s = source_image_data(src);
+  BLImageData d = dest_image_data(dst);
+  int channels = format_bytes_per_pixel(src.format);
+  bool premultiplied = src.format == BL_FORMAT_PRGB32;
+
+  nb::gil_scoped_release release;
+  std::lock_guard<std::mutex> lock(mutex);
+
+  // 横方向。幅が同じ場合は入力をそのまま使う
+  const uint8_t* rows = static_cast<const uint8_t*>(s.pixel_data);
+  intptr_t row_stride = s.stride;
+  if (src_width != dst_width) {
+    size_t temp_stride = (size_t)dst_width * channels;
+    temp.resize(temp_stride * src_height);
+    for (int y = 0; y < src_height; y++) {
+      resample_row(rows + y * s.stride, temp.data() + y * temp_stride, dst_width, channels,
+                   horizontal);
+    }
+    rows = temp.data();
+    row_stride = (intptr_t)temp_stride;
+  }
+
+  // 縦方向。入力の行ごとに係数を掛けて加算する
+  size_t row_size = (size_t)dst_width * channels;
+  std::vector<int32_t> acc(row_size);
+  for (int y = 0; y < dst_height; y++) {
+    std::fill(acc.begin(), acc.end(), 0);
+    const int32_t* c = &vertical.coeffs[(size_t)y * vertical.taps];
+    for (int j = 0; j < vertical.count[y]; j++) {
+      const uint8_t* row = rows + (vertical.start[y] + j) * row_stride;
+      int32_t k = c[j];
+      for (size_t x = 0; x < row_size; x++) {
+        acc[x] += k * row[x];
+      }
+    }
+    uint8_t* out = static_cast<uint8_t*>(d.pixel_data) + y * d.stride;
+    for (size_t x = 0; x < row_size; x++) {
+      out[x] = resample_round(acc[x]);
+    }
+    if (premultiplied) {
+      for (int x = 0; x < dst_width; x++) {
+        uint8_t* p = out + x * 4;
+        p[0] = std::min(p[0], p[3]);
+        p[1] = std::min(p[1], p[3]);
+        p[2] = std::min(p[2], p[3]);
+      }
+    }
+  }
+}
+
+void PyImage::scale(PyImage& dst, ScaleFilter filter) {
+  PyScaler scaler(width, height, dst.width, dst.height, filter);
+  scaler.scale(*this, dst);
+}
+
 // PyFontFace 実装
 PyFontFace::PyFontFace() {}
 
-void PyFontFace::create_from_file(const std::string& filename) {
-  BLResult r = face.create_from_file(filename.c_str());
+void PyFontFace::create_from_file(const std::string& filename, uint32_t face_index) {
+  BLFontData data;
+  BLResult r = data.create_from_file(filename.c_str(), BL_FILE_READ_NO_FLAGS);
+  if (r == BL_SUCCESS) {
+    r = face.create_from_data(data, face_index);
+  }
   if (r != BL_SUCCESS) {
     throw std::runtime_error("BLFontFace.create_from_file failed: " +
                              std::to_string(r));
   }
 }
 
+// bytes / memoryview / mmap などのフォントデータをコピーせずに参照する。
+// 元のオブジェクトはフォントデータが解放されるまで保持する
+void PyFontFace::create_from_data(nb::handle data, uint32_t face_index) {
+  ExternalBuffer* holder = ExternalBuffer::acquire(data, false);
+  BLFontData font_data;
+  BLResult r = font_data.create_from_data(holder->view.buf, (size_t)holder->view.len,
+                                          ExternalBuffer::destroy, holder);
+  if (r != BL_SUCCESS) {
+    PyBuffer_Release(&holder->view);
+    delete holder;
+    throw std::runtime_error("BLFontData.create_from_data failed: " + std::to_string(r));
+  }
+  // 失敗した場合も font_data の破棄時に元のオブジェクトは解放される
+  r = face.create_from_data(font_data, face_index);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontFace.create_from_data failed: " + std::to_string(r));
+  }
+}
+
 std::string PyFontFace::family_name() const {
   return std::string(face.family_name().data(), face.family_name().size());
 }
@@ -59,6 +597,10 @@ uint32_t PyFontFace::weight() const {
   return face.weight();
 }
 
+uint32_t PyFontFace::face_index() const {
+  return face.face_index();
+}
+
 // PyFont 実装
 PyFont::PyFont(PyFontFace& face, float size) {
   BLResult r = font.create_from_face(face.face, size);
@@ -72,6 +614,511 @@ float PyFont::size() const {
   return font.size();
 }
 
+// テキストを整形する。GIL は不要
+static std::shared_ptr<const ShapedText> shape_text(const BLFont& font, const std::string& text) {
+  auto shaped = std::make_shared<ShapedText>();
+  shaped->text = text;
+  BLResult r = shaped->buffer.set_utf8_text(text.data(), text.size());
+  if (r == BL_SUCCESS) {
+    r = font.shape(shaped->buffer);
+  }
+  if (r == BL_SUCCESS) {
+    r = font.get_text_metrics(shaped->buffer, shaped->metrics);
+  }
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFont.shape failed: " + std::to_string(r));
+  }
+  return shaped;
+}
+
+// キャッシュにあれば整形済みテキストを返し、なければ GIL を解放して整形してから追加する
+std::shared_ptr<const ShapedText> PyFont::shape_cached(const std::string& text) {
+  {
+    std::lock_guard<std::mutex> lock(text_cache_mutex);
+    auto it = text_cache_index.find(std::string_view(text));
+    if (it != text_cache_index.end()) {
+      text_cache.splice(text_cache.begin(), text_cache, it->second);
+      return *it->second;
+    }
+  }
+
+  std::shared_ptr<const ShapedText> shaped;
+  {
+    nb::gil_scoped_release release;
+    shaped = shape_text(font, text);
+  }
+
+  std::lock_guard<std::mutex> lock(text_cache_mutex);
+  // 整形している間に他のスレッドが同じテキストを追加している場合はそのまま返す
+  if (text_cache_limit == 0 || text_cache_index.count(std::string_view(shaped->text))) {
+    return shaped;
+  }
+  text_cache.push_front(shaped);
+  text_cache_index.emplace(std::string_view(shaped->text), text_cache.begin());
+  evict_text_cache();
+  return shaped;
+}
+
+// 容量を超えた分を古いものから破棄する。text_cache_mutex を保持した状態で呼び出す
+void PyFont::evict_text_cache() {
+  while (text_cache.size() > text_cache_limit) {
+    text_cache_index.erase(std::string_view(text_cache.back()->text));
+    text_cache.pop_back();
+  }
+}
+
+size_t PyFont::text_cache_capacity() {
+  std::lock_guard<std::mutex> lock(text_cache_mutex);
+  return text_cache_limit;
+}
+
+void PyFont::set_text_cache_capacity(size_t capacity) {
+  std::lock_guard<std::mutex> lock(text_cache_mutex);
+  text_cache_limit = capacity;
+  evict_text_cache();
+}
+
+size_t PyFont::text_cache_size() {
+  std::lock_guard<std::mutex> lock(text_cache_mutex);
+  return text_cache.size();
+}
+
+void PyFont::clear_text_cache() {
+  std::lock_guard<std::mutex> lock(text_cache_mutex);
+  text_cache_index.clear();
+  text_cache.clear();
+}
+
+BLFontMetrics PyFont::metrics() const {
+  return font.metrics();
+}
+
+// 送り幅とバウンディングボックスを [advance, x0, y0, x1, y1] の順に書き込む
+static void write_text_metrics(const BLTextMetrics& tm, double* out) {
+  out[0] = tm.advance.x;
+  out[1] = tm.bounding_box.x0;
+  out[2] = tm.bounding_box.y0;
+  out[3] = tm.bounding_box.x1;
+  out[4] = tm.bounding_box.y1;
+}
+
+nb::ndarray<nb::numpy, double, nb::shape<5>> PyFont::measure(const std::string& text) {
+  std::shared_ptr<const ShapedText> shaped = shape_cached(text);
+  double* data = new double[5];
+  nb::capsule owner(data, [](void* p) noexcept { delete[] static_cast<double*>(p); });
+  write_text_metrics(shaped->metrics, data);
+  size_t shape[1] = {5};
+  return nb::ndarray<nb::numpy, double, nb::shape<5>>(data, 1, shape, owner);
+}
+
+// 複数のテキストをまとめて計測する。計測結果はキャッシュせず、GIL を解放して 1 つの BLGlyphBuffer を使い回す
+nb::ndarray<nb::numpy, double, nb::shape<-1, 5>> PyFont::measure_many(
+    const std::vector<std::string>& texts) {
+  size_t n = texts.size();
+  double* data = new double[n * 5];
+  nb::capsule owner(data, [](void* p) noexcept { delete[] static_cast<double*>(p); });
+  {
+    nb::gil_scoped_release release;
+    BLGlyphBuffer gb;
+    BLTextMetrics tm;
+    for (size_t i = 0; i < n; i++) {
+      BLResult r = gb.set_utf8_text(texts[i].data(), texts[i].size());
+      if (r == BL_SUCCESS) {
+        r = font.shape(gb);
+      }
+      if (r == BL_SUCCESS) {
+        r = font.get_text_metrics(gb, tm);
+      }
+      if (r != BL_SUCCESS) {
+        throw std::runtime_error("BLFont.get_text_metrics failed: " + std::to_string(r));
+      }
+      write_text_metrics(tm, data + i * 5);
+    }
+  }
+  size_t shape[2] = {n, 5};
+  return nb::ndarray<nb::numpy, double, nb::shape<-1, 5>>(data, 2, shape, owner);
+}
+
+// UTF-8 の 1 文字を読み、コードポイントを返す。pos は次の文字の位置に進める
+static uint32_t next_codepoint(const std::string& text, size_t& pos) {
+  uint8_t c = (uint8_t)text[pos];
+  size_t len = c < 0x80 ? 1 : (c >> 5) == 0x6 ? 2 : (c >> 4) == 0xE ? 3 : (c >> 3) == 0x1E ? 4 : 1;
+  if (pos + len > text.size()) {
+    len = 1;
+  }
+  uint32_t cp = len == 1 ? c : len == 2 ? (c & 0x1F) : len == 3 ? (c & 0x0F) : (c & 0x07);
+  for (size_t i = 1; i < len; i++) {
+    cp = (cp << 6) | ((uint8_t)text[pos + i] & 0x3F);
+  }
+  pos += len;
+  return cp;
+}
+
+static bool is_space_codepoint(uint32_t cp) {
+  return cp == ' ' || cp == '\t' || cp == 0x3000;
+}
+
+// 文字単位で改行できる文字 (CJK 統合漢字、かな、ハングル、全角記号)
+static bool is_cjk_codepoint(uint32_t cp) {
+  return (cp >= 0x2E80 && cp <= 0x9FFF) || (cp >= 0xAC00 && cp <= 0xD7AF) ||
+         (cp >= 0xF900 && cp <= 0xFAFF) || (cp >= 0xFF00 && cp <= 0xFFEF) ||
+         (cp >= 0x20000 && cp <= 0x3FFFF);
+}
+
+// 行頭に置かない文字 (閉じ括弧、句読点、長音など)
+static bool is_no_line_start(uint32_t cp) {
+  static const std::u32string chars = U"、。，．・：；？！ー）」』】〕〉》’”ぁぃぅぇぉっゃゅょゎァィゥェォッャュョヮヵヶ々゛゜,.!?;:)]}";
+  return chars.find((char32_t)cp) != std::u32string::npos;
+}
+
+// 行末に置かない文字 (開き括弧)
+static bool is_no_line_end(uint32_t cp) {
+  static const std::u32string chars = U"（「『【〔〈《‘“([{";
+  return chars.find((char32_t)cp) != std::u32string::npos;
+}
+
+namespace {
+
+// 改行位置の候補で区切ったテキストの断片
+struct WrapToken {
+  enum Kind { WORD, SPACE, NEWLINE } kind;
+  size_t begin;
+  size_t end;
+};
+
+}  // namespace
+
+// 空白と CJK 文字の前後を改行位置の候補として分割する
+static std::vector<WrapToken> tokenize_for_wrap(const std::string& text) {
+  std::vector<WrapToken> tokens;
+  uint32_t prev = 0;
+  size_t pos = 0;
+  while (pos < text.size()) {
+    size_t begin = pos;
+    uint32_t cp = next_codepoint(text, pos);
+    WrapToken::Kind kind =
+        cp == '\n' ? WrapToken::NEWLINE : is_space_codepoint(cp) ? WrapToken::SPACE : WrapToken::WORD;
+    bool extend = false;
+    if (!tokens.empty() && tokens.back().kind == kind && kind != WrapToken::NEWLINE) {
+      extend = kind == WrapToken::SPACE ||
+               !((is_cjk_codepoint(prev) || is_cjk_codepoint(cp)) && !is_no_line_start(cp) &&
+                 !is_no_line_end(prev));
+    }
+    if (extend) {
+      tokens.back().end = pos;
+    } else {
+      tokens.push_back(WrapToken{kind, begin, pos});
+    }
+    prev = cp;
+  }
+  return tokens;
+}
+
+// width に収まるようにテキストを折り返す。
+// 空白と CJK 文字の前後で改行し (行頭禁則 / 行末禁則の文字は除く)、1 語で width を超える場合は文字単位で分割する。
+// 改行位置の空白は取り除き、'\n' は必ず改行する
+std::vector<std::string> PyFont::wrap_text(const std::string& text, double width) {
+  std::vector<std::string> lines;
+  nb::gil_scoped_release release;
+
+  BLGlyphBuffer gb;
+  std::unordered_map<std::string, double> widths;
+  auto measure_range = [&](size_t begin, size_t end) -> double {
+    std::string s = text.substr(begin, end - begin);
+    auto it = widths.find(s);
+    if (it != widths.end()) {
+      return it->second;
+    }
+    BLTextMetrics tm;
+    BLResult r = gb.set_utf8_text(s.data(), s.size());
+    if (r == BL_SUCCESS) {
+      r = font.shape(gb);
+    }
+    if (r == BL_SUCCESS) {
+      r = font.get_text_metrics(gb, tm);
+    }
+    if (r != BL_SUCCESS) {
+      throw std::runtime_error("BLFont.get_text_metrics failed: " + std::to_string(r));
+    }
+    widths.emplace(std::move(s), tm.advance.x);
+    return tm.advance.x;
+  };
+
+  size_t line_begin = 0;
+  size_t line_end = 0;
+  double line_width = 0.0;
+  bool has_word = false;
+  double pending_space = 0.0;
+  auto push_line = [&]() {
+    lines.push_back(text.substr(line_begin, line_end - line_begin));
+    line_width = 0.0;
+    has_word = false;
+    pending_space = 0.0;
+  };
+
+  for (const WrapToken& token : tokenize_for_wrap(text)) {
+    if (token.kind == WrapToken::NEWLINE) {
+      push_line();
+      line_begin = line_end = token.end;
+      continue;
+    }
+    if (token.kind == WrapToken::SPACE) {
+      pending_space += measure_range(token.begin, token.end);
+      continue;
+    }
+
+    double w = measure_range(token.begin, token.end);
+    if (has_word && line_width + pending_space + w > width) {
+      push_line();
+      line_begin = token.begin;
+    }
+    if (has_word || line_begin < token.begin) {
+      line_width += pending_space;
+    }
+    pending_space = 0.0;
+
+    if (line_width + w <= width) {
+      line_width += w;
+      line_end = token.end;
+      has_word = true;
+      continue;
+    }
+
+    // 1 語で width を超える場合は文字単位で分割する
+    size_t pos = token.begin;
+    while (pos < token.end) {
+      size_t begin = pos;
+      next_codepoint(text, pos);
+      double cw = measure_range(begin, pos);
+      if (has_word && line_width + cw > width) {
+        push_line();
+        line_begin = begin;
+      }
+      line_width += cw;
+      line_end = pos;
+      has_word = true;
+    }
+  }
+  push_line();
+  return lines;
+}
+
+// テキストのアウトラインを Path として返す。
+// グリフごとのアウトラインをキャッシュし、整形結果の配置に従って並べる
+PyPath PyFont::get_text_outlines(const std::string& text, double x, double y) {
+  std::shared_ptr<const ShapedText> shaped = shape_cached(text);
+  PyPath result;
+  nb::gil_scoped_release release;
+
+  BLGlyphRun run = shaped->buffer.glyph_run();
+  BLResult r = BL_SUCCESS;
+  if (run.placement_type != BL_GLYPH_PLACEMENT_TYPE_ADVANCE_OFFSET) {
+    // 整形結果以外の配置形式はキャッシュを使わずに Blend2D に任せる
+    BLMatrix2D m(1.0, 0.0, 0.0, 1.0, x, y);
+    r = font.get_glyph_run_outlines(run, m, result.path);
+  } else {
+    // 配置は design units なので、フォント行列で user units に変換する
+    const BLFontMatrix& fm = font.matrix();
+    const uint8_t* glyph_data = static_cast<const uint8_t*>(run.glyph_data);
+    const uint8_t* placement_data = static_cast<const uint8_t*>(run.placement_data);
+    BLPointI pen{0, 0};
+    BLMatrix2D identity = BLMatrix2D::make_identity();
+
+    std::lock_guard<std::mutex> lock(outline_cache_mutex);
+    for (size_t i = 0; i < run.size && r == BL_SUCCESS; i++) {
+      uint32_t glyph_id = *reinterpret_cast<const uint32_t*>(glyph_data + i * run.glyph_advance);
+      const BLGlyphPlacement& placement = *reinterpret_cast<const BLGlyphPlacement*>(
+          placement_data + i * run.placement_advance);
+
+      auto it = outline_cache.find(glyph_id);
+      if (it == outline_cache.end()) {
+        BLPath outline;
+        r = font.get_glyph_outlines(glyph_id, identity, outline);
+        if (r != BL_SUCCESS) {
+          break;
+        }
+        it = outline_cache.emplace(glyph_id, outline).first;
+      }
+
+      double px = pen.x + placement.placement.x;
+      double py = pen.y + placement.placement.y;
+      BLPoint origin(x + px * fm.m00 + py * fm.m10, y + px * fm.m01 + py * fm.m11);
+      r = result.path.add_path(it->second, origin);
+      pen.x += placement.advance.x;
+      pen.y += placement.advance.y;
+    }
+  }
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFont.get_glyph_outlines failed: " + std::to_string(r));
+  }
+  return result;
+}
+
+size_t PyFont::outline_cache_size() {
+  std::lock_guard<std::mutex> lock(outline_cache_mutex);
+  return outline_cache.size();
+}
+
+void PyFont::clear_outline_cache() {
+  std::lock_guard<std::mutex> lock(outline_cache_mutex);
+  outline_cache.clear();
+}
+
+// PyGlyphRun 実装
+PyGlyphRun::PyGlyphRun(PyFont& font, const std::string& text)
+    : font(font.font), shaped(font.shape_cached(text)) {}
+
+const std::string& PyGlyphRun::text() const {
+  return shaped->text;
+}
+
+size_t PyGlyphRun::size() const {
+  return shaped->buffer.size();
+}
+
+double PyGlyphRun::advance() const {
+  return shaped->metrics.advance.x;
+}
+
+// PyFontManager 実装
+PyFontManager::PyFontManager() {
+  BLResult r = manager.create();
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontManager.create failed: " + std::to_string(r));
+  }
+}
+
+// プロセス全体で共有するフォントマネージャー。終了時の解放順の問題を避けるため破棄しない
+PyFontManager& PyFontManager::shared() {
+  static PyFontManager* instance = new PyFontManager();
+  return *instance;
+}
+
+static std::string canonical_font_path(const std::string& filename) {
+  std::error_code ec;
+  std::filesystem::path path = std::filesystem::weakly_canonical(filename, ec);
+  return ec ? filename : path.string();
+}
+
+// キャッシュになければフォントファイルを読み込んでフェイスを作成する。GIL を解放した状態で呼び出す。
+// 読み込み中はロックを保持しないため、別のファイルは並行して読み込める
+BLFontFace PyFontManager::load_cached(const std::string& filename,
+                                      uint32_t face_index,
+                                      BLFontData* data_out) {
+  auto key = std::make_pair(canonical_font_path(filename), face_index);
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = faces.find(key);
+    if (it != faces.end()) {
+      return it->second;
+    }
+  }
+
+  BLFontData data;
+  BLResult r = data.create_from_file(
+      key.first.c_str(), BLFileReadFlags(BL_FILE_READ_MMAP_ENABLED | BL_FILE_READ_MMAP_AVOID_SMALL));
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontData.create_from_file failed: " + std::to_string(r));
+  }
+  BLFontFace face;
+  r = face.create_from_data(data, face_index);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontFace.create_from_data failed: " + std::to_string(r));
+  }
+  if (data_out) {
+    *data_out = data;
+  }
+
+  std::lock_guard<std::mutex> lock(mutex);
+  // 読み込んでいる間に他のスレッドが同じフェイスを追加した場合はそちらを使う
+  auto [it, inserted] = faces.emplace(key, face);
+  if (inserted) {
+    r = manager.add_face(face);
+    if (r != BL_SUCCESS) {
+      // query で見つからないフェイスを load_face が返し続けないよう、キャッシュからも外す
+      faces.erase(it);
+      throw std::runtime_error("BLFontManager.add_face failed: " + std::to_string(r));
+    }
+  }
+  return it->second;
+}
+
+PyFontFace PyFontManager::load_face(const std::string& filename, uint32_t face_index) {
+  PyFontFace result;
+  nb::gil_scoped_release release;
+  result.face = load_cached(filename, face_index, nullptr);
+  return result;
+}
+
+// フォントコレクション (TTC) に含まれるすべてのフェイスを読み込む
+std::vector<PyFontFace> PyFontManager::load_faces(const std::string& filename) {
+  std::vector<PyFontFace> result;
+  nb::gil_scoped_release release;
+  BLFontData data;
+  result.emplace_back();
+  result.back().face = load_cached(filename, 0, &data);
+  // キャッシュから取得した場合は data が空なので、フェイス数を知るために読み込む
+  uint32_t count = data.face_count();
+  if (count == 0) {
+    BLResult r = data.create_from_file(
+        canonical_font_path(filename).c_str(),
+        BLFileReadFlags(BL_FILE_READ_MMAP_ENABLED | BL_FILE_READ_MMAP_AVOID_SMALL));
+    if (r != BL_SUCCESS) {
+      throw std::runtime_error("BLFontData.create_from_file failed: " + std::to_string(r));
+    }
+    count = data.face_count();
+  }
+  for (uint32_t i = 1; i < count; i++) {
+    result.emplace_back();
+    result.back().face = load_cached(filename, i, nullptr);
+  }
+  return result;
+}
+
+void PyFontManager::add_face(PyFontFace& face) {
+  BLFontFace f(face.face);
+  nb::gil_scoped_release release;
+  std::lock_guard<std::mutex> lock(mutex);
+  BLResult r = manager.add_face(f);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontManager.add_face failed: " + std::to_string(r));
+  }
+}
+
+// ファミリー名とウェイトに最も近いフェイスを返す。見つからない場合は None
+std::optional<PyFontFace> PyFontManager::query_face(const std::string& family, uint32_t weight) {
+  BLFontQueryProperties properties{};
+  properties.weight = weight;
+  PyFontFace result;
+  BLResult r;
+  {
+    nb::gil_scoped_release release;
+    std::lock_guard<std::mutex> lock(mutex);
+    r = manager.query_face(family.c_str(), result.face, &properties);
+  }
+  if (r != BL_SUCCESS) {
+    return std::nullopt;
+  }
+  return result;
+}
+
+size_t PyFontManager::face_count() {
+  std::lock_guard<std::mutex> lock(mutex);
+  return manager.face_count();
+}
+
+// キャッシュとマネージャーに登録したフェイスを破棄する。作成済みの FontFace / Font はそのまま使える
+void PyFontManager::clear() {
+  std::lock_guard<std::mutex> lock(mutex);
+  faces.clear();
+  BLFontManager fresh;
+  BLResult r = fresh.create();
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLFontManager.create failed: " + std::to_string(r));
+  }
+  manager = fresh;
+}
+
 // PyGradient 実装
 PyGradient::PyGradient() {}
 
@@ -93,242 +1140,2235 @@ void PyGradient::create_radial(double x0, double y0, double x1, double y1, doubl
   }
 }
 
-void PyGradient::create_conic(double x0, double y0, double angle, BLExtendMode extend_mode, double repeat) {
-  BLConicGradientValues values(x0, y0, angle, repeat);
-  BLResult r = gradient.create(values, extend_mode);
-  if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLGradient.create (conic) failed: " +
-                             std::to_string(r));
-  }
+void PyGradient::create_conic(double x0, double y0, double angle, BLExtendMode extend_mode, double repeat) {
+  BLConicGradientValues values(x0, y0, angle, repeat);
+  BLResult r = gradient.create(values, extend_mode);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLGradient.create (conic) failed: " +
+                             std::to_string(r));
+  }
+}
+
+void PyGradient::add_stop(double offset, uint32_t r, uint32_t g, uint32_t b, uint32_t a) {
+  BLRgba32 color((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a);
+  BLResult result = gradient.add_stop(offset, color);
+  if (result != BL_SUCCESS) {
+    throw std::runtime_error("BLGradient.add_stop failed: " +
+                             std::to_string(result));
+  }
+}
+
+void PyGradient::reset_stops() {
+  gradient.reset_stops();
+}
+
+size_t PyGradient::stop_count() const {
+  return gradient.size();
+}
+
+BLGradientType PyGradient::gradient_type() const {
+  return gradient.type();
+}
+
+BLExtendMode PyGradient::extend_mode() const {
+  return gradient.extend_mode();
+}
+
+// PyPattern 実装
+PyPattern::PyPattern() {}
+
+void PyPattern::create(PyImage& image, BLExtendMode extend_mode) {
+  BLResult r = pattern.create(image.img, extend_mode);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPattern.create failed: " +
+                             std::to_string(r));
+  }
+}
+
+void PyPattern::set_area(int x, int y, int w, int h) {
+  BLRectI area{x, y, w, h};
+  BLResult r = pattern.set_area(area);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPattern.set_area failed: " +
+                             std::to_string(r));
+  }
+}
+
+void PyPattern::reset_area() {
+  pattern.reset_area();
+}
+
+BLExtendMode PyPattern::extend_mode() const {
+  return pattern.extend_mode();
+}
+
+void PyPattern::set_extend_mode(BLExtendMode extend_mode) {
+  BLResult r = pattern.set_extend_mode(extend_mode);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPattern.set_extend_mode failed: " +
+                             std::to_string(r));
+  }
+}
+
+// 破線化のために曲線を分割した折れ線
+struct Polyline {
+  std::vector<BLPoint> points;
+  bool closed = false;
+};
+
+static double point_distance(const BLPoint& a, const BLPoint& b) {
+  return std::hypot(b.x - a.x, b.y - a.y);
+}
+
+// Wang の式で、誤差が tolerance 以内になる曲線の分割数を求める。
+// m は制御点の 2 階差分の最大長、factor は 2 次で 1/4、3 次で 3/4
+static size_t curve_segments(double m, double factor, double tolerance) {
+  double n = std::ceil(std::sqrt(factor * m / tolerance));
+  return (size_t)std::clamp(n, 1.0, 1024.0);
+}
+
+// パスを図形ごとの折れ線に分割する
+static std::vector<Polyline> flatten_path(const BLPath& path, double tolerance) {
+  std::vector<Polyline> out;
+  const uint8_t* cmd = path.command_data();
+  const BLPoint* v = path.vertex_data();
+  size_t n = path.size();
+
+  // MOVE なしで描画コマンドが続く場合は、直前の図形の始点から新しい図形を始める
+  auto current = [&](const BLPoint& fallback) -> Polyline& {
+    if (out.empty()) {
+      out.push_back(Polyline{{fallback}, false});
+    } else if (out.back().closed) {
+      out.push_back(Polyline{{out.back().points.front()}, false});
+    }
+    return out.back();
+  };
+
+  size_t i = 0;
+  while (i < n) {
+    switch (cmd[i]) {
+      case BL_PATH_CMD_MOVE:
+        out.push_back(Polyline{{v[i]}, false});
+        i += 1;
+        break;
+      case BL_PATH_CMD_ON:
+        current(v[i]).points.push_back(v[i]);
+        i += 1;
+        break;
+      case BL_PATH_CMD_QUAD: {
+        if (i + 1 >= n) {
+          i = n;
+          break;
+        }
+        Polyline& line = current(v[i]);
+        BLPoint p0 = line.points.back(), p1 = v[i], p2 = v[i + 1];
+        double m = std::hypot(p0.x - 2 * p1.x + p2.x, p0.y - 2 * p1.y + p2.y);
+        size_t segments = curve_segments(m, 0.25, tolerance);
+        for (size_t k = 1; k <= segments; k++) {
+          double t = (double)k / segments, mt = 1.0 - t;
+          line.points.push_back(BLPoint(mt * mt * p0.x + 2 * mt * t * p1.x + t * t * p2.x,
+                                        mt * mt * p0.y + 2 * mt * t * p1.y + t * t * p2.y));
+        }
+        i += 2;
+        break;
+      }
+      case BL_PATH_CMD_CONIC: {
+        // CONIC (制御点), WEIGHT (x が重み), ON (終点)
+        if (i + 2 >= n) {
+          i = n;
+          break;
+        }
+        Polyline& line = current(v[i]);
+        BLPoint p0 = line.points.back(), p1 = v[i], p2 = v[i + 2];
+        double w = v[i + 1].x;
+        double m = std::hypot(p0.x - 2 * p1.x + p2.x, p0.y - 2 * p1.y + p2.y);
+        size_t segments = curve_segments(m * std::max(w, 1.0), 0.25, tolerance);
+        for (size_t k = 1; k <= segments; k++) {
+          double t = (double)k / segments, mt = 1.0 - t;
+          double a = mt * mt, b = 2 * mt * t * w, c = t * t;
+          double d = a + b + c;
+          line.points.push_back(BLPoint((a * p0.x + b * p1.x + c * p2.x) / d,
+                                        (a * p0.y + b * p1.y + c * p2.y) / d));
+        }
+        i += 3;
+        break;
+      }
+      case BL_PATH_CMD_CUBIC: {
+        if (i + 2 >= n) {
+          i = n;
+          break;
+        }
+        Polyline& line = current(v[i]);
+        BLPoint p0 = line.points.back(), p1 = v[i], p2 = v[i + 1], p3 = v[i + 2];
+        double m = std::max(std::hypot(p0.x - 2 * p1.x + p2.x, p0.y - 2 * p1.y + p2.y),
+                            std::hypot(p1.x - 2 * p2.x + p3.x, p1.y - 2 * p2.y + p3.y));
+        size_t segments = curve_segments(m, 0.75, tolerance);
+        for (size_t k = 1; k <= segments; k++) {
+          double t = (double)k / segments, mt = 1.0 - t;
+          double a = mt * mt * mt, b = 3 * mt * mt * t, c = 3 * mt * t * t, d = t * t * t;
+          line.points.push_back(BLPoint(a * p0.x + b * p1.x + c * p2.x + d * p3.x,
+                                        a * p0.y + b * p1.y + c * p2.y + d * p3.y));
+        }
+        i += 3;
+        break;
+      }
+      case BL_PATH_CMD_CLOSE:
+        if (!out.empty()) {
+          out.back().closed = true;
+        }
+        i += 1;
+        break;
+      default:
+        i += 1;
+        break;
+    }
+  }
+  return out;
+}
+
+// 折れ線を dash の線の区間だけに分割して out に追加する。破線のパターンは図形ごとに先頭から始める
+static void dash_polyline(const Polyline& line,
+                          const std::vector<double>& dash,
+                          double offset,
+                          BLPath& out) {
+  std::vector<BLPoint> points = line.points;
+  if (line.closed && points.size() > 1 &&
+      (points.front().x != points.back().x || points.front().y != points.back().y)) {
+    points.push_back(points.front());
+  }
+  if (points.size() < 2) {
+    return;
+  }
+
+  double total = 0.0;
+  for (double d : dash) {
+    total += d;
+  }
+  double phase = std::fmod(offset, total);
+  if (phase < 0.0) {
+    phase += total;
+  }
+  size_t index = 0;
+  while (phase >= dash[index]) {
+    phase -= dash[index];
+    index = (index + 1) % dash.size();
+  }
+  double remaining = dash[index] - phase;
+  bool on = index % 2 == 0;
+  bool starts_on = on;
+  size_t transitions = 0;
+
+  std::vector<std::vector<BLPoint>> dashes;
+  std::vector<BLPoint> current;
+  if (on) {
+    current.push_back(points[0]);
+  }
+  for (size_t i = 1; i < points.size(); i++) {
+    const BLPoint& a = points[i - 1];
+    const BLPoint& b = points[i];
+    double length = point_distance(a, b);
+    double pos = 0.0;
+    while (length - pos > remaining) {
+      pos += remaining;
+      double t = pos / length;
+      BLPoint p(a.x + (b.x - a.x) * t, a.y + (b.y - a.y) * t);
+      current.push_back(p);
+      if (on) {
+        dashes.push_back(std::move(current));
+        current.clear();
+      }
+      on = !on;
+      transitions++;
+      index = (index + 1) % dash.size();
+      remaining = dash[index];
+    }
+    remaining -= length - pos;
+    if (on) {
+      current.push_back(b);
+    }
+  }
+
+  // 全体が線の区間の閉じた図形はそのまま閉じた図形として追加する
+  if (line.closed && transitions == 0 && on) {
+    out.add_polygon(points.data(), points.size() - 1);
+    return;
+  }
+  if (on && current.size() >= 2) {
+    dashes.push_back(std::move(current));
+  }
+  // 閉じた図形の始点をまたぐ線の区間は 1 本につなげる
+  if (line.closed && starts_on && on && dashes.size() >= 2) {
+    std::vector<BLPoint>& last = dashes.back();
+    last.insert(last.end(), dashes.front().begin() + 1, dashes.front().end());
+    dashes.front() = std::move(last);
+    dashes.pop_back();
+  }
+  for (const std::vector<BLPoint>& d : dashes) {
+    out.add_polyline(d.data(), d.size());
+  }
+}
+
+static void check_finite(double value, const char* name) {
+  if (!std::isfinite(value)) {
+    throw std::invalid_argument(std::string(name) + " must be finite");
+  }
+}
+
+// 破線のパターンとして使えるか。負の値がなく合計が正であること
+static bool is_valid_dash(const double* values, size_t n) {
+  double total = 0.0;
+  for (size_t i = 0; i < n; i++) {
+    if (!(values[i] >= 0.0) || !std::isfinite(values[i])) {
+      return false;
+    }
+    total += values[i];
+  }
+  return total > 0.0 && std::isfinite(total);
+}
+
+static void check_dash_array(const std::vector<double>& values) {
+  if (!values.empty() && !is_valid_dash(values.data(), values.size())) {
+    throw std::invalid_argument(
+        "dash_array values must be finite and not negative, with a positive sum");
+  }
+}
+
+// dash_array に NumPy の 1 次元配列とシーケンスの両方を受け付ける
+static std::vector<double> dash_values(nb::handle values) {
+  DashArray array;
+  if (nb::try_cast(values, array)) {
+    return std::vector<double>(array.data(), array.data() + array.shape(0));
+  }
+  return nb::cast<std::vector<double>>(values);
+}
+
+static BLArray<double> to_dash_array(const std::vector<double>& values) {
+  BLArray<double> array;
+  for (double v : values) {
+    array.append(v);
+  }
+  return array;
+}
+
+// src を破線化したパスを返す。dash は検証済み (負の値がなく合計が正) であること
+static BLPath dash_path(const BLPath& src,
+                        const std::vector<double>& dash,
+                        double offset,
+                        double tolerance) {
+  // 奇数個の場合は 2 回繰り返して線と隙間を交互にする (SVG と同じ)
+  std::vector<double> pattern = dash;
+  if (pattern.size() % 2 == 1) {
+    pattern.insert(pattern.end(), dash.begin(), dash.end());
+  }
+  BLPath out;
+  for (const Polyline& line : flatten_path(src, tolerance)) {
+    dash_polyline(line, pattern, offset, out);
+  }
+  return out;
+}
+
+// Blend2D のストロークは破線に対応していないため、Context に破線が設定されている場合は
+// 図形をパスにして破線化してからストロークする。GIL は不要
+static bool has_stroke_dash(const BLContext& ctx) {
+  const BLStrokeOptions& options = ctx.stroke_options();
+  // 破線の値は設定時に検証済みだが、不正な破線で dash_path がループしないよう念のため確認する
+  return !options.dash_array.empty() &&
+         is_valid_dash(options.dash_array.data(), options.dash_array.size());
+}
+
+template <typename... Style>
+static void stroke_path_dashed(BLContext& ctx, const BLPath& path, const Style&... style) {
+  const BLStrokeOptions& options = ctx.stroke_options();
+  std::vector<double> dash(options.dash_array.data(),
+                           options.dash_array.data() + options.dash_array.size());
+  BLPath dashed =
+      dash_path(path, dash, options.dash_offset, ctx.approximation_options().flatten_tolerance);
+  ctx.stroke_path(dashed, style...);
+}
+
+template <typename... Style>
+static void stroke_rect_with_dash(BLContext& ctx, const BLRect& rect, const Style&... style) {
+  if (!has_stroke_dash(ctx)) {
+    ctx.stroke_rect(rect, style...);
+    return;
+  }
+  BLPath path;
+  path.add_rect(rect);
+  stroke_path_dashed(ctx, path, style...);
+}
+
+template <typename... Style>
+static void stroke_circle_with_dash(BLContext& ctx, const BLCircle& circle, const Style&... style) {
+  if (!has_stroke_dash(ctx)) {
+    ctx.stroke_circle(circle, style...);
+    return;
+  }
+  BLPath path;
+  path.add_circle(circle);
+  stroke_path_dashed(ctx, path, style...);
+}
+
+static void stroke_path_with_dash(BLContext& ctx, const BLPath& path) {
+  if (has_stroke_dash(ctx)) {
+    stroke_path_dashed(ctx, path);
+  } else {
+    ctx.stroke_path(path);
+  }
+}
+
+// 2x3 の行列 [[m00, m10, m20], [m01, m11, m21]] を行ごとに並べた 6 要素から変換する。
+// NumPy 側では matrix @ (x, y, 1) が変換後の座標になる
+static BLMatrix2D to_matrix(const double* v) {
+  return BLMatrix2D(v[0], v[3], v[1], v[4], v[2], v[5]);
+}
+
+// PyStrokeOptions 実装
+PyStrokeOptions::PyStrokeOptions(double width,
+                                 BLStrokeJoin join,
+                                 BLStrokeCap start_cap,
+                                 BLStrokeCap end_cap,
+                                 double miter_limit,
+                                 const std::vector<double>& dash_array,
+                                 double dash_offset)
+    : start_cap(start_cap), end_cap(end_cap), join(join) {
+  set_width(width);
+  set_miter_limit(miter_limit);
+  set_dash_array(dash_array);
+  set_dash_offset(dash_offset);
+}
+
+void PyStrokeOptions::set_width(double value) {
+  if (!(value >= 0.0)) {
+    throw std::invalid_argument("width must not be negative");
+  }
+  width = value;
+}
+
+void PyStrokeOptions::set_miter_limit(double value) {
+  check_finite(value, "miter_limit");
+  miter_limit = value;
+}
+
+void PyStrokeOptions::set_dash_offset(double value) {
+  check_finite(value, "dash_offset");
+  dash_offset = value;
+}
+
+void PyStrokeOptions::set_caps(BLStrokeCap cap) {
+  start_cap = cap;
+  end_cap = cap;
+}
+
+void PyStrokeOptions::set_dash_array(const std::vector<double>& values) {
+  check_dash_array(values);
+  dash_array = values;
+}
+
+// 破線以外の設定を BLStrokeOptions に変換する
+BLStrokeOptions PyStrokeOptions::to_stroke_options() const {
+  BLStrokeOptions options;
+  options.width = width;
+  options.miter_limit = miter_limit;
+  options.start_cap = (uint8_t)start_cap;
+  options.end_cap = (uint8_t)end_cap;
+  options.join = (uint8_t)join;
+  return options;
+}
+
+// src をストロークした輪郭を out に追加する。GIL は不要
+BLResult PyStrokeOptions::stroke(const BLPath& src, BLPath& out) const {
+  const BLApproximationOptions& approx = bl_default_approximation_options;
+  BLStrokeOptions options = to_stroke_options();
+  if (dash_array.empty()) {
+    return out.add_stroked_path(src, options, approx);
+  }
+  BLPath dashed = dash_path(src, dash_array, dash_offset, approx.flatten_tolerance);
+  return out.add_stroked_path(dashed, options, approx);
+}
+
+// PyPath 実装
+void PyPath::move_to(double x, double y) {
+  path.move_to(x, y);
+}
+
+void PyPath::line_to(double x, double y) {
+  path.line_to(x, y);
+}
+
+void PyPath::quad_to(double x1, double y1, double x2, double y2) {
+  path.quad_to(x1, y1, x2, y2);
+}
+
+void PyPath::cubic_to(double x1, double y1, double x2, double y2, double x3, double y3) {
+  path.cubic_to(x1, y1, x2, y2, x3, y3);
+}
+
+void PyPath::smooth_quad_to(double x2, double y2) {
+  path.smooth_quad_to(x2, y2);
+}
+
+void PyPath::smooth_cubic_to(double x2, double y2, double x3, double y3) {
+  path.smooth_cubic_to(x2, y2, x3, y3);
+}
+
+void PyPath::arc_to(double cx, double cy, double rx, double ry, double start, double sweep, bool force_move_to) {
+  path.arc_to(cx, cy, rx, ry, start, sweep, force_move_to);
+}
+
+void PyPath::elliptic_arc_to(double rx, double ry, double x_axis_rotation, bool large_arc_flag, bool sweep_flag, double x, double y) {
+  path.elliptic_arc_to(rx, ry, x_axis_rotation, large_arc_flag, sweep_flag, x, y);
+}
+
+void PyPath::close() {
+  path.close();
+}
+
+// (N, 2) の C 連続 float64 は BLPoint の配列と同じメモリレイアウト
+void PyPath::add_polyline(PointArray points) {
+  BLResult r = path.add_polyline(reinterpret_cast<const BLPoint*>(points.data()),
+                                 points.shape(0));
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPath.add_polyline failed: " + std::to_string(r));
+  }
+}
+
+void PyPath::add_polygon(PointArray points) {
+  BLResult r = path.add_polygon(reinterpret_cast<const BLPoint*>(points.data()),
+                                points.shape(0));
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPath.add_polygon failed: " + std::to_string(r));
+  }
+}
+
+// src をストロークした輪郭を追加する。追加したパスは fill_path で塗りつぶせるため、
+// 毎フレーム同じ線をストロークする代わりに 1 度だけ輪郭を求めて使い回せる
+void PyPath::add_stroked_path(const PyPath& src, const PyStrokeOptions& options) {
+  BLPath source(src.path);
+  PyStrokeOptions stroke_options(options);
+  BLPath stroked;
+  BLResult r;
+  {
+    nb::gil_scoped_release release;
+    r = stroke_options.stroke(source, stroked);
+  }
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPath.add_stroked_path failed: " + std::to_string(r));
+  }
+  r = path.add_path(stroked);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPath.add_path failed: " + std::to_string(r));
+  }
+}
+
+// コマンド列が Blend2D のパスとして正しい並びか確認する。
+// 先頭は MOVE、QUAD は ON、CUBIC は CUBIC, ON、CONIC は WEIGHT, ON が続くこと
+static void check_path_commands(const uint8_t* cmd, size_t n) {
+  auto fail = [&](size_t i, const char* reason) {
+    throw std::invalid_argument("invalid path command at index " + std::to_string(i) + " (" +
+                                std::to_string(cmd[i]) + "): " + reason);
+  };
+  auto expect = [&](size_t i, size_t k, uint8_t expected, const char* reason) {
+    if (i + k >= n || cmd[i + k] != expected) {
+      fail(i, reason);
+    }
+  };
+  if (n > 0 && cmd[0] != BL_PATH_CMD_MOVE) {
+    fail(0, "path must start with MOVE");
+  }
+  size_t i = 0;
+  while (i < n) {
+    switch (cmd[i]) {
+      case BL_PATH_CMD_MOVE:
+      case BL_PATH_CMD_ON:
+      case BL_PATH_CMD_CLOSE:
+        i += 1;
+        break;
+      case BL_PATH_CMD_QUAD:
+        expect(i, 1, BL_PATH_CMD_ON, "QUAD must be followed by ON");
+        i += 2;
+        break;
+      case BL_PATH_CMD_CUBIC:
+        expect(i, 1, BL_PATH_CMD_CUBIC, "CUBIC must be followed by CUBIC, ON");
+        expect(i, 2, BL_PATH_CMD_ON, "CUBIC must be followed by CUBIC, ON");
+        i += 3;
+        break;
+      case BL_PATH_CMD_CONIC:
+        expect(i, 1, BL_PATH_CMD_WEIGHT, "CONIC must be followed by WEIGHT, ON");
+        expect(i, 2, BL_PATH_CMD_ON, "CONIC must be followed by WEIGHT, ON");
+        i += 3;
+        break;
+      case BL_PATH_CMD_WEIGHT:
+        fail(i, "WEIGHT must follow CONIC");
+        break;
+      default:
+        fail(i, "unknown command");
+        break;
+    }
+  }
+}
+
+PyPath PyPath::from_arrays(CommandArray commands, PointArray vertices) {
+  size_t n = commands.shape(0);
+  if (vertices.shape(0) != n) {
+    throw std::invalid_argument("commands and vertices must have the same length: " +
+                                std::to_string(n) + " != " +
+                                std::to_string(vertices.shape(0)));
+  }
+  const uint8_t* cmd = commands.data();
+  check_path_commands(cmd, n);
+
+  PyPath result;
+  uint8_t* cmd_out = nullptr;
+  BLPoint* vertex_out = nullptr;
+  BLResult r = result.path.modify_op(BL_MODIFY_OP_ASSIGN_FIT, n, &cmd_out, &vertex_out);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLPath.modify_op failed: " + std::to_string(r));
+  }
+  std::memcpy(cmd_out, cmd, n);
+  std::memcpy(vertex_out, vertices.data(), n * sizeof(BLPoint));
+  return result;
+}
+
+size_t PyPath::size() const {
+  return path.size();
+}
+
+// ビューは参照カウント付きでコピーした BLPath を所有する。
+// 元の Path を変更すると copy-on-write で別のバッファに書き込まれるため、ビューの内容は変わらない
+static nb::capsule path_snapshot(const BLPath& path, BLPath** out) {
+  BLPath* snapshot = new BLPath(path);
+  *out = snapshot;
+  return nb::capsule(snapshot, [](void* p) noexcept { delete static_cast<BLPath*>(p); });
+}
+
+nb::ndarray<nb::numpy, const uint8_t, nb::shape<-1>> PyPath::command_data() const {
+  BLPath* snapshot = nullptr;
+  nb::capsule owner = path_snapshot(path, &snapshot);
+  size_t shape[1] = {snapshot->size()};
+  return nb::ndarray<nb::numpy, const uint8_t, nb::shape<-1>>(
+      (void*)snapshot->command_data(), 1, shape, owner);
+}
+
+nb::ndarray<nb::numpy, const double, nb::shape<-1, 2>> PyPath::vertex_data() const {
+  BLPath* snapshot = nullptr;
+  nb::capsule owner = path_snapshot(path, &snapshot);
+  size_t shape[2] = {snapshot->size(), 2};
+  return nb::ndarray<nb::numpy, const double, nb::shape<-1, 2>>(
+      (void*)snapshot->vertex_data(), 2, shape, owner);
+}
+
+// DrawContext 実装
+// 描画メソッドは ContextGuard で GIL を解放してから Blend2D を呼び出す。
+// Path / Gradient / Pattern / Font は GIL を保持している間に参照カウント付きでコピーしておき、
+// 描画中に他のスレッドから変更されても影響を受けないようにする。
+DrawContext::DrawContext(PyImage* img, uint32_t thread_count) {
+  create_info.thread_count = thread_count;
+  if (img) {
+    begin(*img);
+  }
+}
+
+DrawContext::~DrawContext() {
+  {
+    std::lock_guard<std::mutex> lock(completion_mutex);
+    completion_stopping = true;
+  }
+  completion_cv.notify_all();
+  // 完了待ちスレッドは GIL を取得して Future を完了させるため、GIL を解放して待つ
+  if (completion.joinable()) {
+    nb::gil_scoped_release release;
+    completion.join();
+  }
+  nb::object released_ref;
+  detach(released_ref);
+}
+
+// 描画先から外れる。mutex を保持した状態で呼び出す。
+// 描画先の Image の参照は released_ref に移すので、呼び出し側が GIL を再取得した後に解放する
+void DrawContext::detach(nb::object& released_ref) {
+  if (!ended) {
+    drop_layers();
+    ctx.end();
+    recycle_layers();
+    ended = true;
+    if (target)
+      target->attached.store(false);
+    target = nullptr;
+  }
+  // ポインタを入れ替えるだけなので GIL は不要
+  std::swap(image_ref, released_ref);
+}
+
+// 同じ Image に対して begin した場合は BLContext を作り直さずに reset と同じ処理を行う。
+// ワーカースレッドや内部バッファを保持したまま次のフレームを描画できる
+void DrawContext::begin(PyImage& img) {
+  nb::object ref = nb::find(&img);
+  // 前の描画先の参照。ContextGuard が GIL を再取得した後に解放される
+  nb::object released_ref;
+  {
+    ContextGuard guard(mutex);
+    if (!ended && target == &img) {
+      drop_layers();
+      ctx.flush(BL_CONTEXT_FLUSH_SYNC);
+      recycle_layers();
+      ctx.restore(cookie);
+      apply_profile(ctx);
+      ctx.save(cookie);
+      img.generation.fetch_add(1);
+      return;
+    }
+
+    if (img.attached.exchange(true)) {
+      throw std::runtime_error("Image is already attached to another Context");
+    }
+    detach(released_ref);
+    BLResult r = ctx.begin(img.img, create_info);
+    if (r != BL_SUCCESS) {
+      img.attached.store(false);
+      target = nullptr;
+      throw std::runtime_error("BLContext.begin failed: " + std::to_string(r));
+    }
+    target = &img;
+    ended = false;
+    img.generation.fetch_add(1);
+    default_hints = ctx.hints();
+    default_flatten_tolerance = ctx.approximation_options().flatten_tolerance;
+    // プロファイルを適用してから cookie を取るため、reset 後もプロファイルが残る
+    apply_profile(ctx);
+    ctx.save(cookie);
+    // ポインタを入れ替えるだけなので GIL は不要
+    std::swap(image_ref, ref);
+  }
+}
+
+void DrawContext::reset() {
+  ContextGuard guard(mutex);
+  if (ended) {
+    throw std::runtime_error("Context is not attached to an Image");
+  }
+  drop_layers();
+  ctx.flush(BL_CONTEXT_FLUSH_SYNC);
+  recycle_layers();
+  ctx.restore(cookie);
+  apply_profile(ctx);
+  ctx.save(cookie);
+  target->generation.fetch_add(1);
+}
+
+void DrawContext::end() {
+  // end 後も描画先の Image を保持し続けないよう参照を外す。解放は GIL を再取得した後に行う
+  nb::object released_ref;
+  {
+    ContextGuard guard(mutex);
+    detach(released_ref);
+  }
+}
+
+void DrawContext::flush(bool sync) {
+  ContextGuard guard(mutex);
+  if (ended) {
+    throw std::runtime_error("Context is not attached to an Image");
+  }
+  BLResult r = root_context().flush(sync ? BL_CONTEXT_FLUSH_SYNC : BL_CONTEXT_FLUSH_NO_FLAGS);
+  if (r != BL_SUCCESS) {
+    throw std::runtime_error("BLContext.flush failed: " + std::to_string(r));
+  }
+  if (sync) {
+    recycle_layers();
+  }
+}
+
+// 完了待ちスレッドで描画完了 (BL_CONTEXT_FLUSH_SYNC) を待ち、完了したら Future に結果を設定する。
+// 待っている間も呼び出し側のスレッドは他の処理を続けられる
+nb::object DrawContext::flush_future() {
+  {
+    ContextGuard guard(mutex);
+    if (ended) {
+      throw std::runtime_error("Context is not attached to an Image");
+    }
+  }
+  nb::object future = nb::module_::import_("concurrent.futures").attr("Future")();
+  future.attr("set_running_or_notify_cancel")();
+
+  // Future の参照は GIL を保持しているスレッドでしか操作できないため、生ポインタで渡す
+  PyObject* future_ptr = future.inc_ref().ptr();
+  {
+    // 完了待ちスレッドは completion_mutex を保持したまま GIL や mutex を待たないため、
+    // GIL を保持したまま取得してよい
+    std::lock_guard<std::mutex> lock(completion_mutex);
+    completion_queue.push_back(future_ptr);
+    if (!completion.joinable()) {
+      completion = std::thread([this] { completion_main(); });
+    }
+  }
+  completion_cv.notify_one();
+  return future;
+}
+
+// キューに溜まった Future をまとめて 1 回の flush で完了させる
+void DrawContext::completion_main() {
+  std::unique_lock<std::mutex> lock(completion_mutex);
+  for (;;) {
+    completion_cv.wait(lock, [this] { return completion_stopping || !completion_queue.empty(); });
+    if (completion_queue.empty()) {
+      return;
+    }
+    std::vector<PyObject*> futures;
+    futures.swap(completion_queue);
+    lock.unlock();
+
+    BLResult r;
+    {
+      std::lock_guard<std::mutex> guard(mutex);
+      r = ended ? BL_SUCCESS : root_context().flush(BL_CONTEXT_FLUSH_SYNC);
+      if (r == BL_SUCCESS && !ended) {
+        recycle_layers();
+      }
+    }
+    if (Py_IsInitialized()) {
+      nb::gil_scoped_acquire acquire;
+      for (PyObject* future_ptr : futures) {
+        nb::object f = nb::steal(future_ptr);
+        try {
+          if (r == BL_SUCCESS) {
+            f.attr("set_result")(nb::none());
+          } else {
+            nb::object error = nb::module_::import_("builtins").attr("RuntimeError")(
+                "BLContext.flush failed: " + std::to_string(r));
+            f.attr("set_exception")(error);
+          }
+        } catch (nb::python_error& e) {
+          e.discard_as_unraisable("blend2d.Context.flush_future");
+        }
+      }
+    }
+    lock.lock();
+  }
+}
+
+nb::object DrawContext::finish_async() {
+  return nb::module_::import_("asyncio").attr("wrap_future")(flush_future());
+}
+
+void DrawContext::save() {
+  StateGuard guard(mutex);
+  ctx.save();
+}
+
+void DrawContext::restore() {
+  StateGuard guard(mutex);
+  ctx.restore();
+}
+
+void DrawContext::set_comp_op(BLCompOp op) {
+  StateGuard guard(mutex);
+  ctx.set_comp_op(op);
+}
+
+void DrawContext::set_fill_style_rgba(uint32_t r,
+                                      uint32_t g,
+                                      uint32_t b,
+                                      uint32_t a) {
+  StateGuard guard(mutex);
+  ctx.set_fill_style(BLRgba32((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a));
+}
+
+void DrawContext::set_fill_style_gradient(PyGradient& gradient) {
+  BLGradient style(gradient.gradient);
+  StateGuard guard(mutex);
+  ctx.set_fill_style(style);
+}
+
+void DrawContext::set_fill_style_pattern(PyPattern& pattern) {
+  BLPattern style(pattern.pattern);
+  StateGuard guard(mutex);
+  ctx.set_fill_style(style);
+}
+
+void DrawContext::set_stroke_style_rgba(uint32_t r,
+                                        uint32_t g,
+                                        uint32_t b,
+                                        uint32_t a) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_style(BLRgba32((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a));
+}
+
+void DrawContext::set_stroke_style_gradient(PyGradient& gradient) {
+  BLGradient style(gradient.gradient);
+  StateGuard guard(mutex);
+  ctx.set_stroke_style(style);
+}
+
+void DrawContext::set_stroke_style_pattern(PyPattern& pattern) {
+  BLPattern style(pattern.pattern);
+  StateGuard guard(mutex);
+  ctx.set_stroke_style(style);
+}
+
+void DrawContext::set_stroke_width(double width) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_width(width);
+}
+
+void DrawContext::set_stroke_miter_limit(double miter_limit) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_miter_limit(miter_limit);
+}
+
+void DrawContext::set_stroke_join(BLStrokeJoin stroke_join) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_join(stroke_join);
+}
+
+void DrawContext::set_stroke_caps(BLStrokeCap stroke_cap) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_caps(stroke_cap);
+}
+
+void DrawContext::set_stroke_options(PyStrokeOptions& options) {
+  BLStrokeOptions stroke_options = options.to_stroke_options();
+  stroke_options.dash_offset = options.dash_offset;
+  stroke_options.dash_array = to_dash_array(options.dash_array);
+  StateGuard guard(mutex);
+  ctx.set_stroke_options(stroke_options);
+}
+
+void DrawContext::set_stroke_dash_array(const std::vector<double>& values) {
+  check_dash_array(values);
+  BLArray<double> dash_array = to_dash_array(values);
+  StateGuard guard(mutex);
+  ctx.set_stroke_dash_array(dash_array);
+}
+
+// 破線のパターンを保ったまま開始位置だけを変える。破線を流すアニメーションで毎フレーム呼び出す
+void DrawContext::set_stroke_dash_offset(double offset) {
+  StateGuard guard(mutex);
+  ctx.set_stroke_dash_offset(offset);
+}
+
+PyStrokeOptions DrawContext::stroke_options() {
+  BLStrokeOptions options;
+  {
+    StateGuard guard(mutex);
+    options = ctx.stroke_options();
+  }
+  std::vector<double> dash(options.dash_array.data(),
+                           options.dash_array.data() + options.dash_array.size());
+  return PyStrokeOptions(options.width, (BLStrokeJoin)options.join,
+                         (BLStrokeCap)options.start_cap, (BLStrokeCap)options.end_cap,
+                         options.miter_limit, dash, options.dash_offset);
+}
+
+static void check_alpha(double alpha) {
+  if (!(alpha >= 0.0 && alpha <= 1.0)) {
+    throw std::invalid_argument("alpha must be in [0, 1]");
+  }
+}
+
+void DrawContext::set_global_alpha(double alpha) {
+  check_alpha(alpha);
+  StateGuard guard(mutex);
+  ctx.set_global_alpha(alpha);
+}
+
+void DrawContext::set_fill_alpha(double alpha) {
+  check_alpha(alpha);
+  StateGuard guard(mutex);
+  ctx.set_fill_alpha(alpha);
+}
+
+void DrawContext::set_stroke_alpha(double alpha) {
+  check_alpha(alpha);
+  StateGuard guard(mutex);
+  ctx.set_stroke_alpha(alpha);
+}
+
+void DrawContext::set_fill_rule(BLFillRule fill_rule) {
+  StateGuard guard(mutex);
+  ctx.set_fill_rule(fill_rule);
+}
+
+void DrawContext::set_rendering_quality(BLRenderingQuality quality) {
+  StateGuard guard(mutex);
+  ctx.set_rendering_quality(quality);
+}
+
+void DrawContext::set_gradient_quality(BLGradientQuality quality) {
+  StateGuard guard(mutex);
+  ctx.set_gradient_quality(quality);
+}
+
+void DrawContext::set_pattern_quality(BLPatternQuality quality) {
+  StateGuard guard(mutex);
+  ctx.set_pattern_quality(quality);
+}
+
+void DrawContext::set_flatten_tolerance(double tolerance) {
+  if (!(tolerance > 0.0)) {
+    throw std::invalid_argument("tolerance must be positive");
+  }
+  StateGuard guard(mutex);
+  ctx.set_flatten_tolerance(tolerance);
+}
+
+BLRenderingQuality DrawContext::rendering_quality() {
+  StateGuard guard(mutex);
+  return ctx.rendering_quality();
+}
+
+BLGradientQuality DrawContext::gradient_quality() {
+  StateGuard guard(mutex);
+  return ctx.gradient_quality();
+}
+
+BLPatternQuality DrawContext::pattern_quality() {
+  StateGuard guard(mutex);
+  return ctx.pattern_quality();
+}
+
+double DrawContext::flatten_tolerance() {
+  StateGuard guard(mutex);
+  return ctx.approximation_options().flatten_tolerance;
+}
+
+// プレビューで曲線を平坦化する許容誤差 (ピクセル)。Blend2D のデフォルトより粗くして線分の数を減らす
+static constexpr double kPreviewFlattenTolerance = 0.5;
+
+// 描画品質をまとめて設定する。以降の begin / reset / begin_layer でも同じ設定を適用する
+void DrawContext::set_profile(RenderProfile new_profile) {
+  StateGuard guard(mutex);
+  profile = new_profile;
+  if (!ended) {
+    // レイヤーの描画中は退避している Context にも適用し、end_layer 後も設定を残す
+    apply_profile(ctx);
+    for (Layer& layer : layers) {
+      apply_profile(layer.parent);
+    }
+  }
+}
+
+// profile の描画品質を target_ctx に設定する。mutex を保持した状態で呼び出す
+void DrawContext::apply_profile(BLContext& target_ctx) {
+  target_ctx.set_rendering_quality((BLRenderingQuality)default_hints.rendering_quality);
+  switch (profile) {
+    case RenderProfile::DEFAULT:
+      target_ctx.set_gradient_quality((BLGradientQuality)default_hints.gradient_quality);
+      target_ctx.set_pattern_quality((BLPatternQuality)default_hints.pattern_quality);
+      target_ctx.set_flatten_tolerance(default_flatten_tolerance);
+      break;
+    case RenderProfile::PREVIEW:
+      target_ctx.set_gradient_quality(BL_GRADIENT_QUALITY_NEAREST);
+      target_ctx.set_pattern_quality(BL_PATTERN_QUALITY_NEAREST);
+      target_ctx.set_flatten_tolerance(kPreviewFlattenTolerance);
+      break;
+    case RenderProfile::QUALITY:
+      target_ctx.set_gradient_quality(BL_GRADIENT_QUALITY_DITHER);
+      target_ctx.set_pattern_quality(BL_PATTERN_QUALITY_BILINEAR);
+      target_ctx.set_flatten_tolerance(default_flatten_tolerance);
+      break;
+  }
+}
+
+// 再利用するレイヤーの上限
+static constexpr size_t kLayerPoolLimit = 4;
+
+// 以降の描画を描画先と同じサイズのオフスクリーン Image に向ける。
+// レイヤーの描画状態は初期状態から始まり、座標変換だけを引き継ぐ
+void DrawContext::begin_layer(double alpha, BLCompOp comp_op) {
+  check_alpha(alpha);
+  ContextGuard guard(mutex);
+  if (ended) {
+    throw std::runtime_error("Context is not attached to an Image");
+  }
+  int w = target->width;
+  int h = target->height;
+  LayerSurface surface;
+  auto it = std::find_if(layer_pool.begin(), layer_pool.end(), [&](const LayerSurface& s) {
+    return s.image.width() == w && s.image.height() == h;
+  });
+  if (it != layer_pool.end()) {
+    // reset と同じく描画状態を初期状態に戻して使い回す
+    surface = std::move(*it);
+    layer_pool.erase(it);
+    surface.ctx.restore(surface.cookie);
+  } else {
+    BLResult r = surface.image.create(w, h, BL_FORMAT_PRGB32);
+    if (r != BL_SUCCESS) {
+      throw std::runtime_error("BLImage.create failed: " + std::to_string(r));
+    }
+    r = surface.ctx.begin(surface.image, create_info);
+    if (r != BL_SUCCESS) {
+      throw std::runtime_error("BLContext.begin failed: " + std::to_string(r));
+    }
+  }
+  surface.ctx.clear_all();
+  apply_profile(surface.ctx);
+  surface.ctx.save(surface.cookie);
+  surface.ctx.set_transform(ctx.user_transform());
+  layers.push_back(Layer{std::move(ctx), surface.image, surface.cookie, alpha, comp_op});
+  ctx = std::move(surface.ctx);
+}
+
+// レイヤーの描画を完了させ、begin_layer の alpha と comp_op で元の Context に合成する
+void DrawContext::end_layer() {
+  ContextGuard guard(mutex);
+  if (layers.empty()) {
+    throw std::runtime_error("end_layer() called without begin_layer()");
+  }
+  Layer layer = std::move(layers.back());
+  layers.pop_back();
+  // Context は end せずに描画完了だけを待ち、次の begin_layer で使い回す
+  ctx.flush(BL_CONTEXT_FLUSH_SYNC);
+  LayerSurface surface{layer.image, std::move(ctx), layer.cookie};
+  ctx = std::move(layer.parent);
+
+  // オフスクリーン Image はデバイス座標で描画済みなので、座標変換を外して等倍で合成する
+  BLContextCookie layer_cookie;
+  ctx.save(layer_cookie);
+  ctx.reset_transform();
+  ctx.set_comp_op(layer.comp_op);
+  ctx.set_global_alpha(ctx.global_alpha() * layer.alpha);
+  ctx.blit_image(BLPoint(0, 0), layer.image);
+  ctx.restore(layer_cookie);
+  release_layer(std::move(surface));
+}
+
+// 合成済みのレイヤーを返却する。mutex を保持した状態で呼び出す。
+// マルチスレッドの Context は blit_image を非同期に実行するため、合成の完了前に再利用すると
+// 合成前に Image が書き換わる。描画先の Context の描画完了を待つ recycle_layers まで再利用しない
+void DrawContext::release_layer(LayerSurface surface) {
+  std::vector<LayerSurface>& dst = create_info.thread_count == 0 ? layer_pool : released_layers;
+  if (dst.size() < kLayerPoolLimit) {
+    dst.push_back(std::move(surface));
+  }
+}
+
+// 描画先の Context の描画完了を待った後に呼び出し、返却されたレイヤーを再利用できるようにする。
+// mutex を保持した状態で呼び出す。途中のレイヤーへの合成は完了していない可能性があるため、
+// レイヤーの描画中は何もしない
+void DrawContext::recycle_layers() {
+  if (!layers.empty()) {
+    return;
+  }
+  for (LayerSurface& surface : released_layers) {
+    if (layer_pool.size() >= kLayerPoolLimit) {
+      break;
+    }
+    layer_pool.push_back(std::move(surface));
+  }
+  released_layers.clear();
+}
+
+size_t DrawContext::layer_depth() {
+  StateGuard guard(mutex);
+  return layers.size();
+}
+
+// 描画先の Image に描画する Context。mutex を保持した状態で呼び出す
+BLContext& DrawContext::root_context() {
+  return layers.empty() ? ctx : layers.front().parent;
+}
+
+// 合成していないレイヤーを破棄して描画先の Context に戻す。mutex を保持した状態で呼び出す
+void DrawContext::drop_layers() {
+  if (layers.empty()) {
+    return;
+  }
+  ctx.end();
+  for (size_t i = layers.size() - 1; i > 0; i--) {
+    layers[i].parent.end();
+  }
+  ctx = std::move(layers.front().parent);
+  layers.clear();
+}
+
+void DrawContext::translate(double x, double y) {
+  StateGuard guard(mutex);
+  ctx.translate(x, y);
+}
+
+void DrawContext::rotate(double rad) {
+  StateGuard guard(mutex);
+  ctx.rotate(rad);
+}
+
+void DrawContext::scale(double x, double y) {
+  StateGuard guard(mutex);
+  ctx.scale(x, y);
+}
+
+void DrawContext::set_transform(TransformArray m) {
+  BLMatrix2D matrix = to_matrix(m.data());
+  StateGuard guard(mutex);
+  ctx.set_transform(matrix);
+}
+
+// 現在の変換の前に m を適用する (translate / rotate と同じ順序)
+void DrawContext::apply_transform(TransformArray m) {
+  BLMatrix2D matrix = to_matrix(m.data());
+  StateGuard guard(mutex);
+  ctx.apply_transform(matrix);
+}
+
+void DrawContext::reset_transform() {
+  StateGuard guard(mutex);
+  ctx.reset_transform();
+}
+
+nb::ndarray<nb::numpy, double, nb::shape<2, 3>> DrawContext::user_transform() {
+  BLMatrix2D m;
+  {
+    StateGuard guard(mutex);
+    m = ctx.user_transform();
+  }
+  double* data = new double[6]{m.m00, m.m10, m.m20, m.m01, m.m11, m.m21};
+  nb::capsule owner(data, [](void* p) noexcept { delete[] static_cast<double*>(p); });
+  size_t shape[2] = {2, 3};
+  return nb::ndarray<nb::numpy, double, nb::shape<2, 3>>(data, 2, shape, owner);
+}
+
+void DrawContext::fill_all() {
+  ContextGuard guard(mutex);
+  ctx.fill_all();
+}
+
+void DrawContext::fill_rect(double x, double y, double w, double h) {
+  ContextGuard guard(mutex);
+  ctx.fill_rect(BLRect(x, y, w, h));
+}
+
+void DrawContext::fill_circle(double cx, double cy, double r) {
+  ContextGuard guard(mutex);
+  ctx.fill_circle(BLCircle(cx, cy, r));
+}
+
+void DrawContext::fill_pie(double cx,
+                           double cy,
+                           double r,
+                           double start,
+                           double sweep) {
+  ContextGuard guard(mutex);
+  ctx.fill_pie(cx, cy, r, start, sweep);
+}
+
+void DrawContext::fill_path(PyPath& p) {
+  BLPath path(p.path);
+  ContextGuard guard(mutex);
+  ctx.fill_path(path);
+}
+
+void DrawContext::fill_utf8_text(double x,
+                                  double y,
+                                  PyFont& font,
+                                  const std::string& text) {
+  BLFont f(font.font);
+  // 同じテキストは Font のキャッシュから整形済みのグリフ列を使う
+  std::shared_ptr<const ShapedText> shaped = font.shape_cached(text);
+  ContextGuard guard(mutex);
+  ctx.fill_glyph_run(BLPoint(x, y), f, shaped->buffer.glyph_run());
+}
+
+void DrawContext::fill_glyph_run(double x, double y, PyGlyphRun& glyph_run) {
+  BLFont f(glyph_run.font);
+  std::shared_ptr<const ShapedText> shaped = glyph_run.shaped;
+  ContextGuard guard(mutex);
+  ctx.fill_glyph_run(BLPoint(x, y), f, shaped->buffer.glyph_run());
+}
+
+void DrawContext::stroke_rect(double x, double y, double w, double h) {
+  ContextGuard guard(mutex);
+  stroke_rect_with_dash(ctx, BLRect(x, y, w, h));
+}
+
+void DrawContext::stroke_circle(double cx, double cy, double r) {
+  ContextGuard guard(mutex);
+  stroke_circle_with_dash(ctx, BLCircle(cx, cy, r));
+}
+
+void DrawContext::stroke_path(PyPath& p) {
+  BLPath path(p.path);
+  ContextGuard guard(mutex);
+  stroke_path_with_dash(ctx, path);
+}
+
+void DrawContext::clip_to_rect(double x, double y, double w, double h) {
+  StateGuard guard(mutex);
+  ctx.clip_to_rect(BLRect(x, y, w, h));
+}
+
+void DrawContext::restore_clipping() {
+  StateGuard guard(mutex);
+  ctx.restore_clipping();
+}
+
+void DrawContext::clear_rect(double x, double y, double w, double h) {
+  ContextGuard guard(mutex);
+  ctx.clear_rect(BLRect(x, y, w, h));
+}
+
+void DrawContext::clear_all() {
+  ContextGuard guard(mutex);
+  ctx.clear_all();
+}
+
+// PyDisplayList 実装
+// 列挙型や色の数値引数は再生時に整数へ変換するため、範囲内の整数であること
+static void check_integer_param(double value, double max_value, const char* name) {
+  if (!(value >= 0.0 && value <= max_value && value == std::floor(value))) {
+    throw std::invalid_argument(std::string(name) + " must be an integer in [0, " +
+                                std::to_string((int)max_value) + "]: " + std::to_string(value));
+  }
+}
+
+// mutex を保持した状態で呼び出す
+DisplayData& PyDisplayList::mutable_data() {
+  // replay 中のスナップショットと共有している場合はコピーしてから変更する
+  if (data.use_count() > 1) {
+    data = std::make_shared<DisplayData>(*data);
+  }
+  return *data;
+}
+
+uint32_t PyDisplayList::record(DisplayOp op, std::initializer_list<double> values) {
+  std::lock_guard<std::mutex> lock(mutex);
+  return append(mutable_data(), op, values);
+}
+
+// 命令を 1 つ追加する。mutex を保持した状態で呼び出す
+uint32_t PyDisplayList::append(DisplayData& d,
+                               DisplayOp op,
+                               std::initializer_list<double> values,
+                               uint32_t resource) {
+  d.commands.push_back(
+      DisplayCommand{op, resource, (uint32_t)d.params.size(), (uint32_t)values.size()});
+  d.params.insert(d.params.end(), values);
+  return (uint32_t)(d.commands.size() - 1);
+}
+
+uint32_t PyDisplayList::save() {
+  return record(DisplayOp::SAVE, {});
+}
+
+uint32_t PyDisplayList::restore() {
+  return record(DisplayOp::RESTORE, {});
+}
+
+uint32_t PyDisplayList::set_comp_op(BLCompOp op) {
+  return record(DisplayOp::SET_COMP_OP, {(double)op});
+}
+
+uint32_t PyDisplayList::set_fill_style_rgba(uint32_t r, uint32_t g, uint32_t b, uint32_t a) {
+  for (uint32_t v : {r, g, b, a}) {
+    check_integer_param(v, 255, "rgba");
+  }
+  return record(DisplayOp::SET_FILL_STYLE_RGBA, {(double)r, (double)g, (double)b, (double)a});
+}
+
+uint32_t PyDisplayList::set_fill_style_gradient(PyGradient& gradient) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.gradients.push_back(gradient.gradient);
+  return append(d, DisplayOp::SET_FILL_STYLE_GRADIENT, {}, (uint32_t)(d.gradients.size() - 1));
+}
+
+uint32_t PyDisplayList::set_fill_style_pattern(PyPattern& pattern) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.patterns.push_back(pattern.pattern);
+  return append(d, DisplayOp::SET_FILL_STYLE_PATTERN, {}, (uint32_t)(d.patterns.size() - 1));
+}
+
+uint32_t PyDisplayList::set_stroke_style_rgba(uint32_t r, uint32_t g, uint32_t b, uint32_t a) {
+  for (uint32_t v : {r, g, b, a}) {
+    check_integer_param(v, 255, "rgba");
+  }
+  return record(DisplayOp::SET_STROKE_STYLE_RGBA, {(double)r, (double)g, (double)b, (double)a});
+}
+
+uint32_t PyDisplayList::set_stroke_style_gradient(PyGradient& gradient) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.gradients.push_back(gradient.gradient);
+  return append(d, DisplayOp::SET_STROKE_STYLE_GRADIENT, {}, (uint32_t)(d.gradients.size() - 1));
+}
+
+uint32_t PyDisplayList::set_stroke_style_pattern(PyPattern& pattern) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.patterns.push_back(pattern.pattern);
+  return append(d, DisplayOp::SET_STROKE_STYLE_PATTERN, {}, (uint32_t)(d.patterns.size() - 1));
+}
+
+uint32_t PyDisplayList::set_stroke_width(double width) {
+  return record(DisplayOp::SET_STROKE_WIDTH, {width});
+}
+
+uint32_t PyDisplayList::set_stroke_miter_limit(double miter_limit) {
+  check_finite(miter_limit, "miter_limit");
+  return record(DisplayOp::SET_STROKE_MITER_LIMIT, {miter_limit});
+}
+
+uint32_t PyDisplayList::set_stroke_join(BLStrokeJoin stroke_join) {
+  return record(DisplayOp::SET_STROKE_JOIN, {(double)stroke_join});
+}
+
+uint32_t PyDisplayList::set_stroke_caps(BLStrokeCap stroke_cap) {
+  return record(DisplayOp::SET_STROKE_CAPS, {(double)stroke_cap});
+}
+
+uint32_t PyDisplayList::set_global_alpha(double alpha) {
+  check_alpha(alpha);
+  return record(DisplayOp::SET_GLOBAL_ALPHA, {alpha});
+}
+
+uint32_t PyDisplayList::set_fill_alpha(double alpha) {
+  check_alpha(alpha);
+  return record(DisplayOp::SET_FILL_ALPHA, {alpha});
+}
+
+uint32_t PyDisplayList::set_stroke_alpha(double alpha) {
+  check_alpha(alpha);
+  return record(DisplayOp::SET_STROKE_ALPHA, {alpha});
+}
+
+uint32_t PyDisplayList::set_fill_rule(BLFillRule fill_rule) {
+  return record(DisplayOp::SET_FILL_RULE, {(double)fill_rule});
+}
+
+// 数値引数は width, miter_limit, start_cap, end_cap, join, dash_offset に続けて dash_array
+uint32_t PyDisplayList::set_stroke_options(PyStrokeOptions& options) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  uint32_t index = append(d, DisplayOp::SET_STROKE_OPTIONS,
+                          {options.width, options.miter_limit, (double)options.start_cap,
+                           (double)options.end_cap, (double)options.join, options.dash_offset});
+  d.params.insert(d.params.end(), options.dash_array.begin(), options.dash_array.end());
+  d.commands[index].count += (uint32_t)options.dash_array.size();
+  return index;
+}
+
+uint32_t PyDisplayList::set_stroke_dash_offset(double offset) {
+  check_finite(offset, "dash_offset");
+  return record(DisplayOp::SET_STROKE_DASH_OFFSET, {offset});
+}
+
+uint32_t PyDisplayList::translate(double x, double y) {
+  return record(DisplayOp::TRANSLATE, {x, y});
+}
+
+uint32_t PyDisplayList::rotate(double rad) {
+  return record(DisplayOp::ROTATE, {rad});
+}
+
+uint32_t PyDisplayList::scale(double x, double y) {
+  return record(DisplayOp::SCALE, {x, y});
+}
+
+// 数値引数は行列を行ごとに並べた m00, m10, m20, m01, m11, m21
+uint32_t PyDisplayList::apply_transform(TransformArray m) {
+  const double* v = m.data();
+  return record(DisplayOp::APPLY_TRANSFORM, {v[0], v[1], v[2], v[3], v[4], v[5]});
+}
+
+uint32_t PyDisplayList::fill_all() {
+  return record(DisplayOp::FILL_ALL, {});
+}
+
+uint32_t PyDisplayList::fill_rect(double x, double y, double w, double h) {
+  return record(DisplayOp::FILL_RECT, {x, y, w, h});
+}
+
+uint32_t PyDisplayList::fill_circle(double cx, double cy, double r) {
+  return record(DisplayOp::FILL_CIRCLE, {cx, cy, r});
+}
+
+uint32_t PyDisplayList::fill_pie(double cx, double cy, double r, double start, double sweep) {
+  return record(DisplayOp::FILL_PIE, {cx, cy, r, start, sweep});
+}
+
+uint32_t PyDisplayList::fill_path(PyPath& p) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.paths.push_back(p.path);
+  return append(d, DisplayOp::FILL_PATH, {}, (uint32_t)(d.paths.size() - 1));
+}
+
+uint32_t PyDisplayList::fill_utf8_text(double x,
+                                       double y,
+                                       PyFont& font,
+                                       const std::string& text) {
+  // 記録時に整形しておき、再生時は整形済みのグリフ列を描画する
+  std::shared_ptr<const ShapedText> shaped = font.shape_cached(text);
+  std::lock_guard<std::mutex> lock(mutex);
+  // fonts と texts は同じインデックスで対応させる
+  DisplayData& d = mutable_data();
+  d.fonts.push_back(font.font);
+  d.texts.push_back(std::move(shaped));
+  return append(d, DisplayOp::FILL_GLYPH_RUN, {x, y}, (uint32_t)(d.fonts.size() - 1));
+}
+
+uint32_t PyDisplayList::fill_glyph_run(double x, double y, PyGlyphRun& glyph_run) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.fonts.push_back(glyph_run.font);
+  d.texts.push_back(glyph_run.shaped);
+  return append(d, DisplayOp::FILL_GLYPH_RUN, {x, y}, (uint32_t)(d.fonts.size() - 1));
 }
 
-void PyGradient::add_stop(double offset, uint32_t r, uint32_t g, uint32_t b, uint32_t a) {
-  BLRgba32 color((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a);
-  BLResult result = gradient.add_stop(offset, color);
-  if (result != BL_SUCCESS) {
-    throw std::runtime_error("BLGradient.add_stop failed: " +
-                             std::to_string(result));
-  }
+uint32_t PyDisplayList::stroke_rect(double x, double y, double w, double h) {
+  return record(DisplayOp::STROKE_RECT, {x, y, w, h});
 }
 
-void PyGradient::reset_stops() {
-  gradient.reset_stops();
+uint32_t PyDisplayList::stroke_circle(double cx, double cy, double r) {
+  return record(DisplayOp::STROKE_CIRCLE, {cx, cy, r});
 }
 
-size_t PyGradient::stop_count() const {
-  return gradient.size();
+uint32_t PyDisplayList::stroke_path(PyPath& p) {
+  std::lock_guard<std::mutex> lock(mutex);
+  DisplayData& d = mutable_data();
+  d.paths.push_back(p.path);
+  return append(d, DisplayOp::STROKE_PATH, {}, (uint32_t)(d.paths.size() - 1));
 }
 
-BLGradientType PyGradient::gradient_type() const {
-  return gradient.type();
+uint32_t PyDisplayList::clip_to_rect(double x, double y, double w, double h) {
+  return record(DisplayOp::CLIP_TO_RECT, {x, y, w, h});
 }
 
-BLExtendMode PyGradient::extend_mode() const {
-  return gradient.extend_mode();
+uint32_t PyDisplayList::restore_clipping() {
+  return record(DisplayOp::RESTORE_CLIPPING, {});
 }
 
-// PyPattern 実装
-PyPattern::PyPattern() {}
+uint32_t PyDisplayList::clear_rect(double x, double y, double w, double h) {
+  return record(DisplayOp::CLEAR_RECT, {x, y, w, h});
+}
 
-void PyPattern::create(PyImage& image, BLExtendMode extend_mode) {
-  BLResult r = pattern.create(image.img, extend_mode);
-  if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLPattern.create failed: " +
-                             std::to_string(r));
+uint32_t PyDisplayList::clear_all() {
+  return record(DisplayOp::CLEAR_ALL, {});
+}
+
+// patch で書き換える数値引数を命令ごとに検証する。記録時と同じ値だけを受け付ける
+static void check_display_params(DisplayOp op, const std::vector<double>& values) {
+  switch (op) {
+    case DisplayOp::SET_COMP_OP:
+      check_integer_param(values[0], BL_COMP_OP_MAX_VALUE, "comp_op");
+      break;
+    case DisplayOp::SET_FILL_STYLE_RGBA:
+    case DisplayOp::SET_STROKE_STYLE_RGBA:
+      for (double v : values) {
+        check_integer_param(v, 255, "rgba");
+      }
+      break;
+    case DisplayOp::SET_STROKE_JOIN:
+      check_integer_param(values[0], BL_STROKE_JOIN_MAX_VALUE, "stroke_join");
+      break;
+    case DisplayOp::SET_STROKE_CAPS:
+      check_integer_param(values[0], BL_STROKE_CAP_MAX_VALUE, "stroke_cap");
+      break;
+    case DisplayOp::SET_FILL_RULE:
+      check_integer_param(values[0], BL_FILL_RULE_MAX_VALUE, "fill_rule");
+      break;
+    case DisplayOp::SET_GLOBAL_ALPHA:
+    case DisplayOp::SET_FILL_ALPHA:
+    case DisplayOp::SET_STROKE_ALPHA:
+      check_alpha(values[0]);
+      break;
+    case DisplayOp::SET_STROKE_MITER_LIMIT:
+      check_finite(values[0], "miter_limit");
+      break;
+    case DisplayOp::SET_STROKE_DASH_OFFSET:
+      check_finite(values[0], "dash_offset");
+      break;
+    case DisplayOp::SET_STROKE_OPTIONS:
+      // width, miter_limit, start_cap, end_cap, join, dash_offset, dash_array...
+      if (!(values[0] >= 0.0)) {
+        throw std::invalid_argument("width must not be negative");
+      }
+      check_finite(values[1], "miter_limit");
+      check_integer_param(values[2], BL_STROKE_CAP_MAX_VALUE, "start_cap");
+      check_integer_param(values[3], BL_STROKE_CAP_MAX_VALUE, "end_cap");
+      check_integer_param(values[4], BL_STROKE_JOIN_MAX_VALUE, "join");
+      check_finite(values[5], "dash_offset");
+      check_dash_array(std::vector<double>(values.begin() + 6, values.end()));
+      break;
+    default:
+      break;
   }
 }
 
-void PyPattern::set_area(int x, int y, int w, int h) {
-  BLRectI area{x, y, w, h};
-  BLResult r = pattern.set_area(area);
-  if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLPattern.set_area failed: " +
-                             std::to_string(r));
+// 記録済み命令の数値引数を書き換える。フレームごとに位置や色だけを変える用途
+void PyDisplayList::patch(uint32_t index, const std::vector<double>& values) {
+  std::lock_guard<std::mutex> lock(mutex);
+  if (index >= data->commands.size()) {
+    throw nb::index_error("command index out of range");
   }
+  if (values.size() != data->commands[index].count) {
+    throw std::invalid_argument("command " + std::to_string(index) + " takes " +
+                                std::to_string(data->commands[index].count) + " values, got " +
+                                std::to_string(values.size()));
+  }
+  check_display_params(data->commands[index].op, values);
+  DisplayData& d = mutable_data();
+  std::copy(values.begin(), values.end(), d.params.begin() + d.commands[index].offset);
 }
 
-void PyPattern::reset_area() {
-  pattern.reset_area();
+std::vector<double> PyDisplayList::params(uint32_t index) {
+  std::lock_guard<std::mutex> lock(mutex);
+  if (index >= data->commands.size()) {
+    throw nb::index_error("command index out of range");
+  }
+  const DisplayCommand& c = data->commands[index];
+  return std::vector<double>(data->params.begin() + c.offset,
+                             data->params.begin() + c.offset + c.count);
 }
 
-BLExtendMode PyPattern::extend_mode() const {
-  return pattern.extend_mode();
+void PyDisplayList::clear() {
+  std::lock_guard<std::mutex> lock(mutex);
+  data = std::make_shared<DisplayData>();
 }
 
-void PyPattern::set_extend_mode(BLExtendMode extend_mode) {
-  BLResult r = pattern.set_extend_mode(extend_mode);
-  if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLPattern.set_extend_mode failed: " +
-                             std::to_string(r));
-  }
+size_t PyDisplayList::size() {
+  std::lock_guard<std::mutex> lock(mutex);
+  return data->commands.size();
 }
 
-// PyPath 実装
-void PyPath::move_to(double x, double y) {
-  path.move_to(x, y);
+// replay で再生するデータ。以降の記録や patch はコピーに対して行われるため、再生中も変わらない
+std::shared_ptr<DisplayData> PyDisplayList::snapshot() {
+  std::lock_guard<std::mutex> lock(mutex);
+  return data;
 }
 
-void PyPath::line_to(double x, double y) {
-  path.line_to(x, y);
+static BLRgba32 display_rgba(const double* p) {
+  return BLRgba32((uint8_t)p[0], (uint8_t)p[1], (uint8_t)p[2], (uint8_t)p[3]);
 }
 
-void PyPath::quad_to(double x1, double y1, double x2, double y2) {
-  path.quad_to(x1, y1, x2, y2);
+// 記録した命令を順番に実行する。GIL は不要
+static void replay_display_data(BLContext& ctx, const DisplayData& d) {
+  for (const DisplayCommand& c : d.commands) {
+    const double* p = d.params.data() + c.offset;
+    switch (c.op) {
+      case DisplayOp::SAVE:
+        ctx.save();
+        break;
+      case DisplayOp::RESTORE:
+        ctx.restore();
+        break;
+      case DisplayOp::SET_COMP_OP:
+        ctx.set_comp_op((BLCompOp)p[0]);
+        break;
+      case DisplayOp::SET_FILL_STYLE_RGBA:
+        ctx.set_fill_style(display_rgba(p));
+        break;
+      case DisplayOp::SET_FILL_STYLE_GRADIENT:
+        ctx.set_fill_style(d.gradients[c.resource]);
+        break;
+      case DisplayOp::SET_FILL_STYLE_PATTERN:
+        ctx.set_fill_style(d.patterns[c.resource]);
+        break;
+      case DisplayOp::SET_STROKE_STYLE_RGBA:
+        ctx.set_stroke_style(display_rgba(p));
+        break;
+      case DisplayOp::SET_STROKE_STYLE_GRADIENT:
+        ctx.set_stroke_style(d.gradients[c.resource]);
+        break;
+      case DisplayOp::SET_STROKE_STYLE_PATTERN:
+        ctx.set_stroke_style(d.patterns[c.resource]);
+        break;
+      case DisplayOp::SET_STROKE_WIDTH:
+        ctx.set_stroke_width(p[0]);
+        break;
+      case DisplayOp::SET_STROKE_MITER_LIMIT:
+        ctx.set_stroke_miter_limit(p[0]);
+        break;
+      case DisplayOp::SET_STROKE_JOIN:
+        ctx.set_stroke_join((BLStrokeJoin)p[0]);
+        break;
+      case DisplayOp::SET_STROKE_CAPS:
+        ctx.set_stroke_caps((BLStrokeCap)p[0]);
+        break;
+      case DisplayOp::TRANSLATE:
+        ctx.translate(p[0], p[1]);
+        break;
+      case DisplayOp::ROTATE:
+        ctx.rotate(p[0]);
+        break;
+      case DisplayOp::SCALE:
+        ctx.scale(p[0], p[1]);
+        break;
+      case DisplayOp::APPLY_TRANSFORM:
+        ctx.apply_transform(to_matrix(p));
+        break;
+      case DisplayOp::FILL_ALL:
+        ctx.fill_all();
+        break;
+      case DisplayOp::FILL_RECT:
+        ctx.fill_rect(BLRect(p[0], p[1], p[2], p[3]));
+        break;
+      case DisplayOp::FILL_CIRCLE:
+        ctx.fill_circle(BLCircle(p[0], p[1], p[2]));
+        break;
+      case DisplayOp::FILL_PIE:
+        ctx.fill_pie(p[0], p[1], p[2], p[3], p[4]);
+        break;
+      case DisplayOp::FILL_PATH:
+        ctx.fill_path(d.paths[c.resource]);
+        break;
+      case DisplayOp::FILL_GLYPH_RUN:
+        ctx.fill_glyph_run(BLPoint(p[0], p[1]), d.fonts[c.resource],
+                           d.texts[c.resource]->buffer.glyph_run());
+        break;
+      case DisplayOp::STROKE_RECT:
+        stroke_rect_with_dash(ctx, BLRect(p[0], p[1], p[2], p[3]));
+        break;
+      case DisplayOp::STROKE_CIRCLE:
+        stroke_circle_with_dash(ctx, BLCircle(p[0], p[1], p[2]));
+        break;
+      case DisplayOp::STROKE_PATH:
+        stroke_path_with_dash(ctx, d.paths[c.resource]);
+        break;
+      case DisplayOp::CLIP_TO_RECT:
+        ctx.clip_to_rect(BLRect(p[0], p[1], p[2], p[3]));
+        break;
+      case DisplayOp::RESTORE_CLIPPING:
+        ctx.restore_clipping();
+        break;
+      case DisplayOp::CLEAR_RECT:
+        ctx.clear_rect(BLRect(p[0], p[1], p[2], p[3]));
+        break;
+      case DisplayOp::CLEAR_ALL:
+        ctx.clear_all();
+        break;
+      case DisplayOp::SET_GLOBAL_ALPHA:
+        ctx.set_global_alpha(p[0]);
+        break;
+      case DisplayOp::SET_FILL_ALPHA:
+        ctx.set_fill_alpha(p[0]);
+        break;
+      case DisplayOp::SET_STROKE_ALPHA:
+        ctx.set_stroke_alpha(p[0]);
+        break;
+      case DisplayOp::SET_FILL_RULE:
+        ctx.set_fill_rule((BLFillRule)p[0]);
+        break;
+      case DisplayOp::SET_STROKE_OPTIONS: {
+        // width, miter_limit, start_cap, end_cap, join, dash_offset, dash_array...
+        BLStrokeOptions options;
+        options.width = p[0];
+        options.miter_limit = p[1];
+        options.start_cap = (uint8_t)p[2];
+        options.end_cap = (uint8_t)p[3];
+        options.join = (uint8_t)p[4];
+        options.dash_offset = p[5];
+        for (uint32_t k = 6; k < c.count; k++) {
+          options.dash_array.append(p[k]);
+        }
+        ctx.set_stroke_options(options);
+        break;
+      }
+      case DisplayOp::SET_STROKE_DASH_OFFSET:
+        ctx.set_stroke_dash_offset(p[0]);
+        break;
+    }
+  }
 }
 
-void PyPath::cubic_to(double x1, double y1, double x2, double y2, double x3, double y3) {
-  path.cubic_to(x1, y1, x2, y2, x3, y3);
+// DisplayList を 1 回の呼び出しで再生する。
+// 再生中の状態変更は呼び出し側に残らないように save / restore で囲む
+// dirty を指定した場合は変更のあった矩形ごとにクリップして再生し、それ以外の画素はラスタライズしない
+void DrawContext::replay(PyDisplayList& display_list, PyDirtyRegion* dirty) {
+  std::shared_ptr<DisplayData> snapshot = display_list.snapshot();
+  std::optional<std::vector<PyDirtyRegion::Box>> boxes;
+  if (dirty) {
+    boxes = dirty->snapshot();
+  }
+  ContextGuard guard(mutex);
+  BLContextCookie replay_cookie;
+  if (!boxes) {
+    ctx.save(replay_cookie);
+    replay_display_data(ctx, *snapshot);
+    ctx.restore(replay_cookie);
+    return;
+  }
+  BLContextCookie clip_cookie;
+  for (const PyDirtyRegion::Box& b : *boxes) {
+    ctx.save(replay_cookie);
+    ctx.clip_to_rect(BLRectI(b.x0, b.y0, b.x1 - b.x0, b.y1 - b.y0));
+    // DisplayList 内の restore_clipping は直前の save の状態に戻すため、矩形のクリップを
+    // 適用した状態をもう一段保存しておく。cookie 付きなので記録された restore でも外れない
+    ctx.save(clip_cookie);
+    replay_display_data(ctx, *snapshot);
+    ctx.restore(clip_cookie);
+    ctx.restore(replay_cookie);
+  }
 }
 
-void PyPath::smooth_quad_to(double x2, double y2) {
-  path.smooth_quad_to(x2, y2);
+// PyDirtyRegion 実装
+static bool box_intersects(const PyDirtyRegion::Box& a, const PyDirtyRegion::Box& b) {
+  return a.x0 < b.x1 && b.x0 < a.x1 && a.y0 < b.y1 && b.y0 < a.y1;
 }
 
-void PyPath::smooth_cubic_to(double x2, double y2, double x3, double y3) {
-  path.smooth_cubic_to(x2, y2, x3, y3);
+static PyDirtyRegion::Box box_union(const PyDirtyRegion::Box& a, const PyDirtyRegion::Box& b) {
+  return PyDirtyRegion::Box{std::min(a.x0, b.x0), std::min(a.y0, b.y0), std::max(a.x1, b.x1),
+                            std::max(a.y1, b.y1)};
 }
 
-void PyPath::arc_to(double cx, double cy, double rx, double ry, double start, double sweep, bool force_move_to) {
-  path.arc_to(cx, cy, rx, ry, start, sweep, force_move_to);
+static int64_t box_area(const PyDirtyRegion::Box& b) {
+  return (int64_t)(b.x1 - b.x0) * (b.y1 - b.y0);
 }
 
-void PyPath::elliptic_arc_to(double rx, double ry, double x_axis_rotation, bool large_arc_flag, bool sweep_flag, double x, double y) {
-  path.elliptic_arc_to(rx, ry, x_axis_rotation, large_arc_flag, sweep_flag, x, y);
+PyDirtyRegion::PyDirtyRegion(int width, int height, size_t max_rects)
+    : width(width), height(height), max_rects(max_rects) {
+  if (width <= 0 || height <= 0) {
+    throw std::invalid_argument("width and height must be positive");
+  }
+  if (max_rects == 0) {
+    throw std::invalid_argument("max_rects must be at least 1");
+  }
 }
 
-void PyPath::close() {
-  path.close();
+void PyDirtyRegion::add_box(Box box) {
+  // 重なる矩形を取り込んで統合する。統合で広がった矩形が別の矩形と重なることがあるので繰り返す
+  for (;;) {
+    auto it = std::find_if(boxes.begin(), boxes.end(),
+                           [&](const Box& b) { return box_intersects(b, box); });
+    if (it == boxes.end()) {
+      break;
+    }
+    box = box_union(*it, box);
+    boxes.erase(it);
+  }
+  if (boxes.size() < max_rects) {
+    boxes.push_back(box);
+    return;
+  }
+  // 上限に達している場合は統合による増分面積が最小の矩形と統合する
+  size_t best = 0;
+  int64_t best_waste = INT64_MAX;
+  for (size_t i = 0; i < boxes.size(); i++) {
+    int64_t waste = box_area(box_union(boxes[i], box)) - box_area(boxes[i]) - box_area(box);
+    if (waste < best_waste) {
+      best = i;
+      best_waste = waste;
+    }
+  }
+  Box merged = box_union(boxes[best], box);
+  boxes.erase(boxes.begin() + best);
+  add_box(merged);
 }
 
-// DrawContext 実装
-DrawContext::DrawContext(PyImage& img, uint32_t thread_count) {
-  BLContextCreateInfo create_info{};
-  create_info.thread_count = thread_count;
-  BLResult r = ctx.begin(img.img, create_info);
-  if (r != BL_SUCCESS) {
-    throw std::runtime_error("BLContext.begin failed: " + std::to_string(r));
+void PyDirtyRegion::mark(double x, double y, double w, double h) {
+  if (!std::isfinite(x) || !std::isfinite(y) || !std::isfinite(w) || !std::isfinite(h)) {
+    throw std::invalid_argument("x, y, w and h must be finite");
+  }
+  if (!(w > 0.0) || !(h > 0.0)) {
+    return;
   }
+  // アンチエイリアスで端の画素にも描画されるため、外側の整数座標に広げる
+  double x0 = std::clamp(std::floor(x), 0.0, (double)width);
+  double y0 = std::clamp(std::floor(y), 0.0, (double)height);
+  double x1 = std::clamp(std::ceil(x + w), 0.0, (double)width);
+  double y1 = std::clamp(std::ceil(y + h), 0.0, (double)height);
+  if (x0 >= x1 || y0 >= y1) {
+    return;
+  }
+  std::lock_guard<std::mutex> lock(mutex);
+  add_box(Box{(int)x0, (int)y0, (int)x1, (int)y1});
 }
 
-DrawContext::~DrawContext() {
-  if (!ended)
-    ctx.end();
+void PyDirtyRegion::mark_rects(RectArray rects) {
+  size_t n = rects.shape(0);
+  const double* d = rects.data();
+  for (size_t i = 0; i < n; i++, d += 4) {
+    mark(d[0], d[1], d[2], d[3]);
+  }
 }
 
-void DrawContext::end() {
-  if (!ended) {
-    ctx.end();
-    ended = true;
+void PyDirtyRegion::mark_all() {
+  std::lock_guard<std::mutex> lock(mutex);
+  boxes.assign(1, Box{0, 0, width, height});
+}
+
+void PyDirtyRegion::clear() {
+  std::lock_guard<std::mutex> lock(mutex);
+  boxes.clear();
+}
+
+nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> PyDirtyRegion::to_array(
+    const std::vector<Box>& boxes) {
+  size_t n = boxes.size();
+  int32_t* data = new int32_t[n * 4];
+  nb::capsule owner(data, [](void* p) noexcept { delete[] static_cast<int32_t*>(p); });
+  for (size_t i = 0; i < n; i++) {
+    const Box& b = boxes[i];
+    data[i * 4 + 0] = b.x0;
+    data[i * 4 + 1] = b.y0;
+    data[i * 4 + 2] = b.x1 - b.x0;
+    data[i * 4 + 3] = b.y1 - b.y0;
   }
+  size_t shape[2] = {n, 4};
+  return nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>>(data, 2, shape, owner);
 }
 
-void DrawContext::save() {
-  ctx.save();
+nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> PyDirtyRegion::rects() {
+  return to_array(snapshot());
 }
 
-void DrawContext::restore() {
-  ctx.restore();
+// 記録した矩形を返して空にする。フレームごとにエンコーダーや送信側へ渡す用途
+nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> PyDirtyRegion::take() {
+  std::vector<Box> taken;
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    taken.swap(boxes);
+  }
+  return to_array(taken);
 }
 
-void DrawContext::set_comp_op(BLCompOp op) {
-  ctx.set_comp_op(op);
+std::optional<RectTuple> PyDirtyRegion::bounds() {
+  std::vector<Box> current = snapshot();
+  if (current.empty()) {
+    return std::nullopt;
+  }
+  Box u = current[0];
+  for (const Box& b : current) {
+    u = box_union(u, b);
+  }
+  return RectTuple{u.x0, u.y0, u.x1 - u.x0, u.y1 - u.y0};
 }
 
-void DrawContext::set_fill_style_rgba(uint32_t r,
-                                      uint32_t g,
-                                      uint32_t b,
-                                      uint32_t a) {
-  ctx.set_fill_style(BLRgba32((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a));
+int64_t PyDirtyRegion::area() {
+  // 矩形は互いに重ならないため面積の和がそのまま再描画する画素数になる
+  int64_t total = 0;
+  for (const Box& b : snapshot()) {
+    total += box_area(b);
+  }
+  return total;
 }
 
-void DrawContext::set_fill_style_gradient(PyGradient& gradient) {
-  ctx.set_fill_style(gradient.gradient);
+size_t PyDirtyRegion::size() {
+  std::lock_guard<std::mutex> lock(mutex);
+  return boxes.size();
 }
 
-void DrawContext::set_fill_style_pattern(PyPattern& pattern) {
-  ctx.set_fill_style(pattern.pattern);
+std::vector<PyDirtyRegion::Box> PyDirtyRegion::snapshot() {
+  std::lock_guard<std::mutex> lock(mutex);
+  return boxes;
 }
 
-void DrawContext::set_stroke_style_rgba(uint32_t r,
-                                        uint32_t g,
-                                        uint32_t b,
-                                        uint32_t a) {
-  ctx.set_stroke_style(BLRgba32((uint8_t)r, (uint8_t)g, (uint8_t)b, (uint8_t)a));
+// PyFrameRing 実装
+PyFrameRing::PyFrameRing(int width, int height, size_t count, uint32_t thread_count) {
+  if (count < 2) {
+    throw std::invalid_argument("count must be at least 2");
+  }
+  slots.resize(count);
+  for (Slot& slot : slots) {
+    slot.image = new PyImage(width, height);
+    slot.image_ref = nb::cast(slot.image, nb::rv_policy::take_ownership);
+    slot.context = new DrawContext(slot.image, thread_count);
+    slot.context_ref = nb::cast(slot.context, nb::rv_policy::take_ownership);
+  }
+  flusher = std::thread([this] { flusher_main(); });
 }
 
-void DrawContext::set_stroke_style_gradient(PyGradient& gradient) {
-  ctx.set_stroke_style(gradient.gradient);
+PyFrameRing::~PyFrameRing() {
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    stopping = true;
+  }
+  cv.notify_all();
+  nb::gil_scoped_release release;
+  flusher.join();
 }
 
-void DrawContext::set_stroke_style_pattern(PyPattern& pattern) {
-  ctx.set_stroke_style(pattern.pattern);
+// submit されたスロットを順番に描画完了まで待つ。GIL は使わない
+void PyFrameRing::flusher_main() {
+  std::unique_lock<std::mutex> lock(mutex);
+  for (;;) {
+    cv.wait(lock, [this] { return stopping || !pending.empty(); });
+    if (pending.empty()) {
+      return;
+    }
+    size_t index = pending.front();
+    pending.pop_front();
+    DrawContext* context = slots[index].context;
+    lock.unlock();
+    {
+      std::lock_guard<std::mutex> guard(context->mutex);
+      context->root_context().flush(BL_CONTEXT_FLUSH_SYNC);
+    }
+    lock.lock();
+    slots[index].done = true;
+    cv.notify_all();
+  }
 }
 
-void DrawContext::set_stroke_width(double width) {
-  ctx.set_stroke_width(width);
+nb::object PyFrameRing::begin_frame() {
+  size_t index;
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    for (const Slot& slot : slots) {
+      if (slot.state == SlotState::RECORDING) {
+        throw std::runtime_error("submit() the current frame before begin_frame()");
+      }
+    }
+    index = write_index;
+    if (slots[index].state != SlotState::FREE) {
+      throw std::runtime_error(
+          "FrameRing is full; acquire() a frame or drop the views of acquired frames first");
+    }
+    slots[index].state = SlotState::RECORDING;
+    slots[index].done = false;
+    write_index = (write_index + 1) % slots.size();
+  }
+  // reset は前回の描画完了を待ち、描画状態を初期化して新しいフレームとして generation を進める
+  slots[index].context->reset();
+  return slots[index].context_ref;
 }
 
-void DrawContext::set_stroke_miter_limit(double miter_limit) {
-  ctx.set_stroke_miter_limit(miter_limit);
+void PyFrameRing::submit() {
+  {
+    std::lock_guard<std::mutex> lock(mutex);
+    std::optional<size_t> index;
+    for (size_t i = 0; i < slots.size(); i++) {
+      if (slots[i].state == SlotState::RECORDING) {
+        index = i;
+      }
+    }
+    if (!index) {
+      throw std::runtime_error("no frame is being recorded; call begin_frame() first");
+    }
+    // 合成していないレイヤーはスロットの Image に反映されないため、描画完了として渡せない
+    DrawContext* context = slots[*index].context;
+    {
+      std::lock_guard<std::mutex> guard(context->mutex);
+      if (!context->layers.empty()) {
+        throw std::runtime_error("end_layer() every layer before submit()");
+      }
+    }
+    slots[*index].state = SlotState::SUBMITTED;
+    pending.push_back(*index);
+  }
+  cv.notify_all();
 }
 
-void DrawContext::set_stroke_join(BLStrokeJoin stroke_join) {
-  ctx.set_stroke_join(stroke_join);
+// acquire で返したビューの所有者。ビュー (と派生したビュー) がすべて解放されたらスロットを返却する
+struct AcquiredFrame {
+  // スロットを返却するまでリングと Image を解放させないための参照
+  nb::object ring;
+  size_t index;
+};
+
+nb::ndarray<nb::numpy, const uint8_t, nb::ndim<3>> PyFrameRing::acquire() {
+  size_t index;
+  {
+    nb::gil_scoped_release release;
+    std::unique_lock<std::mutex> lock(mutex);
+    index = read_index;
+    if (slots[index].state != SlotState::SUBMITTED) {
+      throw std::runtime_error("no submitted frame to acquire");
+    }
+    cv.wait(lock, [&] { return slots[index].done; });
+    slots[index].state = SlotState::ACQUIRED;
+    read_index = (read_index + 1) % slots.size();
+  }
+
+  PyImage* image = slots[index].image;
+  BLImageData d;
+  BLResult r = image->img.get_data(&d);
+  if (r != BL_SUCCESS) {
+    release_slot(index);
+    throw std::runtime_error("BLImage.get_data failed: " + std::to_string(r));
+  }
+  nb::capsule owner(new AcquiredFrame{nb::find(this), index}, [](void* p) noexcept {
+    AcquiredFrame* frame = static_cast<AcquiredFrame*>(p);
+    nb::inst_ptr<PyFrameRing>(frame->ring)->release_slot(frame->index);
+    delete frame;
+  });
+  size_t shape[3] = {(size_t)image->height, (size_t)image->width, 4};
+  int64_t strides[3] = {(int64_t)d.stride, 4, 1};
+  return nb::ndarray<nb::numpy, const uint8_t, nb::ndim<3>>(d.pixel_data, 3, shape, owner,
+                                                           strides);
 }
 
-void DrawContext::set_stroke_caps(BLStrokeCap stroke_cap) {
-  ctx.set_stroke_caps(stroke_cap);
+// ビューの解放時に GIL を保持した状態で呼ばれる。mutex を待つ間に GIL を要求するスレッドはない
+void PyFrameRing::release_slot(size_t index) {
+  std::lock_guard<std::mutex> lock(mutex);
+  slots[index].state = SlotState::FREE;
 }
 
-void DrawContext::translate(double x, double y) {
-  ctx.translate(x, y);
+size_t PyFrameRing::count() const {
+  return slots.size();
 }
 
-void DrawContext::rotate(double rad) {
-  ctx.rotate(rad);
+nb::object PyFrameRing::image(size_t index) const {
+  if (index >= slots.size()) {
+    throw nb::index_error();
+  }
+  return slots[index].image_ref;
 }
 
-void DrawContext::fill_all() {
-  ctx.fill_all();
+// 色配列の行数が図形の数と一致しているか確認する
+static void check_colors(size_t n, const std::optional<ColorArray>& colors) {
+  if (colors && colors->shape(0) != n) {
+    throw std::invalid_argument("colors must have the same number of rows as shapes: " +
+                                std::to_string(colors->shape(0)) + " != " + std::to_string(n));
+  }
 }
 
-void DrawContext::fill_rect(double x, double y, double w, double h) {
-  ctx.fill_rect(BLRect(x, y, w, h));
+// 一括描画
+// 配列は (N, 4) / (N, 3) の C 連続 float64 なので BLRect の配列としてそのまま渡せる
+// colors を指定した場合は図形ごとの色で描画し、Context の fill / stroke スタイルは変更しない
+void DrawContext::fill_rects(RectArray rects, std::optional<ColorArray> colors) {
+  size_t n = rects.shape(0);
+  check_colors(n, colors);
+  const BLRect* data = reinterpret_cast<const BLRect*>(rects.data());
+  ContextGuard guard(mutex);
+  if (colors) {
+    const uint8_t* c = colors->data();
+    for (size_t i = 0; i < n; i++, c += 4) {
+      ctx.fill_rect(data[i], BLRgba32(c[0], c[1], c[2], c[3]));
+    }
+  } else {
+    ctx.fill_rect_array(data, n);
+  }
 }
 
-void DrawContext::fill_circle(double cx, double cy, double r) {
-  ctx.fill_circle(BLCircle(cx, cy, r));
+void DrawContext::fill_circles(CircleArray circles, std::optional<ColorArray> colors) {
+  size_t n = circles.shape(0);
+  check_colors(n, colors);
+  const double* d = circles.data();
+  ContextGuard guard(mutex);
+  if (colors) {
+    const uint8_t* c = colors->data();
+    for (size_t i = 0; i < n; i++, d += 3, c += 4) {
+      ctx.fill_circle(BLCircle(d[0], d[1], d[2]), BLRgba32(c[0], c[1], c[2], c[3]));
+    }
+  } else {
+    for (size_t i = 0; i < n; i++, d += 3) {
+      ctx.fill_circle(BLCircle(d[0], d[1], d[2]));
+    }
+  }
 }
 
-void DrawContext::fill_pie(double cx,
-                           double cy,
-                           double r,
-                           double start,
-                           double sweep) {
-  ctx.fill_pie(cx, cy, r, start, sweep);
+void DrawContext::stroke_rects(RectArray rects, std::optional<ColorArray> colors) {
+  size_t n = rects.shape(0);
+  check_colors(n, colors);
+  const BLRect* data = reinterpret_cast<const BLRect*>(rects.data());
+  ContextGuard guard(mutex);
+  if (colors) {
+    const uint8_t* c = colors->data();
+    for (size_t i = 0; i < n; i++, c += 4) {
+      stroke_rect_with_dash(ctx, data[i], BLRgba32(c[0], c[1], c[2], c[3]));
+    }
+  } else if (has_stroke_dash(ctx)) {
+    for (size_t i = 0; i < n; i++) {
+      stroke_rect_with_dash(ctx, data[i]);
+    }
+  } else {
+    ctx.stroke_rect_array(data, n);
+  }
 }
 
-void DrawContext::fill_path(PyPath& p) {
-  ctx.fill_path(p.path);
+void DrawContext::stroke_circles(CircleArray circles, std::optional<ColorArray> colors) {
+  size_t n = circles.shape(0);
+  check_colors(n, colors);
+  const double* d = circles.data();
+  ContextGuard guard(mutex);
+  if (colors) {
+    const uint8_t* c = colors->data();
+    for (size_t i = 0; i < n; i++, d += 3, c += 4) {
+      stroke_circle_with_dash(ctx, BLCircle(d[0], d[1], d[2]),
+                              BLRgba32(c[0], c[1], c[2], c[3]));
+    }
+  } else {
+    for (size_t i = 0; i < n; i++, d += 3) {
+      stroke_circle_with_dash(ctx, BLCircle(d[0], d[1], d[2]));
+    }
+  }
 }
 
-void DrawContext::fill_utf8_text(double x,
-                                  double y,
-                                  PyFont& font,
-                                  const std::string& text) {
-  ctx.fill_utf8_text(BLPoint(x, y), font.font, text.c_str(), text.size());
+// 同じパスを N 個の変換で描画する。変換は呼び出し時点の座標変換の前に適用し、
+// 描画後は呼び出し時点の座標変換に戻す
+void DrawContext::fill_path_instances(PyPath& p,
+                                      TransformsArray transforms,
+                                      std::optional<ColorArray> colors) {
+  size_t n = transforms.shape(0);
+  check_colors(n, colors);
+  BLPath path(p.path);
+  const double* m = transforms.data();
+  ContextGuard guard(mutex);
+  BLMatrix2D base = ctx.user_transform();
+  const uint8_t* c = colors ? colors->data() : nullptr;
+  for (size_t i = 0; i < n; i++, m += 6) {
+    ctx.set_transform(base);
+    ctx.apply_transform(to_matrix(m));
+    if (c) {
+      ctx.fill_path(path, BLRgba32(c[0], c[1], c[2], c[3]));
+      c += 4;
+    } else {
+      ctx.fill_path(path);
+    }
+  }
+  ctx.set_transform(base);
 }
 
-void DrawContext::stroke_rect(double x, double y, double w, double h) {
-  ctx.stroke_rect(BLRect(x, y, w, h));
+// Image の描画
+static BLRectI to_rect_i(const RectTuple& r) {
+  return BLRectI(std::get<0>(r), std::get<1>(r), std::get<2>(r), std::get<3>(r));
 }
 
-void DrawContext::stroke_circle(double cx, double cy, double r) {
-  ctx.stroke_circle(BLCircle(cx, cy, r));
+void DrawContext::blit_image(PyImage& image,
+                             double x,
+                             double y,
+                             std::optional<RectTuple> src_rect) {
+  BLImage src(image.img);
+  ContextGuard guard(mutex);
+  if (src_rect) {
+    ctx.blit_image(BLPoint(x, y), src, to_rect_i(*src_rect));
+  } else {
+    ctx.blit_image(BLPoint(x, y), src);
+  }
 }
 
-void DrawContext::stroke_path(PyPath& p) {
-  ctx.stroke_path(p.path);
+void DrawContext::blit_scaled_image(PyImage& image,
+                                    double x,
+                                    double y,
+                                    double w,
+                                    double h,
+                                    std::optional<RectTuple> src_rect) {
+  BLImage src(image.img);
+  ContextGuard guard(mutex);
+  if (src_rect) {
+    ctx.blit_image(BLRect(x, y, w, h), src, to_rect_i(*src_rect));
+  } else {
+    ctx.blit_image(BLRect(x, y, w, h), src);
+  }
+}
+
+// テクスチャアトラスからスプライトをまとめて描画する。
+// src_rects は (N, 4) のアトラス内の矩形 (整数に丸める)、
+// dst は (N, 2) の描画位置 (等倍) または (N, 4) の描画先矩形 (拡大縮小)
+void DrawContext::blit_sprites(PyImage& atlas, RectArray src_rects, PlacementArray dst) {
+  size_t n = src_rects.shape(0);
+  size_t cols = dst.shape(1);
+  if (cols != 2 && cols != 4) {
+    throw std::invalid_argument("dst must have shape (N, 2) or (N, 4)");
+  }
+  if (dst.shape(0) != n) {
+    throw std::invalid_argument("dst must have the same number of rows as src_rects: " +
+                                std::to_string(dst.shape(0)) + " != " + std::to_string(n));
+  }
+  BLImage src(atlas.img);
+  const double* s = src_rects.data();
+  const double* d = dst.data();
+  ContextGuard guard(mutex);
+  for (size_t i = 0; i < n; i++, s += 4, d += cols) {
+    BLRectI area((int)std::lround(s[0]), (int)std::lround(s[1]), (int)std::lround(s[2]),
+                 (int)std::lround(s[3]));
+    if (cols == 2) {
+      ctx.blit_image(BLPoint(d[0], d[1]), src, area);
+    } else {
+      ctx.blit_image(BLRect(d[0], d[1], d[2], d[3]), src, area);
+    }
+  }
 }
 
 // モジュール定義
@@ -343,8 +3383,91 @@ NB_MODULE(blend2d_ext, m) {
         nb::sig("def version() -> str"));
 
   nb::enum_<BLCompOp>(m, "CompOp")
-      .value("SRC_COPY", BL_COMP_OP_SRC_COPY)
       .value("SRC_OVER", BL_COMP_OP_SRC_OVER)
+      .value("SRC_COPY", BL_COMP_OP_SRC_COPY)
+      .value("SRC_IN", BL_COMP_OP_SRC_IN)
+      .value("SRC_OUT", BL_COMP_OP_SRC_OUT)
+      .value("SRC_ATOP", BL_COMP_OP_SRC_ATOP)
+      .value("DST_OVER", BL_COMP_OP_DST_OVER)
+      .value("DST_COPY", BL_COMP_OP_DST_COPY)
+      .value("DST_IN", BL_COMP_OP_DST_IN)
+      .value("DST_OUT", BL_COMP_OP_DST_OUT)
+      .value("DST_ATOP", BL_COMP_OP_DST_ATOP)
+      .value("XOR", BL_COMP_OP_XOR)
+      .value("CLEAR", BL_COMP_OP_CLEAR)
+      .value("PLUS", BL_COMP_OP_PLUS)
+      .value("MINUS", BL_COMP_OP_MINUS)
+      .value("MODULATE", BL_COMP_OP_MODULATE)
+      .value("MULTIPLY", BL_COMP_OP_MULTIPLY)
+      .value("SCREEN", BL_COMP_OP_SCREEN)
+      .value("OVERLAY", BL_COMP_OP_OVERLAY)
+      .value("DARKEN", BL_COMP_OP_DARKEN)
+      .value("LIGHTEN", BL_COMP_OP_LIGHTEN)
+      .value("COLOR_DODGE", BL_COMP_OP_COLOR_DODGE)
+      .value("COLOR_BURN", BL_COMP_OP_COLOR_BURN)
+      .value("LINEAR_BURN", BL_COMP_OP_LINEAR_BURN)
+      .value("LINEAR_LIGHT", BL_COMP_OP_LINEAR_LIGHT)
+      .value("PIN_LIGHT", BL_COMP_OP_PIN_LIGHT)
+      .value("HARD_LIGHT", BL_COMP_OP_HARD_LIGHT)
+      .value("SOFT_LIGHT", BL_COMP_OP_SOFT_LIGHT)
+      .value("DIFFERENCE", BL_COMP_OP_DIFFERENCE)
+      .value("EXCLUSION", BL_COMP_OP_EXCLUSION)
+      .export_values();
+
+  nb::enum_<BLFormat>(m, "Format")
+      .value("PRGB32", BL_FORMAT_PRGB32)
+      .value("XRGB32", BL_FORMAT_XRGB32)
+      .value("A8", BL_FORMAT_A8)
+      .export_values();
+
+  nb::enum_<PixelFormat>(m, "PixelFormat")
+      .value("BGRA32", PixelFormat::BGRA32)
+      .value("RGBA32", PixelFormat::RGBA32)
+      .value("BGR24", PixelFormat::BGR24)
+      .value("RGB24", PixelFormat::RGB24)
+      .export_values();
+
+  nb::enum_<YuvMatrix>(m, "YuvMatrix")
+      .value("BT601", YuvMatrix::BT601)
+      .value("BT709", YuvMatrix::BT709)
+      .export_values();
+
+  nb::enum_<ScaleFilter>(m, "ScaleFilter")
+      .value("NEAREST", ScaleFilter::NEAREST)
+      .value("BILINEAR", ScaleFilter::BILINEAR)
+      .value("BICUBIC", ScaleFilter::BICUBIC)
+      .value("LANCZOS", ScaleFilter::LANCZOS)
+      .export_values();
+
+  nb::enum_<BLRenderingQuality>(m, "RenderingQuality")
+      .value("ANTIALIAS", BL_RENDERING_QUALITY_ANTIALIAS)
+      .export_values();
+
+  nb::enum_<BLGradientQuality>(m, "GradientQuality")
+      .value("NEAREST", BL_GRADIENT_QUALITY_NEAREST)
+      .value("SMOOTH", BL_GRADIENT_QUALITY_SMOOTH)
+      .value("DITHER", BL_GRADIENT_QUALITY_DITHER)
+      .export_values();
+
+  nb::enum_<BLPatternQuality>(m, "PatternQuality")
+      .value("NEAREST", BL_PATTERN_QUALITY_NEAREST)
+      .value("BILINEAR", BL_PATTERN_QUALITY_BILINEAR)
+      .export_values();
+
+  nb::enum_<RenderProfile>(m, "RenderProfile")
+      .value("DEFAULT", RenderProfile::DEFAULT)
+      .value("PREVIEW", RenderProfile::PREVIEW)
+      .value("QUALITY", RenderProfile::QUALITY)
+      .export_values();
+
+  nb::enum_<BLPathCmd>(m, "PathCmd")
+      .value("MOVE", BL_PATH_CMD_MOVE)
+      .value("ON", BL_PATH_CMD_ON)
+      .value("QUAD", BL_PATH_CMD_QUAD)
+      .value("CONIC", BL_PATH_CMD_CONIC)
+      .value("CUBIC", BL_PATH_CMD_CUBIC)
+      .value("CLOSE", BL_PATH_CMD_CLOSE)
+      .value("WEIGHT", BL_PATH_CMD_WEIGHT)
       .export_values();
 
   nb::enum_<BLExtendMode>(m, "ExtendMode")
@@ -368,6 +3491,11 @@ NB_MODULE(blend2d_ext, m) {
       .value("TRIANGLE_REV", BL_STROKE_CAP_TRIANGLE_REV)
       .export_values();
 
+  nb::enum_<BLFillRule>(m, "FillRule")
+      .value("NON_ZERO", BL_FILL_RULE_NON_ZERO)
+      .value("EVEN_ODD", BL_FILL_RULE_EVEN_ODD)
+      .export_values();
+
   nb::enum_<BLStrokeJoin>(m, "StrokeJoin")
       .value("MITER_CLIP", BL_STROKE_JOIN_MITER_CLIP)
       .value("MITER_BEVEL", BL_STROKE_JOIN_MITER_BEVEL)
@@ -376,23 +3504,140 @@ NB_MODULE(blend2d_ext, m) {
       .value("ROUND", BL_STROKE_JOIN_ROUND)
       .export_values();
 
-  nb::class_<PyImage>(m, "Image")
-      .def(nb::init<int, int>(), "width"_a, "height"_a,
-           nb::sig("def __init__(self, width: int, height: int) -> None"))
+  nb::class_<PyImage>(m, "Image", nb::type_slots(image_slots))
+      .def(nb::init<int, int, BLFormat>(), "width"_a, "height"_a,
+           "format"_a = BL_FORMAT_PRGB32,
+           nb::sig("def __init__(self, width: int, height: int, format: Format = "
+                   "Format.PRGB32) -> None"))
+      .def_static("from_buffer", &PyImage::from_buffer, "obj"_a, "width"_a, "height"_a,
+                  "stride"_a = 0, "format"_a = BL_FORMAT_PRGB32,
+                  nb::sig("def from_buffer(obj: collections.abc.Buffer, width: int, height: int, "
+                          "stride: int = 0, format: Format = Format.PRGB32) -> Image"),
+                  "Create an Image that renders directly into a writable buffer (zero-copy); "
+                  "stride=0 means width * bytes_per_pixel")
       .def_prop_ro(
           "width", [](const PyImage& s) { return s.width; },
           nb::sig("def width(self) -> int"))
       .def_prop_ro(
           "height", [](const PyImage& s) { return s.height; },
           nb::sig("def height(self) -> int"))
+      .def_prop_ro(
+          "format", [](const PyImage& s) { return s.format; },
+          nb::sig("def format(self) -> Format"))
+      .def_prop_ro(
+          "generation", [](const PyImage& s) { return s.generation.load(); },
+          nb::sig("def generation(self) -> int"))
+      .def_prop_ro(
+          "is_rendering", [](const PyImage& s) { return s.attached.load(); },
+          nb::sig("def is_rendering(self) -> bool"))
       .def("memoryview", &PyImage::memoryview,
            nb::sig("def memoryview(self) -> memoryview"),
-           "PEP 3118 memoryview (1D, size=stride*height)")
+           "PEP 3118 memoryview (1D, size=stride*(height-1)+width*bytes_per_pixel); "
+           "keeps the Image alive")
       .def("asarray", &PyImage::asarray,
-           "NumPy ndarray view (H, W, 4) uint8; zero-copy");
+           "NumPy ndarray view (H, W, 4) uint8 ((H, W) for A8); zero-copy, keeps the Image alive")
+      .def("convert_to", &PyImage::convert_to, "dst"_a, "format"_a,
+           nb::sig("def convert_to(self, dst: numpy.ndarray, format: PixelFormat) -> None"),
+           "Convert pixels into a pre-allocated (H, W, 4 or 3) uint8 array; "
+           "flush() the attached Context first for complete pixels")
+      .def("to_i420", &PyImage::to_i420, "y"_a, "u"_a, "v"_a,
+           "matrix"_a = YuvMatrix::BT601,
+           nb::sig("def to_i420(self, y: numpy.ndarray, u: numpy.ndarray, v: numpy.ndarray, "
+                   "matrix: YuvMatrix = YuvMatrix.BT601) -> None"),
+           "Convert pixels into pre-allocated I420 planes: y (H, W), u / v ((H+1)/2, (W+1)/2); "
+           "flush() the attached Context first for complete pixels")
+      .def("to_nv12", &PyImage::to_nv12, "y"_a, "uv"_a, "matrix"_a = YuvMatrix::BT601,
+           nb::sig("def to_nv12(self, y: numpy.ndarray, uv: numpy.ndarray, "
+                   "matrix: YuvMatrix = YuvMatrix.BT601) -> None"),
+           "Convert pixels into pre-allocated NV12 planes: y (H, W), uv ((H+1)/2, (W+1)/2 * 2); "
+           "flush() the attached Context first for complete pixels")
+      .def("scale", &PyImage::scale, "dst"_a, "filter"_a = ScaleFilter::BILINEAR,
+           nb::sig("def scale(self, dst: Image, filter: ScaleFilter = ScaleFilter.BILINEAR) -> None"),
+           "Resample this image into dst (same format) without holding the GIL");
+
+  nb::class_<PyScaler>(m, "Scaler")
+      .def(nb::init<int, int, int, int, ScaleFilter>(), "src_width"_a, "src_height"_a,
+           "dst_width"_a, "dst_height"_a, "filter"_a = ScaleFilter::BILINEAR,
+           nb::sig("def __init__(self, src_width: int, src_height: int, dst_width: int, "
+                   "dst_height: int, filter: ScaleFilter = ScaleFilter.BILINEAR) -> None"))
+      .def("scale", &PyScaler::scale, "src"_a, "dst"_a,
+           nb::sig("def scale(self, src: Image, dst: Image) -> None"),
+           "Resample src into dst using the precomputed filter weights")
+      .def_prop_ro(
+          "src_width", [](const PyScaler& s) { return s.src_width; },
+          nb::sig("def src_width(self) -> int"))
+      .def_prop_ro(
+          "src_height", [](const PyScaler& s) { return s.src_height; },
+          nb::sig("def src_height(self) -> int"))
+      .def_prop_ro(
+          "dst_width", [](const PyScaler& s) { return s.dst_width; },
+          nb::sig("def dst_width(self) -> int"))
+      .def_prop_ro(
+          "dst_height", [](const PyScaler& s) { return s.dst_height; },
+          nb::sig("def dst_height(self) -> int"))
+      .def_prop_ro(
+          "filter", [](const PyScaler& s) { return s.filter; },
+          nb::sig("def filter(self) -> ScaleFilter"));
+
+  nb::class_<PyStrokeOptions>(m, "StrokeOptions")
+      .def(
+          "__init__",
+          [](PyStrokeOptions* self, double width, BLStrokeJoin join, BLStrokeCap start_cap,
+             BLStrokeCap end_cap, double miter_limit, nb::handle dash_array, double dash_offset) {
+            new (self) PyStrokeOptions(width, join, start_cap, end_cap, miter_limit,
+                                       dash_values(dash_array), dash_offset);
+          },
+           "width"_a = 1.0, "join"_a = BL_STROKE_JOIN_MITER_CLIP,
+           "start_cap"_a = BL_STROKE_CAP_BUTT, "end_cap"_a = BL_STROKE_CAP_BUTT,
+           "miter_limit"_a = 4.0, "dash_array"_a = nb::tuple(), "dash_offset"_a = 0.0,
+           nb::sig("def __init__(self, width: float = 1.0, join: StrokeJoin = StrokeJoin.MITER_CLIP, "
+                   "start_cap: StrokeCap = StrokeCap.BUTT, end_cap: StrokeCap = StrokeCap.BUTT, "
+                   "miter_limit: float = 4.0, "
+                   "dash_array: numpy.ndarray | collections.abc.Sequence[float] = (), "
+                   "dash_offset: float = 0.0) -> None"),
+           "dash_array accepts a (N,) float64 NumPy array or a sequence of floats")
+      .def_prop_rw(
+          "width", [](const PyStrokeOptions& s) { return s.width; }, &PyStrokeOptions::set_width,
+          nb::sig("def width(self) -> float"))
+      .def_prop_rw(
+          "miter_limit", [](const PyStrokeOptions& s) { return s.miter_limit; },
+          &PyStrokeOptions::set_miter_limit,
+          nb::sig("def miter_limit(self) -> float"))
+      .def_prop_rw(
+          "start_cap", [](const PyStrokeOptions& s) { return s.start_cap; },
+          [](PyStrokeOptions& s, BLStrokeCap value) { s.start_cap = value; },
+          nb::sig("def start_cap(self) -> StrokeCap"))
+      .def_prop_rw(
+          "end_cap", [](const PyStrokeOptions& s) { return s.end_cap; },
+          [](PyStrokeOptions& s, BLStrokeCap value) { s.end_cap = value; },
+          nb::sig("def end_cap(self) -> StrokeCap"))
+      .def_prop_rw(
+          "join", [](const PyStrokeOptions& s) { return s.join; },
+          [](PyStrokeOptions& s, BLStrokeJoin value) { s.join = value; },
+          nb::sig("def join(self) -> StrokeJoin"))
+      .def_prop_rw(
+          "dash_array", [](const PyStrokeOptions& s) { return s.dash_array; },
+          [](PyStrokeOptions& s, nb::handle values) { s.set_dash_array(dash_values(values)); },
+          nb::sig("def dash_array(self) -> list[float]"),
+          "Lengths of alternating dashes and gaps; an empty list draws a solid line")
+      .def_prop_rw(
+          "dash_offset", [](const PyStrokeOptions& s) { return s.dash_offset; },
+          &PyStrokeOptions::set_dash_offset,
+          nb::sig("def dash_offset(self) -> float"))
+      .def("set_caps", &PyStrokeOptions::set_caps, "cap"_a,
+           nb::sig("def set_caps(self, cap: StrokeCap) -> None"),
+           "Set start_cap and end_cap to cap");
 
   nb::class_<PyPath>(m, "Path")
       .def(nb::init<>(), nb::sig("def __init__(self) -> None"))
+      .def(
+          "__init__",
+          [](PyPath* self, CommandArray commands, PointArray vertices) {
+            new (self) PyPath(PyPath::from_arrays(commands, vertices));
+          },
+          "commands"_a, "vertices"_a,
+          nb::sig("def __init__(self, commands: numpy.ndarray, vertices: numpy.ndarray) -> None"),
+          "Build a Path from (N,) uint8 PathCmd commands and (N, 2) float64 vertices")
       .def("move_to", &PyPath::move_to, "x"_a, "y"_a,
            nb::sig("def move_to(self, x: float, y: float) -> None"))
       .def("line_to", &PyPath::line_to, "x"_a, "y"_a,
@@ -409,25 +3654,169 @@ NB_MODULE(blend2d_ext, m) {
            nb::sig("def arc_to(self, cx: float, cy: float, rx: float, ry: float, start: float, sweep: float, force_move_to: bool = False) -> None"))
       .def("elliptic_arc_to", &PyPath::elliptic_arc_to, "rx"_a, "ry"_a, "x_axis_rotation"_a, "large_arc_flag"_a, "sweep_flag"_a, "x"_a, "y"_a,
            nb::sig("def elliptic_arc_to(self, rx: float, ry: float, x_axis_rotation: float, large_arc_flag: bool, sweep_flag: bool, x: float, y: float) -> None"))
-      .def("close", &PyPath::close, nb::sig("def close(self) -> None"));
+      .def("close", &PyPath::close, nb::sig("def close(self) -> None"))
+      .def("add_polyline", &PyPath::add_polyline, "points"_a,
+           nb::sig("def add_polyline(self, points: numpy.ndarray) -> None"),
+           "Add a polyline from an (N, 2) float64 array of x, y")
+      .def("add_polygon", &PyPath::add_polygon, "points"_a,
+           nb::sig("def add_polygon(self, points: numpy.ndarray) -> None"),
+           "Add a closed polygon from an (N, 2) float64 array of x, y")
+      .def("add_stroked_path", &PyPath::add_stroked_path, "src"_a, "options"_a,
+           nb::sig("def add_stroked_path(self, src: Path, options: StrokeOptions) -> None"),
+           "Append the outline of src stroked with options; fill it with fill_path")
+      .def_static("from_arrays", &PyPath::from_arrays, "commands"_a, "vertices"_a,
+                  nb::sig("def from_arrays(commands: numpy.ndarray, vertices: numpy.ndarray) "
+                          "-> Path"),
+                  "Build a Path from (N,) uint8 PathCmd commands and (N, 2) float64 vertices")
+      .def_prop_ro(
+          "size", [](const PyPath& s) { return s.size(); },
+          nb::sig("def size(self) -> int"))
+      .def("__len__", &PyPath::size, nb::sig("def __len__(self) -> int"))
+      .def("command_data", &PyPath::command_data,
+           nb::sig("def command_data(self) -> numpy.ndarray"),
+           "Read-only NumPy view (N,) uint8 of PathCmd; zero-copy")
+      .def("vertex_data", &PyPath::vertex_data,
+           nb::sig("def vertex_data(self) -> numpy.ndarray"),
+           "Read-only NumPy view (N, 2) float64 of vertices; zero-copy")
+      .def("__getstate__",
+           [](const PyPath& s) {
+             return std::make_tuple(s.command_data(), s.vertex_data());
+           },
+           nb::sig("def __getstate__(self) -> tuple[numpy.ndarray, numpy.ndarray]"))
+      .def("__setstate__",
+           [](PyPath& self, const std::tuple<CommandArray, PointArray>& state) {
+             new (&self) PyPath(PyPath::from_arrays(std::get<0>(state), std::get<1>(state)));
+           },
+           "state"_a,
+           nb::sig("def __setstate__(self, state: tuple[numpy.ndarray, numpy.ndarray]) -> None"));
 
   nb::class_<PyFontFace>(m, "FontFace")
       .def(nb::init<>(), nb::sig("def __init__(self) -> None"))
-      .def("create_from_file", &PyFontFace::create_from_file, "filename"_a,
-           nb::sig("def create_from_file(self, filename: str) -> None"))
+      .def("create_from_file", &PyFontFace::create_from_file, "filename"_a, "face_index"_a = 0,
+           nb::sig("def create_from_file(self, filename: str, face_index: int = 0) -> None"))
+      .def("create_from_data", &PyFontFace::create_from_data, "data"_a, "face_index"_a = 0,
+           nb::sig("def create_from_data(self, data: collections.abc.Buffer, "
+                   "face_index: int = 0) -> None"),
+           "Load a face from a buffer without copying; the buffer is kept alive and must not "
+           "be modified")
       .def_prop_ro(
           "family_name", [](const PyFontFace& s) { return s.family_name(); },
           nb::sig("def family_name(self) -> str"))
       .def_prop_ro(
           "weight", [](const PyFontFace& s) { return s.weight(); },
-          nb::sig("def weight(self) -> int"));
+          nb::sig("def weight(self) -> int"))
+      .def_prop_ro(
+          "face_index", [](const PyFontFace& s) { return s.face_index(); },
+          nb::sig("def face_index(self) -> int"));
+
+  nb::class_<BLFontMetrics>(m, "FontMetrics")
+      .def_prop_ro(
+          "size", [](const BLFontMetrics& s) { return s.size; },
+          nb::sig("def size(self) -> float"))
+      .def_prop_ro(
+          "ascent", [](const BLFontMetrics& s) { return s.ascent; },
+          nb::sig("def ascent(self) -> float"))
+      .def_prop_ro(
+          "descent", [](const BLFontMetrics& s) { return s.descent; },
+          nb::sig("def descent(self) -> float"))
+      .def_prop_ro(
+          "line_gap", [](const BLFontMetrics& s) { return s.line_gap; },
+          nb::sig("def line_gap(self) -> float"))
+      .def_prop_ro(
+          "x_height", [](const BLFontMetrics& s) { return s.x_height; },
+          nb::sig("def x_height(self) -> float"))
+      .def_prop_ro(
+          "cap_height", [](const BLFontMetrics& s) { return s.cap_height; },
+          nb::sig("def cap_height(self) -> float"))
+      .def_prop_ro(
+          "underline_position", [](const BLFontMetrics& s) { return s.underline_position; },
+          nb::sig("def underline_position(self) -> float"))
+      .def_prop_ro(
+          "underline_thickness", [](const BLFontMetrics& s) { return s.underline_thickness; },
+          nb::sig("def underline_thickness(self) -> float"))
+      .def_prop_ro(
+          "line_height",
+          [](const BLFontMetrics& s) { return s.ascent + s.descent + s.line_gap; },
+          nb::sig("def line_height(self) -> float"));
 
   nb::class_<PyFont>(m, "Font")
       .def(nb::init<PyFontFace&, float>(), "face"_a, "size"_a,
            nb::sig("def __init__(self, face: FontFace, size: float) -> None"))
       .def_prop_ro(
           "size", [](const PyFont& s) { return s.size(); },
-          nb::sig("def size(self) -> float"));
+          nb::sig("def size(self) -> float"))
+      .def(
+          "shape", [](PyFont& s, const std::string& text) { return PyGlyphRun(s, text); },
+          "text"_a, nb::sig("def shape(self, text: str) -> GlyphRun"),
+          "Shape text once so it can be drawn many times with Context.fill_glyph_run")
+      .def_prop_rw(
+          "text_cache_capacity", [](PyFont& s) { return s.text_cache_capacity(); },
+          [](PyFont& s, size_t capacity) { s.set_text_cache_capacity(capacity); },
+          nb::sig("def text_cache_capacity(self) -> int"),
+          "Maximum number of shaped strings kept in the LRU cache (0 disables it)")
+      .def_prop_ro(
+          "text_cache_size", [](PyFont& s) { return s.text_cache_size(); },
+          nb::sig("def text_cache_size(self) -> int"))
+      .def("clear_text_cache", &PyFont::clear_text_cache,
+           nb::sig("def clear_text_cache(self) -> None"))
+      .def_prop_ro(
+          "metrics", [](const PyFont& s) { return s.metrics(); },
+          nb::sig("def metrics(self) -> FontMetrics"))
+      .def("measure", &PyFont::measure, "text"_a,
+           nb::sig("def measure(self, text: str) -> numpy.ndarray"),
+           "Return [advance, x0, y0, x1, y1] of the shaped text as a float64 array")
+      .def("measure_many", &PyFont::measure_many, "texts"_a,
+           nb::sig("def measure_many(self, texts: collections.abc.Sequence[str]) -> numpy.ndarray"),
+           "Measure many strings at once; returns an (N, 5) float64 array of "
+           "[advance, x0, y0, x1, y1]")
+      .def("get_text_outlines", &PyFont::get_text_outlines, "text"_a, "x"_a = 0.0, "y"_a = 0.0,
+           nb::sig("def get_text_outlines(self, text: str, x: float = 0.0, y: float = 0.0) -> Path"),
+           "Convert text to a Path with the baseline origin at (x, y); glyph outlines are cached")
+      .def_prop_ro(
+          "outline_cache_size", [](PyFont& s) { return s.outline_cache_size(); },
+          nb::sig("def outline_cache_size(self) -> int"))
+      .def("clear_outline_cache", &PyFont::clear_outline_cache,
+           nb::sig("def clear_outline_cache(self) -> None"))
+      .def("wrap_text", &PyFont::wrap_text, "text"_a, "width"_a,
+           nb::sig("def wrap_text(self, text: str, width: float) -> list[str]"),
+           "Break text into lines that fit in width; breaks at spaces and between CJK "
+           "characters");
+
+  nb::class_<PyFontManager>(m, "FontManager")
+      .def(nb::init<>(), nb::sig("def __init__(self) -> None"))
+      .def_static("shared", &PyFontManager::shared, nb::rv_policy::reference,
+                  nb::sig("def shared() -> FontManager"),
+                  "Process-wide FontManager shared by all threads")
+      .def("load_face", &PyFontManager::load_face, "filename"_a, "face_index"_a = 0,
+           nb::sig("def load_face(self, filename: str, face_index: int = 0) -> FontFace"),
+           "Load a face through a memory-mapped file; the same file and face index are loaded "
+           "only once")
+      .def("load_faces", &PyFontManager::load_faces, "filename"_a,
+           nb::sig("def load_faces(self, filename: str) -> list[FontFace]"),
+           "Load all faces of a font file or collection (TTC)")
+      .def("add_face", &PyFontManager::add_face, "face"_a,
+           nb::sig("def add_face(self, face: FontFace) -> None"))
+      .def("query_face", &PyFontManager::query_face, "family"_a, "weight"_a = 400,
+           nb::sig("def query_face(self, family: str, weight: int = 400) -> FontFace | None"),
+           "Return the face of family closest to weight, or None")
+      .def("clear", &PyFontManager::clear, nb::sig("def clear(self) -> None"))
+      .def_prop_ro(
+          "face_count", [](PyFontManager& s) { return s.face_count(); },
+          nb::sig("def face_count(self) -> int"));
+
+  nb::class_<PyGlyphRun>(m, "GlyphRun")
+      .def(nb::init<PyFont&, const std::string&>(), "font"_a, "text"_a,
+           nb::sig("def __init__(self, font: Font, text: str) -> None"))
+      .def_prop_ro(
+          "text", [](const PyGlyphRun& s) { return s.text(); },
+          nb::sig("def text(self) -> str"))
+      .def_prop_ro(
+          "size", [](const PyGlyphRun& s) { return s.size(); },
+          nb::sig("def size(self) -> int"))
+      .def_prop_ro(
+          "advance", [](const PyGlyphRun& s) { return s.advance(); },
+          nb::sig("def advance(self) -> float"))
+      .def("__len__", &PyGlyphRun::size, nb::sig("def __len__(self) -> int"));
 
   nb::class_<PyGradient>(m, "Gradient")
       .def(nb::init<>(), nb::sig("def __init__(self) -> None"))
@@ -465,10 +3854,147 @@ NB_MODULE(blend2d_ext, m) {
           "extend_mode", [](const PyPattern& s) { return s.extend_mode(); },
           nb::sig("def extend_mode(self) -> ExtendMode"));
 
+  nb::class_<PyDirtyRegion>(m, "DirtyRegion")
+      .def(nb::init<int, int, size_t>(), "width"_a, "height"_a, "max_rects"_a = 16,
+           nb::sig("def __init__(self, width: int, height: int, max_rects: int = 16) -> None"))
+      .def("mark", &PyDirtyRegion::mark, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def mark(self, x: float, y: float, w: float, h: float) -> None"),
+           "Mark a changed rect; it is expanded to whole pixels and clipped to the region")
+      .def("mark_rects", &PyDirtyRegion::mark_rects, "rects"_a,
+           nb::sig("def mark_rects(self, rects: numpy.ndarray) -> None"),
+           "Mark (N, 4) float64 rects (x, y, w, h) in one call")
+      .def("mark_all", &PyDirtyRegion::mark_all, nb::sig("def mark_all(self) -> None"))
+      .def("clear", &PyDirtyRegion::clear, nb::sig("def clear(self) -> None"))
+      .def("rects", &PyDirtyRegion::rects, nb::sig("def rects(self) -> numpy.ndarray"),
+           "Return the non-overlapping dirty rects as an (N, 4) int32 array (x, y, w, h)")
+      .def("take", &PyDirtyRegion::take, nb::sig("def take(self) -> numpy.ndarray"),
+           "Return the dirty rects like rects() and clear the region")
+      .def("__len__", &PyDirtyRegion::size, nb::sig("def __len__(self) -> int"))
+      .def_prop_ro(
+          "bounds", [](PyDirtyRegion& s) { return s.bounds(); },
+          nb::sig("def bounds(self) -> tuple[int, int, int, int] | None"),
+          "Union of all dirty rects (x, y, w, h), or None when nothing is dirty")
+      .def_prop_ro(
+          "area", [](PyDirtyRegion& s) { return s.area(); },
+          nb::sig("def area(self) -> int"), "Number of dirty pixels")
+      .def_prop_ro(
+          "width", [](const PyDirtyRegion& s) { return s.width; },
+          nb::sig("def width(self) -> int"))
+      .def_prop_ro(
+          "height", [](const PyDirtyRegion& s) { return s.height; },
+          nb::sig("def height(self) -> int"))
+      .def_prop_ro(
+          "max_rects", [](const PyDirtyRegion& s) { return s.max_rects; },
+          nb::sig("def max_rects(self) -> int"));
+
+  nb::class_<PyDisplayList>(m, "DisplayList")
+      .def(nb::init<>(), nb::sig("def __init__(self) -> None"))
+      .def("save", &PyDisplayList::save, nb::sig("def save(self) -> int"))
+      .def("restore", &PyDisplayList::restore, nb::sig("def restore(self) -> int"))
+      .def("set_comp_op", &PyDisplayList::set_comp_op, "op"_a,
+           nb::sig("def set_comp_op(self, op: CompOp) -> int"))
+      .def("set_fill_style_rgba", &PyDisplayList::set_fill_style_rgba, "r"_a, "g"_a, "b"_a,
+           "a"_a = 255,
+           nb::sig("def set_fill_style_rgba(self, r: int, g: int, b: int, a: int = 255) -> int"))
+      .def("set_fill_style_gradient", &PyDisplayList::set_fill_style_gradient, "gradient"_a,
+           nb::sig("def set_fill_style_gradient(self, gradient: Gradient) -> int"))
+      .def("set_fill_style_pattern", &PyDisplayList::set_fill_style_pattern, "pattern"_a,
+           nb::sig("def set_fill_style_pattern(self, pattern: Pattern) -> int"))
+      .def("set_stroke_style_rgba", &PyDisplayList::set_stroke_style_rgba, "r"_a, "g"_a, "b"_a,
+           "a"_a = 255,
+           nb::sig("def set_stroke_style_rgba(self, r: int, g: int, b: int, a: int = 255) -> int"))
+      .def("set_stroke_style_gradient", &PyDisplayList::set_stroke_style_gradient, "gradient"_a,
+           nb::sig("def set_stroke_style_gradient(self, gradient: Gradient) -> int"))
+      .def("set_stroke_style_pattern", &PyDisplayList::set_stroke_style_pattern, "pattern"_a,
+           nb::sig("def set_stroke_style_pattern(self, pattern: Pattern) -> int"))
+      .def("set_stroke_width", &PyDisplayList::set_stroke_width, "width"_a,
+           nb::sig("def set_stroke_width(self, width: float) -> int"))
+      .def("set_stroke_miter_limit", &PyDisplayList::set_stroke_miter_limit, "miter_limit"_a,
+           nb::sig("def set_stroke_miter_limit(self, miter_limit: float) -> int"))
+      .def("set_stroke_join", &PyDisplayList::set_stroke_join, "stroke_join"_a,
+           nb::sig("def set_stroke_join(self, stroke_join: StrokeJoin) -> int"))
+      .def("set_stroke_caps", &PyDisplayList::set_stroke_caps, "stroke_cap"_a,
+           nb::sig("def set_stroke_caps(self, stroke_cap: StrokeCap) -> int"))
+      .def("set_global_alpha", &PyDisplayList::set_global_alpha, "alpha"_a,
+           nb::sig("def set_global_alpha(self, alpha: float) -> int"))
+      .def("set_fill_alpha", &PyDisplayList::set_fill_alpha, "alpha"_a,
+           nb::sig("def set_fill_alpha(self, alpha: float) -> int"))
+      .def("set_stroke_alpha", &PyDisplayList::set_stroke_alpha, "alpha"_a,
+           nb::sig("def set_stroke_alpha(self, alpha: float) -> int"))
+      .def("set_fill_rule", &PyDisplayList::set_fill_rule, "fill_rule"_a,
+           nb::sig("def set_fill_rule(self, fill_rule: FillRule) -> int"))
+      .def("set_stroke_options", &PyDisplayList::set_stroke_options, "options"_a,
+           nb::sig("def set_stroke_options(self, options: StrokeOptions) -> int"))
+      .def("set_stroke_dash_offset", &PyDisplayList::set_stroke_dash_offset, "offset"_a,
+           nb::sig("def set_stroke_dash_offset(self, offset: float) -> int"))
+      .def("translate", &PyDisplayList::translate, "x"_a, "y"_a,
+           nb::sig("def translate(self, x: float, y: float) -> int"))
+      .def("rotate", &PyDisplayList::rotate, "rad"_a,
+           nb::sig("def rotate(self, rad: float) -> int"))
+      .def("scale", &PyDisplayList::scale, "x"_a, "y"_a,
+           nb::sig("def scale(self, x: float, y: float) -> int"))
+      .def("apply_transform", &PyDisplayList::apply_transform, "m"_a,
+           nb::sig("def apply_transform(self, m: numpy.ndarray) -> int"),
+           "Record a 2x3 float64 affine matrix; params are m00, m10, m20, m01, m11, m21")
+      .def("fill_all", &PyDisplayList::fill_all, nb::sig("def fill_all(self) -> int"))
+      .def("fill_rect", &PyDisplayList::fill_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def fill_rect(self, x: float, y: float, w: float, h: float) -> int"))
+      .def("fill_circle", &PyDisplayList::fill_circle, "cx"_a, "cy"_a, "r"_a,
+           nb::sig("def fill_circle(self, cx: float, cy: float, r: float) -> int"))
+      .def("fill_pie", &PyDisplayList::fill_pie, "cx"_a, "cy"_a, "r"_a, "start"_a, "sweep"_a,
+           nb::sig("def fill_pie(self, cx: float, cy: float, r: float, start: float, "
+                   "sweep: float) -> int"))
+      .def("fill_path", &PyDisplayList::fill_path, "path"_a,
+           nb::sig("def fill_path(self, path: Path) -> int"))
+      .def("fill_utf8_text", &PyDisplayList::fill_utf8_text, "x"_a, "y"_a, "font"_a, "text"_a,
+           nb::sig("def fill_utf8_text(self, x: float, y: float, font: Font, text: str) -> int"))
+      .def("fill_glyph_run", &PyDisplayList::fill_glyph_run, "x"_a, "y"_a, "glyph_run"_a,
+           nb::sig("def fill_glyph_run(self, x: float, y: float, glyph_run: GlyphRun) -> int"))
+      .def("stroke_rect", &PyDisplayList::stroke_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def stroke_rect(self, x: float, y: float, w: float, h: float) -> int"))
+      .def("stroke_circle", &PyDisplayList::stroke_circle, "cx"_a, "cy"_a, "r"_a,
+           nb::sig("def stroke_circle(self, cx: float, cy: float, r: float) -> int"))
+      .def("stroke_path", &PyDisplayList::stroke_path, "path"_a,
+           nb::sig("def stroke_path(self, path: Path) -> int"))
+      .def("clip_to_rect", &PyDisplayList::clip_to_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def clip_to_rect(self, x: float, y: float, w: float, h: float) -> int"))
+      .def("restore_clipping", &PyDisplayList::restore_clipping,
+           nb::sig("def restore_clipping(self) -> int"))
+      .def("clear_rect", &PyDisplayList::clear_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def clear_rect(self, x: float, y: float, w: float, h: float) -> int"))
+      .def("clear_all", &PyDisplayList::clear_all, nb::sig("def clear_all(self) -> int"))
+      .def("patch", &PyDisplayList::patch, "index"_a, "values"_a,
+           nb::sig("def patch(self, index: int, values: collections.abc.Sequence[float]) -> None"),
+           "Replace the numeric arguments of the command at index")
+      .def("params", &PyDisplayList::params, "index"_a,
+           nb::sig("def params(self, index: int) -> list[float]"),
+           "Return the numeric arguments of the command at index")
+      .def("clear", &PyDisplayList::clear, nb::sig("def clear(self) -> None"))
+      .def("__len__", &PyDisplayList::size, nb::sig("def __len__(self) -> int"))
+      .def_prop_ro(
+          "size", [](PyDisplayList& s) { return s.size(); },
+          nb::sig("def size(self) -> int"));
+
   nb::class_<DrawContext>(m, "Context")
-      .def(nb::init<PyImage&, uint32_t>(), "image"_a, "thread_count"_a = 0,
-           nb::sig("def __init__(self, image: Image, thread_count: int = 0) -> None"))
+      .def(nb::init<PyImage*, uint32_t>(), "image"_a.none() = nb::none(), "thread_count"_a = 0,
+           nb::sig("def __init__(self, image: Image | None = None, thread_count: int = 0) -> None"))
+      .def("begin", &DrawContext::begin, "image"_a,
+           nb::sig("def begin(self, image: Image) -> None"),
+           "Attach to image; on the current image this resets the context and keeps its threads "
+           "and buffers")
+      .def("reset", &DrawContext::reset, nb::sig("def reset(self) -> None"),
+           "Wait for rendering and restore the initial state to draw the next frame")
       .def("end", &DrawContext::end, nb::sig("def end(self) -> None"))
+      .def("flush", &DrawContext::flush, "sync"_a = true,
+           nb::sig("def flush(self, sync: bool = True) -> None"),
+           "Submit pending commands; with sync=True wait until rendering is complete")
+      .def("flush_future", &DrawContext::flush_future,
+           nb::sig("def flush_future(self) -> concurrent.futures.Future[None]"),
+           "Wait for rendering in a background thread; the Future resolves when pixels are "
+           "safe to read")
+      .def("finish_async", &DrawContext::finish_async,
+           nb::sig("def finish_async(self) -> asyncio.Future[None]"),
+           "Awaitable version of flush_future() for the running asyncio event loop")
       .def("save", &DrawContext::save, nb::sig("def save(self) -> None"))
       .def("restore", &DrawContext::restore,
            nb::sig("def restore(self) -> None"))
@@ -498,10 +4024,86 @@ NB_MODULE(blend2d_ext, m) {
            nb::sig("def set_stroke_join(self, stroke_join: StrokeJoin) -> None"))
       .def("set_stroke_caps", &DrawContext::set_stroke_caps, "stroke_cap"_a,
            nb::sig("def set_stroke_caps(self, stroke_cap: StrokeCap) -> None"))
+      .def("set_stroke_options", &DrawContext::set_stroke_options, "options"_a,
+           nb::sig("def set_stroke_options(self, options: StrokeOptions) -> None"),
+           "Set width, join, caps, miter limit and dashes at once")
+      .def(
+          "set_stroke_dash_array",
+          [](DrawContext& s, nb::handle values) { s.set_stroke_dash_array(dash_values(values)); },
+          "dash_array"_a,
+          nb::sig("def set_stroke_dash_array(self, dash_array: numpy.ndarray | "
+                  "collections.abc.Sequence[float]) -> None"),
+          "Set the dash pattern from a (N,) float64 NumPy array; an empty array draws solid lines")
+      .def("set_stroke_dash_offset", &DrawContext::set_stroke_dash_offset, "offset"_a,
+           nb::sig("def set_stroke_dash_offset(self, offset: float) -> None"))
+      .def_prop_ro(
+          "stroke_options", [](DrawContext& s) { return s.stroke_options(); },
+          nb::sig("def stroke_options(self) -> StrokeOptions"),
+          "Copy of the current stroke settings")
+      .def("set_global_alpha", &DrawContext::set_global_alpha, "alpha"_a,
+           nb::sig("def set_global_alpha(self, alpha: float) -> None"),
+           "Set the alpha (0.0 - 1.0) applied to all fills, strokes and blits")
+      .def("set_fill_alpha", &DrawContext::set_fill_alpha, "alpha"_a,
+           nb::sig("def set_fill_alpha(self, alpha: float) -> None"))
+      .def("set_stroke_alpha", &DrawContext::set_stroke_alpha, "alpha"_a,
+           nb::sig("def set_stroke_alpha(self, alpha: float) -> None"))
+      .def("set_fill_rule", &DrawContext::set_fill_rule, "fill_rule"_a,
+           nb::sig("def set_fill_rule(self, fill_rule: FillRule) -> None"))
+      .def("set_rendering_quality", &DrawContext::set_rendering_quality, "quality"_a,
+           nb::sig("def set_rendering_quality(self, quality: RenderingQuality) -> None"))
+      .def("set_gradient_quality", &DrawContext::set_gradient_quality, "quality"_a,
+           nb::sig("def set_gradient_quality(self, quality: GradientQuality) -> None"))
+      .def("set_pattern_quality", &DrawContext::set_pattern_quality, "quality"_a,
+           nb::sig("def set_pattern_quality(self, quality: PatternQuality) -> None"))
+      .def("set_flatten_tolerance", &DrawContext::set_flatten_tolerance, "tolerance"_a,
+           nb::sig("def set_flatten_tolerance(self, tolerance: float) -> None"),
+           "Set the maximum error in pixels when curves are flattened to lines")
+      .def("set_profile", &DrawContext::set_profile, "profile"_a,
+           nb::sig("def set_profile(self, profile: RenderProfile) -> None"),
+           "Apply the quality hints of profile now and after every begin(), reset() and "
+           "begin_layer()")
+      .def_prop_ro(
+          "rendering_quality", [](DrawContext& s) { return s.rendering_quality(); },
+          nb::sig("def rendering_quality(self) -> RenderingQuality"))
+      .def_prop_ro(
+          "gradient_quality", [](DrawContext& s) { return s.gradient_quality(); },
+          nb::sig("def gradient_quality(self) -> GradientQuality"))
+      .def_prop_ro(
+          "pattern_quality", [](DrawContext& s) { return s.pattern_quality(); },
+          nb::sig("def pattern_quality(self) -> PatternQuality"))
+      .def_prop_ro(
+          "flatten_tolerance", [](DrawContext& s) { return s.flatten_tolerance(); },
+          nb::sig("def flatten_tolerance(self) -> float"))
+      .def_prop_ro(
+          "profile", [](DrawContext& s) { return s.profile; },
+          nb::sig("def profile(self) -> RenderProfile"))
+      .def("begin_layer", &DrawContext::begin_layer, "alpha"_a = 1.0,
+           "comp_op"_a = BL_COMP_OP_SRC_OVER,
+           nb::sig("def begin_layer(self, alpha: float = 1.0, comp_op: CompOp = CompOp.SRC_OVER) "
+                   "-> None"),
+           "Redirect drawing to a pooled offscreen image until end_layer()")
+      .def("end_layer", &DrawContext::end_layer, nb::sig("def end_layer(self) -> None"),
+           "Composite the current layer back with its alpha and comp_op")
+      .def_prop_ro(
+          "layer_depth", [](DrawContext& s) { return s.layer_depth(); },
+          nb::sig("def layer_depth(self) -> int"), "Number of layers begun and not yet ended")
       .def("translate", &DrawContext::translate, "x"_a, "y"_a,
            nb::sig("def translate(self, x: float, y: float) -> None"))
       .def("rotate", &DrawContext::rotate, "rad"_a,
            nb::sig("def rotate(self, rad: float) -> None"))
+      .def("scale", &DrawContext::scale, "x"_a, "y"_a,
+           nb::sig("def scale(self, x: float, y: float) -> None"))
+      .def("set_transform", &DrawContext::set_transform, "m"_a,
+           nb::sig("def set_transform(self, m: numpy.ndarray) -> None"),
+           "Replace the user transform with a 2x3 float64 affine matrix")
+      .def("apply_transform", &DrawContext::apply_transform, "m"_a,
+           nb::sig("def apply_transform(self, m: numpy.ndarray) -> None"),
+           "Apply a 2x3 float64 affine matrix before the current user transform")
+      .def("reset_transform", &DrawContext::reset_transform,
+           nb::sig("def reset_transform(self) -> None"))
+      .def_prop_ro("user_transform", &DrawContext::user_transform,
+                   nb::sig("def user_transform(self) -> numpy.ndarray"),
+                   "Current user transform as a 2x3 float64 array")
       .def("fill_all", &DrawContext::fill_all,
            nb::sig("def fill_all(self) -> None"))
       .def("fill_rect", &DrawContext::fill_rect, "x"_a, "y"_a, "w"_a, "h"_a,
@@ -520,6 +4122,8 @@ NB_MODULE(blend2d_ext, m) {
            "font"_a, "text"_a,
            nb::sig("def fill_utf8_text(self, x: float, y: float, font: Font, "
                    "text: str) -> None"))
+      .def("fill_glyph_run", &DrawContext::fill_glyph_run, "x"_a, "y"_a, "glyph_run"_a,
+           nb::sig("def fill_glyph_run(self, x: float, y: float, glyph_run: GlyphRun) -> None"))
       .def("stroke_rect", &DrawContext::stroke_rect, "x"_a, "y"_a, "w"_a, "h"_a,
            nb::sig("def stroke_rect(self, x: float, y: float, w: float, h: "
                    "float) -> None"))
@@ -527,9 +4131,81 @@ NB_MODULE(blend2d_ext, m) {
            nb::sig("def stroke_circle(self, cx: float, cy: float, r: float) -> None"))
       .def("stroke_path", &DrawContext::stroke_path, "path"_a,
            nb::sig("def stroke_path(self, path: Path) -> None"))
+      .def("clip_to_rect", &DrawContext::clip_to_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def clip_to_rect(self, x: float, y: float, w: float, h: float) -> None"),
+           "Intersect the clip region with the rect; restore() or restore_clipping() undoes it")
+      .def("restore_clipping", &DrawContext::restore_clipping,
+           nb::sig("def restore_clipping(self) -> None"),
+           "Restore the clip region of the last save()")
+      .def("clear_rect", &DrawContext::clear_rect, "x"_a, "y"_a, "w"_a, "h"_a,
+           nb::sig("def clear_rect(self, x: float, y: float, w: float, h: float) -> None"),
+           "Make the rect transparent")
+      .def("clear_all", &DrawContext::clear_all, nb::sig("def clear_all(self) -> None"),
+           "Make the clip region transparent")
+      .def("blit_image", &DrawContext::blit_image, "image"_a, "x"_a, "y"_a,
+           "src_rect"_a = nb::none(),
+           nb::sig("def blit_image(self, image: Image, x: float, y: float, "
+                   "src_rect: tuple[int, int, int, int] | None = None) -> None"),
+           "Draw image (or its src_rect area given as x, y, w, h) at (x, y)")
+      .def("blit_scaled_image", &DrawContext::blit_scaled_image, "image"_a, "x"_a, "y"_a, "w"_a,
+           "h"_a, "src_rect"_a = nb::none(),
+           nb::sig("def blit_scaled_image(self, image: Image, x: float, y: float, w: float, "
+                   "h: float, src_rect: tuple[int, int, int, int] | None = None) -> None"),
+           "Draw image (or its src_rect area) scaled to the rectangle x, y, w, h")
+      .def("blit_sprites", &DrawContext::blit_sprites, "atlas"_a, "src_rects"_a, "dst"_a,
+           nb::sig("def blit_sprites(self, atlas: Image, src_rects: numpy.ndarray, "
+                   "dst: numpy.ndarray) -> None"),
+           "Draw sprites from atlas in one call; src_rects is (N, 4) float64 and dst is (N, 2) "
+           "positions or (N, 4) scaled rectangles")
+      .def("replay", &DrawContext::replay, "display_list"_a, "dirty"_a.none() = nb::none(),
+           nb::sig("def replay(self, display_list: DisplayList, dirty: DirtyRegion | None = None) "
+                   "-> None"),
+           "Run all recorded commands in one call; state changes do not leak out. "
+           "With dirty, only the dirty rects are rasterized")
+      .def("fill_rects", &DrawContext::fill_rects, "rects"_a, "colors"_a = nb::none(),
+           nb::sig("def fill_rects(self, rects: numpy.ndarray, "
+                   "colors: numpy.ndarray | None = None) -> None"),
+           "Fill (N, 4) float64 rects (x, y, w, h) in one call; colors: optional (N, 4) uint8 RGBA")
+      .def("fill_circles", &DrawContext::fill_circles, "circles"_a, "colors"_a = nb::none(),
+           nb::sig("def fill_circles(self, circles: numpy.ndarray, "
+                   "colors: numpy.ndarray | None = None) -> None"),
+           "Fill (N, 3) float64 circles (cx, cy, r) in one call; colors: optional (N, 4) uint8 RGBA")
+      .def("stroke_rects", &DrawContext::stroke_rects, "rects"_a, "colors"_a = nb::none(),
+           nb::sig("def stroke_rects(self, rects: numpy.ndarray, "
+                   "colors: numpy.ndarray | None = None) -> None"),
+           "Stroke (N, 4) float64 rects (x, y, w, h) in one call; colors: optional (N, 4) uint8 RGBA")
+      .def("stroke_circles", &DrawContext::stroke_circles, "circles"_a, "colors"_a = nb::none(),
+           nb::sig("def stroke_circles(self, circles: numpy.ndarray, "
+                   "colors: numpy.ndarray | None = None) -> None"),
+           "Stroke (N, 3) float64 circles (cx, cy, r) in one call; colors: optional (N, 4) uint8 RGBA")
+      .def("fill_path_instances", &DrawContext::fill_path_instances, "path"_a, "transforms"_a,
+           "colors"_a = nb::none(),
+           nb::sig("def fill_path_instances(self, path: Path, transforms: numpy.ndarray, "
+                   "colors: numpy.ndarray | None = None) -> None"),
+           "Fill path under (N, 2, 3) float64 transforms in one call; colors: optional (N, 4) uint8 RGBA")
       .def("__enter__", [](DrawContext& self) -> DrawContext& { return self; })
       .def(
           "__exit__",
           [](DrawContext& self, nb::object, nb::object, nb::object) { self.end(); },
           "exc_type"_a.none(), "exc_val"_a.none(), "exc_tb"_a.none());
+
+  nb::class_<PyFrameRing>(m, "FrameRing")
+      .def(nb::init<int, int, size_t, uint32_t>(), "width"_a, "height"_a, "count"_a = 3,
+           "thread_count"_a = 4,
+           nb::sig("def __init__(self, width: int, height: int, count: int = 3, "
+                   "thread_count: int = 4) -> None"))
+      .def("begin_frame", &PyFrameRing::begin_frame,
+           nb::sig("def begin_frame(self) -> Context"),
+           "Reset the next free slot and return its Context for recording")
+      .def("submit", &PyFrameRing::submit, nb::sig("def submit(self) -> None"),
+           "Finish recording; rendering completes in the background")
+      .def("acquire", &PyFrameRing::acquire,
+           nb::sig("def acquire(self) -> numpy.ndarray"),
+           "Wait for the oldest submitted frame and return a read-only (H, W, 4) uint8 view; "
+           "the slot is reused only after every view of the frame is released")
+      .def_prop_ro(
+          "count", [](const PyFrameRing& s) { return s.count(); },
+          nb::sig("def count(self) -> int"))
+      .def("image", &PyFrameRing::image, "index"_a,
+           nb::sig("def image(self, index: int) -> Image"));
 }
@@ -7,19 +7,174 @@
 #include <nanobind/ndarray.h>
 #include <nanobind/stl/optional.h>
 #include <nanobind/stl/string.h>
+#include <nanobind/stl/tuple.h>
+#include <nanobind/stl/vector.h>
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <cmath>
+#include <condition_variable>
 #include <cstdint>
+#include <cstring>
+#include <deque>
+#include <filesystem>
+#include <list>
+#include <map>
+#include <memory>
+#include <mutex>
 #include <string>
+#include <string_view>
+#include <thread>
+#include <unordered_map>
+#include <vector>
 
 namespace nb = nanobind;
 
+// (N, 4) x, y, w, h
+using RectArray = nb::ndarray<const double, nb::shape<-1, 4>, nb::c_contig, nb::device::cpu>;
+// (N, 3) cx, cy, r
+using CircleArray = nb::ndarray<const double, nb::shape<-1, 3>, nb::c_contig, nb::device::cpu>;
+// (N, 2) x, y
+using PointArray = nb::ndarray<const double, nb::shape<-1, 2>, nb::c_contig, nb::device::cpu>;
+// (N,) BLPathCmd
+using CommandArray = nb::ndarray<const uint8_t, nb::shape<-1>, nb::c_contig, nb::device::cpu>;
+// 任意形状の書き込み可能な uint8 配列 (変換先)
+using ByteArray = nb::ndarray<uint8_t, nb::c_contig, nb::device::cpu>;
+// (H, W) uint8 の画像プレーン
+using PlaneArray = nb::ndarray<uint8_t, nb::ndim<2>, nb::c_contig, nb::device::cpu>;
+// (N, 4) r, g, b, a
+using ColorArray = nb::ndarray<const uint8_t, nb::shape<-1, 4>, nb::c_contig, nb::device::cpu>;
+// (N,) 破線の線と隙間の長さ
+using DashArray = nb::ndarray<const double, nb::ndim<1>, nb::c_contig, nb::device::cpu>;
+// 2x3 のアフィン変換行列 [[m00, m10, m20], [m01, m11, m21]]
+using TransformArray = nb::ndarray<const double, nb::shape<2, 3>, nb::c_contig, nb::device::cpu>;
+// (N, 2, 3) のアフィン変換行列
+using TransformsArray = nb::ndarray<const double, nb::shape<-1, 2, 3>, nb::c_contig, nb::device::cpu>;
+// (N, 2) x, y または (N, 4) x, y, w, h
+using PlacementArray = nb::ndarray<const double, nb::ndim<2>, nb::c_contig, nb::device::cpu>;
+// x, y, w, h
+using RectTuple = std::tuple<int, int, int, int>;
+
+// Image.convert_to の変換先フォーマット
+// BGRA32 / RGBA32 は乗算済みアルファを戻したストレートアルファ、BGR24 / RGB24 は黒背景に合成した色になる
+enum class PixelFormat : uint32_t {
+  BGRA32,
+  RGBA32,
+  BGR24,
+  RGB24,
+};
+
+// YUV 変換の色空間 (リミテッドレンジ)
+enum class YuvMatrix : uint32_t {
+  BT601,
+  BT709,
+};
+
+// Image.scale / Scaler のリサンプリングフィルタ
+enum class ScaleFilter : uint32_t {
+  NEAREST,
+  BILINEAR,
+  BICUBIC,
+  LANCZOS,
+};
+
+// Context.set_profile の描画品質プロファイル
+enum class RenderProfile : uint32_t {
+  // Blend2D のデフォルト
+  DEFAULT,
+  // 確認用のプレビュー。最も軽い設定
+  PREVIEW,
+  // 本番出力。グラデーションをディザリングする
+  QUALITY,
+};
+
+// Python オブジェクトのバッファを Blend2D の外部データとして貸し出すためのホルダー
+// Py_buffer が元のオブジェクトへの参照を保持するため、Blend2D 側のデータが破棄されるまで解放されない
+struct ExternalBuffer {
+  Py_buffer view;
+
+  static ExternalBuffer* acquire(nb::handle obj, bool writable);
+  // BLDestroyExternalDataFunc として Blend2D から呼ばれる
+  static void destroy(void* impl, void* external_data, void* user_data) noexcept;
+};
+
 struct PyImage {
   BLImage img;
   int width = 0;
   int height = 0;
+  BLFormat format = BL_FORMAT_PRGB32;
+  // この Image を描画先にしている Context が存在するか
+  std::atomic<bool> attached{false};
+  // Context が描画を開始するたびに増える世代番号
+  // ビュー取得時の値と比較することで、ビューの内容が書き換えられたかを検出できる
+  std::atomic<uint64_t> generation{0};
 
-  PyImage(int w, int h);
+  PyImage() = default;
+  PyImage(int w, int h, BLFormat fmt = BL_FORMAT_PRGB32);
+  static PyImage* from_buffer(nb::handle obj, int w, int h, intptr_t stride, BLFormat fmt);
   nb::object memoryview();
   nb::ndarray<nb::numpy, uint8_t> asarray();
+  void convert_to(ByteArray dst, PixelFormat pixel_format);
+  void to_i420(PlaneArray y, PlaneArray u, PlaneArray v, YuvMatrix matrix);
+  void to_nv12(PlaneArray y, ByteArray uv, YuvMatrix matrix);
+  void scale(PyImage& dst, ScaleFilter filter);
+};
+
+// 1 次元のリサンプリング係数 (14 ビット固定小数点)
+// 出力の i 番目は入力の [start[i], start[i] + count[i]) を coeffs[i * taps] から重み付けした和
+struct ResampleWeights {
+  std::vector<int> start;
+  std::vector<int> count;
+  std::vector<int32_t> coeffs;
+  int taps = 0;
+};
+
+// 入力サイズと出力サイズの組み合わせごとに係数を計算しておき、同じサイズの拡大縮小を繰り返す
+struct PyScaler {
+  int src_width;
+  int src_height;
+  int dst_width;
+  int dst_height;
+  ScaleFilter filter;
+  ResampleWeights horizontal;
+  ResampleWeights vertical;
+  // 横方向に縮小した中間結果。同じ Scaler を複数スレッドから使う場合は mutex で直列化する
+  std::vector<uint8_t> temp;
+  std::mutex mutex;
+
+  PyScaler(int src_width,
+           int src_height,
+           int dst_width,
+           int dst_height,
+           ScaleFilter filter = ScaleFilter::BILINEAR);
+  void scale(PyImage& src, PyImage& dst);
+};
+
+// Path.add_stroked_path / Context.set_stroke_options のストローク設定
+// Blend2D のストロークは破線に対応していないため、dash_array を指定した場合は折れ線に分割して破線化してからストロークする
+struct PyStrokeOptions {
+  double width = 1.0;
+  double miter_limit = 4.0;
+  BLStrokeCap start_cap = BL_STROKE_CAP_BUTT;
+  BLStrokeCap end_cap = BL_STROKE_CAP_BUTT;
+  BLStrokeJoin join = BL_STROKE_JOIN_MITER_CLIP;
+  std::vector<double> dash_array;
+  double dash_offset = 0.0;
+
+  PyStrokeOptions(double width,
+                  BLStrokeJoin join,
+                  BLStrokeCap start_cap,
+                  BLStrokeCap end_cap,
+                  double miter_limit,
+                  const std::vector<double>& dash_array,
+                  double dash_offset);
+  void set_width(double value);
+  void set_miter_limit(double value);
+  void set_dash_offset(double value);
+  void set_caps(BLStrokeCap cap);
+  void set_dash_array(const std::vector<double>& values);
+  BLStrokeOptions to_stroke_options() const;
+  BLResult stroke(const BLPath& src, BLPath& out) const;
 };
 
 struct PyPath {
@@ -34,22 +189,95 @@ struct PyPath {
   void arc_to(double cx, double cy, double rx, double ry, double start, double sweep, bool force_move_to = false);
   void elliptic_arc_to(double rx, double ry, double x_axis_rotation, bool large_arc_flag, bool sweep_flag, double x, double y);
   void close();
+  void add_polyline(PointArray points);
+  void add_polygon(PointArray points);
+  void add_stroked_path(const PyPath& src, const PyStrokeOptions& options);
+  static PyPath from_arrays(CommandArray commands, PointArray vertices);
+  size_t size() const;
+  nb::ndarray<nb::numpy, const uint8_t, nb::shape<-1>> command_data() const;
+  nb::ndarray<nb::numpy, const double, nb::shape<-1, 2>> vertex_data() const;
 };
 
 struct PyFontFace {
   BLFontFace face;
 
   PyFontFace();
-  void create_from_file(const std::string& filename);
+  void create_from_file(const std::string& filename, uint32_t face_index = 0);
+  void create_from_data(nb::handle data, uint32_t face_index = 0);
   std::string family_name() const;
   uint32_t weight() const;
+  uint32_t face_index() const;
+};
+
+// 整形済みテキスト。作成後は変更しないため、GlyphRun / キャッシュ / 描画スレッドで共有する
+struct ShapedText {
+  std::string text;
+  BLGlyphBuffer buffer;
+  BLTextMetrics metrics{};
 };
 
 struct PyFont {
   BLFont font;
+  // 整形済みテキストの LRU キャッシュ。先頭が最近使ったもの
+  // キーは ShapedText::text を参照する
+  std::list<std::shared_ptr<const ShapedText>> text_cache;
+  std::unordered_map<std::string_view, std::list<std::shared_ptr<const ShapedText>>::iterator>
+      text_cache_index;
+  size_t text_cache_limit = 128;
+  std::mutex text_cache_mutex;
+  // グリフ ID ごとのアウトライン (フォントサイズ適用済み、原点はベースライン上のペン位置)
+  std::unordered_map<uint32_t, BLPath> outline_cache;
+  std::mutex outline_cache_mutex;
 
   PyFont(PyFontFace& face, float size);
   float size() const;
+  std::shared_ptr<const ShapedText> shape_cached(const std::string& text);
+  size_t text_cache_capacity();
+  void set_text_cache_capacity(size_t capacity);
+  size_t text_cache_size();
+  void clear_text_cache();
+  BLFontMetrics metrics() const;
+  nb::ndarray<nb::numpy, double, nb::shape<5>> measure(const std::string& text);
+  nb::ndarray<nb::numpy, double, nb::shape<-1, 5>> measure_many(
+      const std::vector<std::string>& texts);
+  std::vector<std::string> wrap_text(const std::string& text, double width);
+  PyPath get_text_outlines(const std::string& text, double x = 0.0, double y = 0.0);
+  size_t outline_cache_size();
+  void clear_outline_cache();
+
+ private:
+  void evict_text_cache();
+};
+
+// 整形済みのグリフ列。同じテキストを整形し直さずに何度でも描画できる
+struct PyGlyphRun {
+  BLFont font;
+  std::shared_ptr<const ShapedText> shaped;
+
+  PyGlyphRun(PyFont& font, const std::string& text);
+  const std::string& text() const;
+  size_t size() const;
+  double advance() const;
+};
+
+// 読み込んだフォントフェイスをファイルパスとフェイス番号で共有するフォントマネージャー
+// フォントファイルはメモリマップで読み込み、同じファイルは 2 回目以降解析しない
+struct PyFontManager {
+  BLFontManager manager;
+  std::map<std::pair<std::string, uint32_t>, BLFontFace> faces;
+  std::mutex mutex;
+
+  PyFontManager();
+  static PyFontManager& shared();
+  PyFontFace load_face(const std::string& filename, uint32_t face_index = 0);
+  std::vector<PyFontFace> load_faces(const std::string& filename);
+  void add_face(PyFontFace& face);
+  std::optional<PyFontFace> query_face(const std::string& family, uint32_t weight = 400);
+  size_t face_count();
+  void clear();
+
+ private:
+  BLFontFace load_cached(const std::string& filename, uint32_t face_index, BLFontData* data_out);
 };
 
 struct PyGradient {
@@ -77,14 +305,232 @@ struct PyPattern {
   void set_extend_mode(BLExtendMode extend_mode);
 };
 
+// DisplayList の命令種別
+enum class DisplayOp : uint8_t {
+  SAVE,
+  RESTORE,
+  SET_COMP_OP,
+  SET_FILL_STYLE_RGBA,
+  SET_FILL_STYLE_GRADIENT,
+  SET_FILL_STYLE_PATTERN,
+  SET_STROKE_STYLE_RGBA,
+  SET_STROKE_STYLE_GRADIENT,
+  SET_STROKE_STYLE_PATTERN,
+  SET_STROKE_WIDTH,
+  SET_STROKE_MITER_LIMIT,
+  SET_STROKE_JOIN,
+  SET_STROKE_CAPS,
+  TRANSLATE,
+  ROTATE,
+  FILL_ALL,
+  FILL_RECT,
+  FILL_CIRCLE,
+  FILL_PIE,
+  FILL_PATH,
+  FILL_GLYPH_RUN,
+  STROKE_RECT,
+  STROKE_CIRCLE,
+  STROKE_PATH,
+  CLIP_TO_RECT,
+  RESTORE_CLIPPING,
+  CLEAR_RECT,
+  CLEAR_ALL,
+  SET_GLOBAL_ALPHA,
+  SET_FILL_ALPHA,
+  SET_STROKE_ALPHA,
+  SET_FILL_RULE,
+  SET_STROKE_OPTIONS,
+  SET_STROKE_DASH_OFFSET,
+  SCALE,
+  APPLY_TRANSFORM,
+};
+
+// 1 命令分の記録。数値引数は params[offset, offset + count) に格納する
+struct DisplayCommand {
+  DisplayOp op;
+  // paths / gradients / patterns / fonts (と texts) のインデックス
+  uint32_t resource;
+  uint32_t offset;
+  uint32_t count;
+};
+
+struct DisplayData {
+  std::vector<DisplayCommand> commands;
+  std::vector<double> params;
+  std::vector<BLPath> paths;
+  std::vector<BLGradient> gradients;
+  std::vector<BLPattern> patterns;
+  std::vector<BLFont> fonts;
+  std::vector<std::shared_ptr<const ShapedText>> texts;
+};
+
+// Context の描画命令を記録し、Context.replay で GIL を解放したまま再生する
+// データは replay 中のスナップショットと共有し、変更時にコピーする (Copy-on-Write)
+struct PyDisplayList {
+  std::shared_ptr<DisplayData> data = std::make_shared<DisplayData>();
+  // 記録や patch と replay のスナップショット取得を複数スレッドから同時に行わせないためのロック
+  std::mutex mutex;
+
+  uint32_t save();
+  uint32_t restore();
+  uint32_t set_comp_op(BLCompOp op);
+  uint32_t set_fill_style_rgba(uint32_t r, uint32_t g, uint32_t b, uint32_t a = 255);
+  uint32_t set_fill_style_gradient(PyGradient& gradient);
+  uint32_t set_fill_style_pattern(PyPattern& pattern);
+  uint32_t set_stroke_style_rgba(uint32_t r, uint32_t g, uint32_t b, uint32_t a = 255);
+  uint32_t set_stroke_style_gradient(PyGradient& gradient);
+  uint32_t set_stroke_style_pattern(PyPattern& pattern);
+  uint32_t set_stroke_width(double width);
+  uint32_t set_stroke_miter_limit(double miter_limit);
+  uint32_t set_stroke_join(BLStrokeJoin stroke_join);
+  uint32_t set_stroke_caps(BLStrokeCap stroke_cap);
+  uint32_t set_global_alpha(double alpha);
+  uint32_t set_fill_alpha(double alpha);
+  uint32_t set_stroke_alpha(double alpha);
+  uint32_t set_fill_rule(BLFillRule fill_rule);
+  uint32_t set_stroke_options(PyStrokeOptions& options);
+  uint32_t set_stroke_dash_offset(double offset);
+  uint32_t translate(double x, double y);
+  uint32_t rotate(double rad);
+  uint32_t scale(double x, double y);
+  uint32_t apply_transform(TransformArray m);
+  uint32_t fill_all();
+  uint32_t fill_rect(double x, double y, double w, double h);
+  uint32_t fill_circle(double cx, double cy, double r);
+  uint32_t fill_pie(double cx, double cy, double r, double start, double sweep);
+  uint32_t fill_path(PyPath& p);
+  uint32_t fill_utf8_text(double x, double y, PyFont& font, const std::string& text);
+  uint32_t fill_glyph_run(double x, double y, PyGlyphRun& glyph_run);
+  uint32_t stroke_rect(double x, double y, double w, double h);
+  uint32_t stroke_circle(double cx, double cy, double r);
+  uint32_t stroke_path(PyPath& p);
+  uint32_t clip_to_rect(double x, double y, double w, double h);
+  uint32_t restore_clipping();
+  uint32_t clear_rect(double x, double y, double w, double h);
+  uint32_t clear_all();
+
+  void patch(uint32_t index, const std::vector<double>& values);
+  std::vector<double> params(uint32_t index);
+  void clear();
+  size_t size();
+  std::shared_ptr<DisplayData> snapshot();
+
+ private:
+  DisplayData& mutable_data();
+  uint32_t record(DisplayOp op, std::initializer_list<double> values);
+  uint32_t append(DisplayData& d,
+                  DisplayOp op,
+                  std::initializer_list<double> values,
+                  uint32_t resource = 0);
+};
+
+// 変更のあった矩形を記録し、部分再描画する領域を求めるダメージトラッカー
+// 記録した矩形は重なるものを統合して互いに重ならない状態に保つ。
+// 矩形数が max_rects を超えた場合は、統合による増分面積が最小の 2 つを統合する
+struct PyDirtyRegion {
+  struct Box {
+    int x0, y0, x1, y1;
+  };
+
+  int width;
+  int height;
+  size_t max_rects;
+  std::vector<Box> boxes;
+  std::mutex mutex;
+
+  PyDirtyRegion(int width, int height, size_t max_rects = 16);
+
+  void mark(double x, double y, double w, double h);
+  void mark_rects(RectArray rects);
+  void mark_all();
+  void clear();
+  nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> rects();
+  nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> take();
+  std::optional<RectTuple> bounds();
+  int64_t area();
+  size_t size();
+  std::vector<Box> snapshot();
+
+ private:
+  void add_box(Box box);
+  static nb::ndarray<nb::numpy, int32_t, nb::shape<-1, 4>> to_array(const std::vector<Box>& boxes);
+};
+
+// GIL を解放してから Context のロックを取得する。ラスタライズや描画完了待ちなど時間のかかる処理で使う
+// GIL を保持したまま長時間ロック待ちをすると他の Python スレッドが止まるため、必ずこの順番で取得する
+// 解放時はロックを解放してから GIL を再取得する
+struct ContextGuard {
+  nb::gil_scoped_release release;
+  std::lock_guard<std::mutex> lock;
+
+  explicit ContextGuard(std::mutex& m) : lock(m) {}
+};
+
+// 描画状態の設定や取得だけを行う短い処理で使うロック。GIL を保持したまま取得する
+// 呼び出しごとに GIL を受け渡すと、細かい設定を繰り返す描画ループでスレッド間の GIL の奪い合いになるため。
+// ContextGuard はロックを解放してから GIL を再取得するので、GIL を保持したまま待ってもデッドロックしない
+using StateGuard = std::lock_guard<std::mutex>;
+
 struct DrawContext {
+  // begin_layer で退避した Context と、レイヤーの描画先のオフスクリーン Image
+  struct Layer {
+    BLContext parent;
+    BLImage image;
+    // レイヤーの Context の初期状態。再利用時にこの状態に戻す
+    BLContextCookie cookie;
+    double alpha;
+    BLCompOp comp_op;
+  };
+
+  // 合成済みのレイヤーのオフスクリーン Image と、その Image に描画する Context。
+  // Context は end せずに使い回し、begin_layer のたびにワーカースレッドを作り直さない
+  struct LayerSurface {
+    BLImage image;
+    BLContext ctx;
+    BLContextCookie cookie;
+  };
+
+  // 描画中の Context。レイヤーの描画中はオフスクリーン Image の Context になる
   BLContext ctx;
-  bool ended = false;
+  BLContextCreateInfo create_info{};
+  // begin 直後の状態。reset で描画状態をこの状態に戻す
+  BLContextCookie cookie;
+  PyImage* target = nullptr;
+  // 描画先の Image を解放させないための参照
+  nb::object image_ref;
+  bool ended = true;
+  // 同じ Context を複数スレッドから同時に操作させないためのロック
+  std::mutex mutex;
+  // flush_future の Future を描画完了後に完了させるスレッド。最初の flush_future で起動し、
+  // Context が解放されるまで使い回す
+  std::thread completion;
+  std::mutex completion_mutex;
+  std::condition_variable completion_cv;
+  // 完了待ちの Future (参照を 1 つ保持した生ポインタ)
+  std::vector<PyObject*> completion_queue;
+  bool completion_stopping = false;
+  std::vector<Layer> layers;
+  // 同じサイズの begin_layer で再利用するレイヤー
+  std::vector<LayerSurface> layer_pool;
+  // 合成先の Context が非同期に読み出している可能性があるレイヤー。
+  // 描画先の Context の描画完了を待った後に layer_pool に移す
+  std::vector<LayerSurface> released_layers;
+  // begin / reset / begin_layer のたびに適用する描画品質
+  RenderProfile profile = RenderProfile::DEFAULT;
+  // RenderProfile::DEFAULT で戻す Blend2D のデフォルト値。begin 時に取得する
+  BLContextHints default_hints{};
+  double default_flatten_tolerance = 0.2;
 
-  DrawContext(PyImage& img, uint32_t thread_count = 0);
+  DrawContext(PyImage* img, uint32_t thread_count = 0);
   ~DrawContext();
 
+  void begin(PyImage& img);
+  void reset();
   void end();
+  void detach(nb::object& released_ref);
+  void flush(bool sync = true);
+  nb::object flush_future();
+  nb::object finish_async();
   void save();
   void restore();
   void set_comp_op(BLCompOp op);
@@ -104,15 +550,110 @@ struct DrawContext {
   void set_stroke_miter_limit(double miter_limit);
   void set_stroke_join(BLStrokeJoin stroke_join);
   void set_stroke_caps(BLStrokeCap stroke_cap);
+  void set_stroke_options(PyStrokeOptions& options);
+  void set_stroke_dash_array(const std::vector<double>& values);
+  void set_stroke_dash_offset(double offset);
+  PyStrokeOptions stroke_options();
+  void set_global_alpha(double alpha);
+  void set_fill_alpha(double alpha);
+  void set_stroke_alpha(double alpha);
+  void set_fill_rule(BLFillRule fill_rule);
+  void set_rendering_quality(BLRenderingQuality quality);
+  void set_gradient_quality(BLGradientQuality quality);
+  void set_pattern_quality(BLPatternQuality quality);
+  void set_flatten_tolerance(double tolerance);
+  BLRenderingQuality rendering_quality();
+  BLGradientQuality gradient_quality();
+  BLPatternQuality pattern_quality();
+  double flatten_tolerance();
+  void set_profile(RenderProfile profile);
+  void begin_layer(double alpha = 1.0, BLCompOp comp_op = BL_COMP_OP_SRC_OVER);
+  void end_layer();
+  size_t layer_depth();
   void translate(double x, double y);
   void rotate(double rad);
+  void scale(double x, double y);
+  void set_transform(TransformArray m);
+  void apply_transform(TransformArray m);
+  void reset_transform();
+  nb::ndarray<nb::numpy, double, nb::shape<2, 3>> user_transform();
   void fill_all();
   void fill_rect(double x, double y, double w, double h);
   void fill_circle(double cx, double cy, double r);
   void fill_pie(double cx, double cy, double r, double start, double sweep);
   void fill_path(PyPath& p);
   void fill_utf8_text(double x, double y, PyFont& font, const std::string& text);
+  void fill_glyph_run(double x, double y, PyGlyphRun& glyph_run);
   void stroke_rect(double x, double y, double w, double h);
   void stroke_circle(double cx, double cy, double r);
   void stroke_path(PyPath& p);
+  void fill_rects(RectArray rects, std::optional<ColorArray> colors);
+  void fill_circles(CircleArray circles, std::optional<ColorArray> colors);
+  void stroke_rects(RectArray rects, std::optional<ColorArray> colors);
+  void stroke_circles(CircleArray circles, std::optional<ColorArray> colors);
+  void fill_path_instances(PyPath& path,
+                           TransformsArray transforms,
+                           std::optional<ColorArray> colors);
+  void blit_image(PyImage& image, double x, double y, std::optional<RectTuple> src_rect);
+  void blit_scaled_image(PyImage& image,
+                         double x,
+                         double y,
+                         double w,
+                         double h,
+                         std::optional<RectTuple> src_rect);
+  void blit_sprites(PyImage& atlas, RectArray src_rects, PlacementArray dst);
+  void clip_to_rect(double x, double y, double w, double h);
+  void restore_clipping();
+  void clear_rect(double x, double y, double w, double h);
+  void clear_all();
+  void replay(PyDisplayList& display_list, PyDirtyRegion* dirty = nullptr);
+  BLContext& root_context();
+
+ private:
+  void drop_layers();
+  void release_layer(LayerSurface surface);
+  void recycle_layers();
+  void completion_main();
+  void apply_profile(BLContext& target_ctx);
+};
+
+// 事前に確保した Image / Context をリングバッファで使い回すフレームリング
+// submit したフレームの描画完了待ち (BL_CONTEXT_FLUSH_SYNC) は専用スレッドで行うため、
+// 呼び出し側は完了を待たずに次のフレームを記録できる
+struct PyFrameRing {
+  enum class SlotState { FREE, RECORDING, SUBMITTED, ACQUIRED };
+
+  struct Slot {
+    nb::object image_ref;
+    nb::object context_ref;
+    PyImage* image = nullptr;
+    DrawContext* context = nullptr;
+    SlotState state = SlotState::FREE;
+    // 描画完了待ちが終わったか
+    bool done = false;
+  };
+
+  std::vector<Slot> slots;
+  // 次に記録するスロット
+  size_t write_index = 0;
+  // 次に acquire するスロット
+  size_t read_index = 0;
+  std::deque<size_t> pending;
+  bool stopping = false;
+  std::mutex mutex;
+  std::condition_variable cv;
+  std::thread flusher;
+
+  PyFrameRing(int width, int height, size_t count = 3, uint32_t thread_count = 4);
+  ~PyFrameRing();
+
+  nb::object begin_frame();
+  void submit();
+  nb::ndarray<nb::numpy, const uint8_t, nb::ndim<3>> acquire();
+  size_t count() const;
+  nb::object image(size_t index) const;
+
+ private:
+  void flusher_main();
+  void release_slot(size_t index);
 };
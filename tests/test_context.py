@@ -1,3 +1,10 @@
+import asyncio
+import sys
+import threading
+
+import numpy as np
+import pytest
+
 import blend2d as bl
 
 
@@ -58,3 +65,740 @@ def test_context_manager_end_twice():
     with bl.Context(img) as ctx:
         ctx.fill_rect(0, 0, 100, 100)
     ctx.end()  # 2回目の end() - 安全であるべき
+
+
+def test_context_image_already_attached():
+    """描画中の Image に別の Context は作成できない"""
+    img = bl.Image(100, 100)
+    ctx = bl.Context(img)
+    with pytest.raises(RuntimeError):
+        bl.Context(img)
+    ctx.end()
+    # end() 後は再び Context を作成できる
+    with bl.Context(img) as ctx2:
+        ctx2.fill_all()
+
+
+def test_context_render_in_threads():
+    """スレッドごとに別の Image / Context で並列に描画"""
+    images = [bl.Image(320, 240) for _ in range(4)]
+
+    def render(img):
+        with bl.Context(img) as ctx:
+            ctx.set_fill_style_rgba(255, 0, 0)
+            for i in range(100):
+                ctx.fill_circle(i, i, 10)
+
+    threads = [threading.Thread(target=render, args=(img,)) for img in images]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for img in images:
+        assert img.asarray()[50, 50, 2] == 255
+
+
+def test_context_shared_between_threads():
+    """同じ Context を複数スレッドから呼び出してもロックで直列化される"""
+    img = bl.Image(320, 240)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(0, 255, 0)
+
+        def render():
+            for i in range(200):
+                ctx.fill_rect(i % 300, i % 200, 20, 20)
+
+        threads = [threading.Thread(target=render) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+
+def test_fill_rects():
+    """NumPy 配列で四角形を一括塗りつぶし"""
+    img = bl.Image(100, 100)
+    rects = np.array([[0, 0, 10, 10], [50, 50, 10, 10]], dtype=np.float64)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_rects(rects)
+    arr = img.asarray()
+    assert arr[5, 5, 2] == 255
+    assert arr[55, 55, 2] == 255
+    assert arr[30, 30, 3] == 0
+
+
+def test_fill_rects_with_colors():
+    """色配列を指定して四角形を一括塗りつぶし"""
+    img = bl.Image(100, 100)
+    rects = np.array([[0, 0, 10, 10], [50, 50, 10, 10]], dtype=np.float64)
+    colors = np.array([[255, 0, 0, 255], [0, 0, 255, 255]], dtype=np.uint8)
+    with bl.Context(img) as ctx:
+        ctx.fill_rects(rects, colors)
+    arr = img.asarray()
+    # BGRA
+    assert tuple(arr[5, 5]) == (0, 0, 255, 255)
+    assert tuple(arr[55, 55]) == (255, 0, 0, 255)
+
+
+def test_fill_circles_with_colors():
+    """色配列を指定して円を一括塗りつぶし"""
+    img = bl.Image(100, 100)
+    circles = np.array([[20, 20, 10], [70, 70, 10]], dtype=np.float64)
+    colors = np.array([[0, 255, 0, 255], [0, 255, 0, 255]], dtype=np.uint8)
+    with bl.Context(img) as ctx:
+        ctx.fill_circles(circles, colors)
+    arr = img.asarray()
+    assert arr[20, 20, 1] == 255
+    assert arr[70, 70, 1] == 255
+
+
+def test_stroke_rects_and_circles():
+    """四角形と円を一括ストローク"""
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_stroke_style_rgba(255, 255, 255)
+        ctx.set_stroke_width(2)
+        ctx.stroke_rects(np.array([[10, 10, 80, 80]], dtype=np.float64))
+        ctx.stroke_circles(np.array([[50, 50, 20]], dtype=np.float64))
+    assert img.asarray()[10, 50, 3] > 0
+
+
+def test_fill_rects_colors_size_mismatch():
+    """色配列の行数が異なる場合は ValueError"""
+    img = bl.Image(100, 100)
+    rects = np.zeros((2, 4), dtype=np.float64)
+    colors = np.zeros((3, 4), dtype=np.uint8)
+    with bl.Context(img) as ctx:
+        with pytest.raises(ValueError):
+            ctx.fill_rects(rects, colors)
+
+
+def test_context_reset_reuses_context():
+    """reset() で同じ Context を使い回して次のフレームを描画"""
+    img = bl.Image(100, 100)
+    ctx = bl.Context(img, thread_count=2)
+    for frame in range(3):
+        ctx.reset()
+        ctx.set_fill_style_rgba(frame * 100, 0, 0)
+        ctx.fill_all()
+    ctx.end()
+    assert img.asarray()[50, 50, 2] == 200
+
+
+def test_context_reset_restores_state():
+    """reset() は変換やスタイルを初期状態に戻す"""
+    img = bl.Image(100, 100)
+    ctx = bl.Context(img)
+    ctx.translate(1000, 1000)
+    ctx.save()
+    ctx.reset()
+    ctx.set_fill_style_rgba(0, 255, 0)
+    ctx.fill_rect(0, 0, 10, 10)
+    ctx.end()
+    assert img.asarray()[5, 5, 1] == 255
+
+
+def test_context_begin_retarget():
+    """begin() で別の Image に描画先を切り替える"""
+    img1 = bl.Image(50, 50)
+    img2 = bl.Image(50, 50)
+    ctx = bl.Context()
+    ctx.begin(img1)
+    ctx.set_fill_style_rgba(255, 0, 0)
+    ctx.fill_all()
+    ctx.begin(img2)
+    assert not img1.is_rendering
+    assert img2.is_rendering
+    ctx.set_fill_style_rgba(0, 0, 255)
+    ctx.fill_all()
+    ctx.end()
+    assert img1.asarray()[0, 0, 2] == 255
+    assert img2.asarray()[0, 0, 0] == 255
+
+
+def test_context_begin_same_image_increments_generation():
+    """同じ Image に begin() すると新しいフレームとして generation が増える"""
+    img = bl.Image(50, 50)
+    ctx = bl.Context(img)
+    generation = img.generation
+    ctx.begin(img)
+    assert img.generation == generation + 1
+    assert img.is_rendering
+    ctx.end()
+
+
+def test_context_end_releases_image():
+    """end() 後の Context は描画先の Image の参照を保持しない"""
+    img = bl.Image(50, 50)
+    refcount = sys.getrefcount(img)
+    ctx = bl.Context(img)
+    assert sys.getrefcount(img) == refcount + 1
+    ctx.end()
+    assert sys.getrefcount(img) == refcount
+
+    other = bl.Image(50, 50)
+    ctx.begin(other)
+    ctx.begin(img)
+    assert sys.getrefcount(img) == refcount + 1
+    ctx.end()
+    assert sys.getrefcount(img) == refcount
+
+
+def test_context_reset_without_image():
+    """Image に接続していない Context の reset() は RuntimeError"""
+    ctx = bl.Context()
+    with pytest.raises(RuntimeError):
+        ctx.reset()
+
+
+def test_context_flush():
+    """flush() で描画を完了させると end() 前でもピクセルを読める"""
+    img = bl.Image(40, 40)
+    ctx = bl.Context(img, thread_count=2)
+    ctx.set_comp_op(bl.CompOp.SRC_COPY)
+    ctx.set_fill_style_rgba(0, 255, 0)
+    ctx.fill_all()
+    ctx.flush(sync=False)
+    ctx.flush()
+    assert tuple(img.asarray()[20, 20]) == (0, 255, 0, 255)
+    ctx.end()
+
+
+def test_context_flush_future():
+    """flush_future() は描画完了後に結果が設定される Future を返す"""
+    img = bl.Image(64, 64)
+    ctx = bl.Context(img, thread_count=2)
+    ctx.set_fill_style_rgba(255, 0, 0)
+    ctx.fill_all()
+    future = ctx.flush_future()
+    assert future.result(timeout=10) is None
+    assert img.asarray()[0, 0, 2] == 255
+    # 続けて描画できる
+    ctx.set_fill_style_rgba(0, 0, 255)
+    ctx.fill_all()
+    ctx.flush_future().result(timeout=10)
+    assert img.asarray()[0, 0, 0] == 255
+    ctx.end()
+
+
+def test_context_flush_future_many():
+    """連続して呼び出した flush_future() の Future はすべて完了する"""
+    img = bl.Image(64, 64)
+    ctx = bl.Context(img, thread_count=2)
+    futures = []
+    for i in range(16):
+        ctx.set_fill_style_rgba(i * 16, 0, 0)
+        ctx.fill_rect(i * 4, 0, 4, 64)
+        futures.append(ctx.flush_future())
+    for future in futures:
+        assert future.result(timeout=10) is None
+    assert img.asarray()[0, 62, 2] == 240
+    ctx.end()
+
+
+def test_context_finish_async():
+    """finish_async() を await すると描画が完了している"""
+    img = bl.Image(64, 64)
+    ctx = bl.Context(img, thread_count=2)
+
+    async def render():
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.fill_all()
+        await ctx.finish_async()
+        return img.asarray()[10, 10, 0]
+
+    assert asyncio.run(render()) == 255
+    ctx.end()
+
+
+def test_context_flush_without_image():
+    """Image に接続していない Context の flush() / flush_future() は RuntimeError"""
+    ctx = bl.Context()
+    with pytest.raises(RuntimeError):
+        ctx.flush()
+    with pytest.raises(RuntimeError):
+        ctx.flush_future()
+
+
+def _solid_image(w: int, h: int, r: int, g: int, b: int) -> bl.Image:
+    img = bl.Image(w, h)
+    with bl.Context(img) as ctx:
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(r, g, b)
+        ctx.fill_all()
+    return img
+
+
+def test_blit_image():
+    """blit_image で Image を指定位置に描画する"""
+    src = _solid_image(10, 10, 255, 0, 0)
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.blit_image(src, 5, 5)
+        ctx.blit_image(src, 20, 20, src_rect=(0, 0, 4, 4))
+    arr = img.asarray()
+    assert tuple(arr[10, 10]) == (0, 0, 255, 255)
+    assert tuple(arr[16, 16]) == (0, 0, 0, 0)
+    assert tuple(arr[22, 22]) == (0, 0, 255, 255)
+    assert tuple(arr[25, 25]) == (0, 0, 0, 0)
+
+
+def test_blit_scaled_image():
+    """blit_scaled_image で拡大縮小して描画する"""
+    src = _solid_image(4, 4, 0, 255, 0)
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.blit_scaled_image(src, 0, 0, 20, 20)
+    arr = img.asarray()
+    assert tuple(arr[15, 15]) == (0, 255, 0, 255)
+    assert tuple(arr[30, 30]) == (0, 0, 0, 0)
+
+
+def test_blit_sprites():
+    """blit_sprites でアトラスのスプライトを一括描画する"""
+    atlas = bl.Image(20, 10)
+    with bl.Context(atlas) as ctx:
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_rect(0, 0, 10, 10)
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.fill_rect(10, 0, 10, 10)
+
+    src = np.array([[0, 0, 10, 10], [10, 0, 10, 10]], dtype=np.float64)
+    img = bl.Image(60, 60)
+    with bl.Context(img) as ctx:
+        ctx.blit_sprites(atlas, src, np.array([[0, 0], [20, 0]], dtype=np.float64))
+        ctx.blit_sprites(
+            atlas, src, np.array([[0, 30, 20, 20], [30, 30, 20, 20]], dtype=np.float64)
+        )
+    arr = img.asarray()
+    assert tuple(arr[5, 5]) == (0, 0, 255, 255)
+    assert tuple(arr[5, 25]) == (255, 0, 0, 255)
+    assert tuple(arr[45, 15]) == (0, 0, 255, 255)
+    assert tuple(arr[45, 45]) == (255, 0, 0, 255)
+
+
+def test_blit_sprites_shape_mismatch():
+    """blit_sprites の配列の形が正しくない場合は ValueError"""
+    atlas = bl.Image(10, 10)
+    img = bl.Image(10, 10)
+    src = np.zeros((2, 4))
+    with bl.Context(img) as ctx:
+        with pytest.raises(ValueError):
+            ctx.blit_sprites(atlas, src, np.zeros((3, 2)))
+        with pytest.raises(ValueError):
+            ctx.blit_sprites(atlas, src, np.zeros((2, 3)))
+
+
+def _composite(op: bl.CompOp, r: int, g: int, b: int) -> tuple:
+    img = _solid_image(10, 10, 100, 150, 200)
+    with bl.Context(img) as ctx:
+        ctx.set_comp_op(op)
+        ctx.set_fill_style_rgba(r, g, b)
+        ctx.fill_all()
+    return tuple(int(v) for v in img.asarray()[5, 5])
+
+
+def test_comp_op_all_values():
+    """全ての CompOp を Context に設定して描画できる"""
+    assert len(bl.CompOp) == 29
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        for op in bl.CompOp:
+            ctx.set_comp_op(op)
+            ctx.fill_rect(0, 0, 10, 10)
+
+
+def test_comp_op_porter_duff():
+    """Porter-Duff 系の CompOp"""
+    # BGRA 順
+    assert _composite(bl.CompOp.CLEAR, 255, 0, 0) == (0, 0, 0, 0)
+    assert _composite(bl.CompOp.DST_COPY, 255, 0, 0) == (200, 150, 100, 255)
+    assert _composite(bl.CompOp.DST_OVER, 255, 0, 0) == (200, 150, 100, 255)
+    assert _composite(bl.CompOp.SRC_IN, 255, 0, 0) == (0, 0, 255, 255)
+
+
+def test_comp_op_blend():
+    """加算・乗算系の CompOp"""
+    assert _composite(bl.CompOp.PLUS, 100, 100, 100) == (255, 250, 200, 255)
+    assert _composite(bl.CompOp.MULTIPLY, 255, 255, 255) == (200, 150, 100, 255)
+    assert _composite(bl.CompOp.MULTIPLY, 0, 0, 0) == (0, 0, 0, 255)
+    assert _composite(bl.CompOp.DIFFERENCE, 100, 150, 200) == (0, 0, 0, 255)
+    assert _composite(bl.CompOp.DARKEN, 50, 250, 250) == (200, 150, 50, 255)
+    assert _composite(bl.CompOp.LIGHTEN, 50, 250, 250) == (250, 250, 100, 255)
+
+
+def test_clip_to_rect():
+    """clip_to_rect の外側には描画しない"""
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.save()
+        ctx.clip_to_rect(0, 0, 20, 20)
+        ctx.fill_all()
+        ctx.restore_clipping()
+        ctx.set_fill_style_rgba(0, 255, 0)
+        ctx.fill_rect(20, 20, 20, 20)
+        ctx.restore()
+    arr = img.asarray()
+    assert tuple(arr[10, 10]) == (0, 0, 255, 255)
+    assert tuple(arr[10, 30]) == (0, 0, 0, 0)
+    assert tuple(arr[30, 30]) == (0, 255, 0, 255)
+
+
+def test_clear_rect():
+    """clear_rect / clear_all は透明にする"""
+    img = _solid_image(40, 40, 255, 0, 0)
+    with bl.Context(img) as ctx:
+        ctx.clear_rect(0, 0, 10, 10)
+    arr = img.asarray()
+    assert tuple(arr[5, 5]) == (0, 0, 0, 0)
+    assert tuple(arr[20, 20]) == (0, 0, 255, 255)
+    with bl.Context(img) as ctx:
+        ctx.clear_all()
+    assert not img.asarray().any()
+
+
+def test_global_alpha():
+    """set_global_alpha / set_fill_alpha は描画のアルファに掛かる"""
+    img = bl.Image(20, 20)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.set_global_alpha(0.5)
+        ctx.fill_rect(0, 0, 10, 20)
+        ctx.set_global_alpha(1.0)
+        ctx.set_fill_alpha(0.25)
+        ctx.fill_rect(10, 0, 10, 20)
+    arr = img.asarray().astype(int)
+    assert abs(arr[10, 5, 3] - 128) <= 1
+    assert abs(arr[10, 15, 3] - 64) <= 1
+
+
+def test_alpha_out_of_range():
+    """範囲外のアルファは ValueError"""
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        with pytest.raises(ValueError):
+            ctx.set_global_alpha(1.5)
+        with pytest.raises(ValueError):
+            ctx.set_stroke_alpha(-0.1)
+        with pytest.raises(ValueError):
+            ctx.begin_layer(alpha=2.0)
+
+
+def test_fill_rule():
+    """EVEN_ODD では同じ向きの内側の矩形が塗られない"""
+    path = bl.Path()
+    for x0, x1 in ((0, 40), (10, 30)):
+        path.move_to(x0, x0)
+        path.line_to(x1, x0)
+        path.line_to(x1, x1)
+        path.line_to(x0, x1)
+        path.close()
+
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_path(path)
+    assert img.asarray()[20, 20, 3] == 255
+
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.set_fill_rule(bl.FillRule.EVEN_ODD)
+        ctx.fill_path(path)
+    arr = img.asarray()
+    assert arr[20, 20, 3] == 0
+    assert arr[5, 5, 3] == 255
+
+
+def test_layer_group_alpha():
+    """レイヤーは重なった図形をまとめて合成するため、重なり部分も同じ濃さになる"""
+    img = bl.Image(40, 20)
+    with bl.Context(img) as ctx:
+        ctx.begin_layer(alpha=0.5)
+        assert ctx.layer_depth == 1
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_rect(0, 0, 30, 20)
+        ctx.fill_rect(10, 0, 30, 20)
+        ctx.end_layer()
+        assert ctx.layer_depth == 0
+    arr = img.asarray().astype(int)
+    assert abs(arr[10, 5, 3] - 128) <= 1
+    assert abs(arr[10, 20, 3] - 128) <= 1
+
+
+def test_layer_inherits_transform():
+    """レイヤーは座標変換を引き継ぎ、合成時は等倍で描画する"""
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.translate(20, 20)
+        ctx.begin_layer(comp_op=bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(0, 255, 0)
+        ctx.fill_rect(0, 0, 10, 10)
+        ctx.end_layer()
+    arr = img.asarray()
+    assert tuple(arr[25, 25]) == (0, 255, 0, 255)
+    assert tuple(arr[5, 5]) == (0, 0, 0, 0)
+
+
+@pytest.mark.parametrize("thread_count", [0, 2])
+def test_layer_reuse(thread_count):
+    """使い回したレイヤーは前のレイヤーの内容や描画状態を引き継がない"""
+    img = bl.Image(40, 40)
+    ctx = bl.Context(img, thread_count=thread_count)
+    for _ in range(3):
+        ctx.reset()
+        ctx.begin_layer()
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.translate(20, 0)
+        ctx.fill_rect(0, 0, 10, 10)
+        ctx.end_layer()
+        ctx.begin_layer()
+        ctx.fill_rect(0, 20, 10, 10)
+        ctx.end_layer()
+        ctx.flush()
+        arr = img.asarray()
+        assert tuple(arr[5, 25]) == (0, 0, 255, 255)
+        assert tuple(arr[25, 5]) == (0, 0, 0, 255)
+        assert tuple(arr[5, 5]) == (0, 0, 0, 0)
+    ctx.end()
+
+
+def test_layer_errors():
+    """begin_layer していない end_layer は RuntimeError、reset は未合成のレイヤーを破棄する"""
+    img = bl.Image(20, 20)
+    ctx = bl.Context(img)
+    with pytest.raises(RuntimeError):
+        ctx.end_layer()
+    ctx.begin_layer()
+    ctx.begin_layer()
+    assert ctx.layer_depth == 2
+    ctx.set_fill_style_rgba(255, 0, 0)
+    ctx.fill_all()
+    ctx.reset()
+    assert ctx.layer_depth == 0
+    ctx.end()
+    assert not img.asarray().any()
+    with pytest.raises(RuntimeError):
+        bl.Context().begin_layer()
+
+
+def test_quality_hints():
+    """描画品質の設定と取得"""
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        assert ctx.rendering_quality == bl.RenderingQuality.ANTIALIAS
+        ctx.set_gradient_quality(bl.GradientQuality.DITHER)
+        assert ctx.gradient_quality == bl.GradientQuality.DITHER
+        ctx.set_pattern_quality(bl.PatternQuality.NEAREST)
+        assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+        ctx.set_flatten_tolerance(0.75)
+        assert ctx.flatten_tolerance == pytest.approx(0.75)
+        with pytest.raises(ValueError):
+            ctx.set_flatten_tolerance(0.0)
+
+
+def test_render_profile():
+    """set_profile の設定は reset() 後も残り、個別の設定は reset() で戻る"""
+    img = bl.Image(10, 10)
+    ctx = bl.Context(img)
+    assert ctx.profile == bl.RenderProfile.DEFAULT
+    default_tolerance = ctx.flatten_tolerance
+    default_pattern = ctx.pattern_quality
+
+    ctx.set_profile(bl.RenderProfile.PREVIEW)
+    assert ctx.profile == bl.RenderProfile.PREVIEW
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+    assert ctx.gradient_quality == bl.GradientQuality.NEAREST
+    assert ctx.flatten_tolerance > default_tolerance
+
+    ctx.set_pattern_quality(bl.PatternQuality.BILINEAR)
+    ctx.reset()
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+
+    ctx.set_profile(bl.RenderProfile.QUALITY)
+    ctx.reset()
+    assert ctx.gradient_quality == bl.GradientQuality.DITHER
+    assert ctx.pattern_quality == bl.PatternQuality.BILINEAR
+
+    ctx.set_profile(bl.RenderProfile.DEFAULT)
+    assert ctx.pattern_quality == default_pattern
+    assert ctx.flatten_tolerance == pytest.approx(default_tolerance)
+    ctx.end()
+
+
+def test_render_profile_before_begin():
+    """Image に接続する前に設定したプロファイルは begin() で適用される"""
+    ctx = bl.Context()
+    ctx.set_profile(bl.RenderProfile.PREVIEW)
+    img = bl.Image(10, 10)
+    ctx.begin(img)
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+    ctx.end()
+
+
+def test_render_profile_in_layer():
+    """レイヤーの描画中に設定したプロファイルは end_layer() 後の Context にも適用される"""
+    img = bl.Image(10, 10)
+    ctx = bl.Context(img)
+    ctx.begin_layer()
+    ctx.begin_layer()
+    ctx.set_profile(bl.RenderProfile.PREVIEW)
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+    ctx.end_layer()
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+    ctx.end_layer()
+    assert ctx.pattern_quality == bl.PatternQuality.NEAREST
+    assert ctx.gradient_quality == bl.GradientQuality.NEAREST
+    ctx.end()
+
+
+def _stroke_row(setup) -> np.ndarray:
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_stroke_style_rgba(255, 255, 255)
+        ctx.set_stroke_width(10)
+        setup(ctx)
+        path = bl.Path()
+        path.move_to(0, 50)
+        path.line_to(100, 50)
+        ctx.stroke_path(path)
+    return img.asarray()[50, :, 3]
+
+
+def test_stroke_dash_array():
+    """NumPy 配列で設定した破線の隙間は塗られない"""
+    row = _stroke_row(lambda ctx: ctx.set_stroke_dash_array(np.array([20.0, 10.0])))
+    # 線: 0-20, 30-50, 60-80, 90-100
+    assert row[10] == 255
+    assert row[25] == 0
+    assert row[40] == 255
+    assert row[55] == 0
+
+    row = _stroke_row(lambda ctx: ctx.set_stroke_dash_array([]))
+    assert row[25] == 255
+
+
+def test_stroke_dash_offset():
+    """set_stroke_dash_offset はパターンを保ったまま開始位置をずらす"""
+
+    def setup(ctx: bl.Context) -> None:
+        ctx.set_stroke_dash_array([20, 10])
+        ctx.set_stroke_dash_offset(10)
+
+    row = _stroke_row(setup)
+    # 線: 0-10, 20-40, 50-70, 80-100
+    assert row[5] == 255
+    assert row[15] == 0
+    assert row[30] == 255
+    assert row[45] == 0
+
+
+def test_stroke_dash_shapes():
+    """破線は stroke_rect / stroke_rects にも適用される"""
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_stroke_style_rgba(255, 255, 255)
+        ctx.set_stroke_width(4)
+        ctx.set_stroke_dash_array([10, 10])
+        ctx.stroke_rect(10, 10, 80, 30)
+        ctx.stroke_rects(np.array([[10, 60, 80, 30]], dtype=np.float64))
+    arr = img.asarray()
+    # 上辺: 10-20 が線、20-30 が隙間
+    assert arr[10, 15, 3] == 255
+    assert arr[10, 25, 3] == 0
+    assert arr[60, 15, 3] == 255
+    assert arr[60, 25, 3] == 0
+
+
+def test_set_stroke_options():
+    """set_stroke_options でまとめて設定し、stroke_options で取得できる"""
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        options = bl.StrokeOptions(
+            width=3, join=bl.StrokeJoin.ROUND, dash_array=np.array([4.0, 2.0]), dash_offset=1
+        )
+        options.set_caps(bl.StrokeCap.SQUARE)
+        ctx.set_stroke_options(options)
+        current = ctx.stroke_options
+        assert current.width == 3
+        assert current.join == bl.StrokeJoin.ROUND
+        assert current.start_cap == bl.StrokeCap.SQUARE
+        assert current.end_cap == bl.StrokeCap.SQUARE
+        assert current.dash_array == [4, 2]
+        assert current.dash_offset == 1
+
+        ctx.save()
+        ctx.set_stroke_dash_array([])
+        ctx.set_stroke_dash_offset(5)
+        assert ctx.stroke_options.dash_array == []
+        ctx.restore()
+        assert ctx.stroke_options.dash_array == [4, 2]
+        assert ctx.stroke_options.dash_offset == 1
+
+        with pytest.raises(ValueError):
+            ctx.set_stroke_dash_array(np.array([1.0, -1.0]))
+        with pytest.raises(ValueError):
+            ctx.set_stroke_dash_array([0, 0])
+
+
+def test_transform_matrix():
+    """2x3 の行列で座標変換を設定 / 適用 / 取得できる"""
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        np.testing.assert_allclose(ctx.user_transform, [[1, 0, 0], [0, 1, 0]])
+        ctx.translate(5, 0)
+        ctx.apply_transform(np.array([[2.0, 0.0, 0.0], [0.0, 2.0, 3.0]]))
+        # translate の後に適用した行列は translate より先に座標へ掛かる
+        np.testing.assert_allclose(ctx.user_transform, [[2, 0, 5], [0, 2, 3]])
+
+        ctx.set_transform(np.array([[1.0, 0.0, 20.0], [0.0, 1.0, 20.0]]))
+        np.testing.assert_allclose(ctx.user_transform, [[1, 0, 20], [0, 1, 20]])
+        ctx.scale(2, 2)
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_rect(0, 0, 5, 5)
+
+        ctx.reset_transform()
+        np.testing.assert_allclose(ctx.user_transform, [[1, 0, 0], [0, 1, 0]])
+        with pytest.raises(TypeError):
+            ctx.set_transform(np.zeros((3, 3)))
+    arr = img.asarray()
+    assert tuple(arr[25, 25]) == (0, 0, 255, 255)
+    assert tuple(arr[31, 31]) == (0, 0, 0, 0)
+    assert tuple(arr[15, 15]) == (0, 0, 0, 0)
+
+
+def test_fill_path_instances():
+    """同じパスを変換ごとに描画し、描画後は元の座標変換に戻る"""
+    square = bl.Path()
+    square.move_to(0, 0)
+    square.line_to(4, 0)
+    square.line_to(4, 4)
+    square.line_to(0, 4)
+    square.close()
+
+    transforms = np.array(
+        [
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]],
+            [[1.0, 0.0, 10.0], [0.0, 1.0, 0.0]],
+            [[2.0, 0.0, 0.0], [0.0, 2.0, 10.0]],
+        ]
+    )
+    colors = np.array([[255, 0, 0, 255], [0, 255, 0, 255], [0, 0, 255, 255]], dtype=np.uint8)
+
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.translate(20, 20)
+        ctx.fill_path_instances(square, transforms, colors)
+        np.testing.assert_allclose(ctx.user_transform, [[1, 0, 20], [0, 1, 20]])
+        with pytest.raises(ValueError):
+            ctx.fill_path_instances(square, transforms, colors[:2])
+    arr = img.asarray()
+    assert tuple(arr[22, 22]) == (0, 0, 255, 255)
+    assert tuple(arr[22, 32]) == (0, 255, 0, 255)
+    assert tuple(arr[36, 26]) == (255, 0, 0, 255)
+    assert tuple(arr[5, 5]) == (0, 0, 0, 0)
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+import blend2d as bl
+
+
+def test_dirty_region_mark():
+    """記録した矩形は画素単位に広げて画像の範囲に切り詰める"""
+    dirty = bl.DirtyRegion(100, 50)
+    assert len(dirty) == 0
+    assert dirty.bounds is None
+    dirty.mark(10.5, 20.2, 5, 5)
+    dirty.mark(90, 40, 30, 30)
+    dirty.mark(-10, -10, 5, 5)
+    dirty.mark(0, 0, 0, 10)
+    rects = dirty.rects()
+    assert rects.dtype == np.int32
+    assert rects.tolist() == [[10, 20, 6, 6], [90, 40, 10, 10]]
+    assert dirty.bounds == (10, 20, 90, 30)
+    assert dirty.area == 36 + 100
+
+
+def test_dirty_region_merge_overlapping():
+    """重なる矩形は統合する"""
+    dirty = bl.DirtyRegion(100, 100)
+    dirty.mark(0, 0, 10, 10)
+    dirty.mark(20, 0, 10, 10)
+    dirty.mark(5, 5, 20, 2)
+    assert dirty.rects().tolist() == [[0, 0, 30, 10]]
+
+
+def test_dirty_region_max_rects():
+    """矩形数が max_rects を超えた場合は増分面積が最小の矩形と統合する"""
+    dirty = bl.DirtyRegion(100, 100, max_rects=2)
+    dirty.mark(0, 0, 10, 10)
+    dirty.mark(80, 80, 10, 10)
+    dirty.mark(12, 0, 10, 10)
+    assert len(dirty) == 2
+    assert sorted(dirty.rects().tolist()) == [[0, 0, 22, 10], [80, 80, 10, 10]]
+
+
+def test_dirty_region_mark_rects_and_take():
+    """mark_rects で一括記録し、take で取得して空にする"""
+    dirty = bl.DirtyRegion(100, 100)
+    dirty.mark_rects(np.array([[0, 0, 10, 10], [50, 50, 10, 10]], dtype=np.float64))
+    assert dirty.take().shape == (2, 4)
+    assert len(dirty) == 0
+    assert dirty.take().shape == (0, 4)
+    dirty.mark_all()
+    assert dirty.rects().tolist() == [[0, 0, 100, 100]]
+    dirty.clear()
+    assert dirty.area == 0
+
+
+def test_dirty_region_invalid():
+    """不正なサイズや max_rects、NaN / 無限大の矩形は ValueError"""
+    with pytest.raises(ValueError):
+        bl.DirtyRegion(0, 10)
+    with pytest.raises(ValueError):
+        bl.DirtyRegion(10, 10, max_rects=0)
+    dirty = bl.DirtyRegion(10, 10)
+    with pytest.raises(ValueError):
+        dirty.mark(float("nan"), 0, 5, 5)
+    with pytest.raises(ValueError):
+        dirty.mark(0, float("-inf"), 5, 5)
+    with pytest.raises(ValueError):
+        dirty.mark_rects(np.array([[0, 0, 5, 5], [0, 0, np.nan, 5]]))
+
+
+def test_replay_dirty_region():
+    """dirty を指定した replay は記録した矩形だけを描画する"""
+    dl = bl.DisplayList()
+    dl.set_comp_op(bl.CompOp.SRC_COPY)
+    dl.set_fill_style_rgba(255, 0, 0)
+    dl.fill_all()
+
+    img = bl.Image(40, 40)
+    dirty = bl.DirtyRegion(40, 40)
+    dirty.mark(0, 0, 10, 10)
+    dirty.mark(30, 30, 10, 10)
+    with bl.Context(img) as ctx:
+        ctx.replay(dl, dirty)
+        # 再生後もクリップは残らない
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.fill_rect(20, 0, 5, 5)
+    arr = img.asarray()
+    assert tuple(arr[5, 5]) == (0, 0, 255, 255)
+    assert tuple(arr[35, 35]) == (0, 0, 255, 255)
+    assert tuple(arr[20, 20]) == (0, 0, 0, 0)
+    assert tuple(arr[2, 22]) == (255, 0, 0, 255)
+
+
+def test_replay_dirty_region_keeps_clip():
+    """DisplayList 内の clip_to_rect / restore_clipping でも矩形のクリップは外れない"""
+    dl = bl.DisplayList()
+    dl.set_comp_op(bl.CompOp.SRC_COPY)
+    dl.clip_to_rect(0, 0, 20, 20)
+    dl.set_fill_style_rgba(0, 255, 0)
+    dl.fill_all()
+    dl.restore_clipping()
+    dl.set_fill_style_rgba(255, 0, 0)
+    dl.fill_all()
+
+    img = bl.Image(40, 40)
+    dirty = bl.DirtyRegion(40, 40)
+    dirty.mark(30, 30, 10, 10)
+    with bl.Context(img) as ctx:
+        ctx.replay(dl, dirty)
+    arr = img.asarray()
+    assert tuple(arr[35, 35]) == (0, 0, 255, 255)
+    assert tuple(arr[5, 5]) == (0, 0, 0, 0)
+    assert tuple(arr[25, 5]) == (0, 0, 0, 0)
+
+
+def test_replay_empty_dirty_region():
+    """空の DirtyRegion を指定した replay は何も描画しない"""
+    dl = bl.DisplayList()
+    dl.set_fill_style_rgba(255, 0, 0)
+    dl.fill_all()
+
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        ctx.replay(dl, bl.DirtyRegion(10, 10))
+    assert tuple(img.asarray()[5, 5]) == (0, 0, 0, 0)
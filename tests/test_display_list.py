@@ -0,0 +1,257 @@
+import threading
+
+import numpy as np
+import pytest
+
+import blend2d as bl
+
+
+def _overlay() -> tuple[bl.DisplayList, int, int]:
+    dl = bl.DisplayList()
+    dl.set_comp_op(bl.CompOp.SRC_COPY)
+    dl.set_fill_style_rgba(0, 0, 0)
+    dl.fill_all()
+    color = dl.set_fill_style_rgba(255, 0, 0)
+    offset = dl.translate(0, 0)
+    dl.fill_rect(0, 0, 10, 10)
+    return dl, color, offset
+
+
+def test_display_list_record():
+    """記録した命令のインデックスと数値引数を取得できる"""
+    dl, color, offset = _overlay()
+    assert len(dl) == 6
+    assert dl.size == 6
+    assert color == 3
+    assert offset == 4
+    assert dl.params(color) == [255, 0, 0, 255]
+    assert dl.params(offset) == [0, 0]
+    assert dl.params(2) == []
+
+
+def test_display_list_replay_matches_direct_drawing():
+    """replay の結果は Context を直接呼び出した結果と一致する"""
+    path = bl.Path()
+    path.move_to(5, 5)
+    path.line_to(40, 10)
+    path.line_to(20, 40)
+    path.close()
+
+    direct = bl.Image(50, 50)
+    with bl.Context(direct) as ctx:
+        ctx.set_fill_style_rgba(10, 20, 30)
+        ctx.fill_all()
+        ctx.set_fill_style_rgba(0, 255, 0, 128)
+        ctx.fill_path(path)
+        ctx.set_stroke_style_rgba(0, 0, 255)
+        ctx.set_stroke_width(3)
+        ctx.stroke_circle(25, 25, 15)
+
+    dl = bl.DisplayList()
+    dl.set_fill_style_rgba(10, 20, 30)
+    dl.fill_all()
+    dl.set_fill_style_rgba(0, 255, 0, 128)
+    dl.fill_path(path)
+    dl.set_stroke_style_rgba(0, 0, 255)
+    dl.set_stroke_width(3)
+    dl.stroke_circle(25, 25, 15)
+
+    replayed = bl.Image(50, 50)
+    with bl.Context(replayed) as ctx:
+        ctx.replay(dl)
+
+    np.testing.assert_array_equal(direct.asarray(), replayed.asarray())
+
+
+def test_display_list_patch():
+    """patch で色と位置を書き換えて再生できる"""
+    dl, color, offset = _overlay()
+    img = bl.Image(40, 40)
+    ctx = bl.Context(img)
+
+    ctx.replay(dl)
+    ctx.flush()
+    arr = img.asarray()
+    assert tuple(arr[5, 5]) == (0, 0, 255, 255)
+    assert tuple(arr[25, 25]) == (0, 0, 0, 255)
+
+    dl.patch(color, [0, 255, 0, 255])
+    dl.patch(offset, (20, 20))
+    ctx.replay(dl)
+    ctx.flush()
+    assert tuple(arr[5, 5]) == (0, 0, 0, 255)
+    assert tuple(arr[25, 25]) == (0, 255, 0, 255)
+    ctx.end()
+
+
+def test_display_list_replay_does_not_leak_state():
+    """replay 中の状態変更は呼び出し側に残らない"""
+    dl = bl.DisplayList()
+    dl.translate(100, 100)
+    dl.set_fill_style_rgba(255, 0, 0)
+
+    img = bl.Image(20, 20)
+    with bl.Context(img) as ctx:
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.replay(dl)
+        ctx.fill_rect(0, 0, 10, 10)
+    assert tuple(img.asarray()[5, 5]) == (255, 0, 0, 255)
+
+
+def test_display_list_patch_errors():
+    """不正なインデックスや引数の数は例外"""
+    dl, color, _ = _overlay()
+    with pytest.raises(IndexError):
+        dl.patch(100, [0])
+    with pytest.raises(IndexError):
+        dl.params(100)
+    with pytest.raises(ValueError):
+        dl.patch(color, [0, 0, 0])
+
+
+@pytest.mark.parametrize("value", [300, -1, 1.5, float("nan")])
+def test_display_list_patch_out_of_range(value):
+    """色や列挙型、アルファの範囲外の値は ValueError になり、元の値は変わらない"""
+    dl = bl.DisplayList()
+    color = dl.set_fill_style_rgba(255, 0, 0)
+    comp_op = dl.set_comp_op(bl.CompOp.SRC_COPY)
+    join = dl.set_stroke_join(bl.StrokeJoin.ROUND)
+    caps = dl.set_stroke_caps(bl.StrokeCap.ROUND)
+    fill_rule = dl.set_fill_rule(bl.FillRule.EVEN_ODD)
+    alpha = dl.set_global_alpha(0.5)
+    options = dl.set_stroke_options(bl.StrokeOptions(width=2, dash_array=[4, 2]))
+
+    with pytest.raises(ValueError):
+        dl.patch(color, [value, 0, 0, 255])
+    with pytest.raises(ValueError):
+        dl.patch(comp_op, [value])
+    with pytest.raises(ValueError):
+        dl.patch(join, [value])
+    with pytest.raises(ValueError):
+        dl.patch(caps, [value])
+    with pytest.raises(ValueError):
+        dl.patch(fill_rule, [value])
+    with pytest.raises(ValueError):
+        dl.patch(alpha, [value * 2])
+    params = dl.params(options)
+    for i in (2, 3, 4):
+        with pytest.raises(ValueError):
+            dl.patch(options, params[:i] + [value] + params[i + 1 :])
+    with pytest.raises(ValueError):
+        dl.patch(options, params[:6] + [-1, 2])
+    for i in (1, 5):
+        for bad in (float("nan"), float("inf")):
+            with pytest.raises(ValueError):
+                dl.patch(options, params[:i] + [bad] + params[i + 1 :])
+    assert dl.params(color) == [255, 0, 0, 255]
+    assert dl.params(options) == params
+
+    dl.patch(color, [0, 255, 0, 128])
+    dl.patch(comp_op, [int(bl.CompOp.SRC_OVER)])
+
+
+def test_display_list_rgba_out_of_range():
+    """記録時も 255 を超える色は ValueError"""
+    with pytest.raises(ValueError):
+        bl.DisplayList().set_fill_style_rgba(300, 0, 0)
+    with pytest.raises(ValueError):
+        bl.DisplayList().set_stroke_style_rgba(0, 0, 0, 256)
+
+
+def test_display_list_non_finite_stroke_params():
+    """miter_limit と dash_offset は記録時も patch でも有限の値だけを受け付ける"""
+    dl = bl.DisplayList()
+    with pytest.raises(ValueError):
+        dl.set_stroke_miter_limit(float("nan"))
+    with pytest.raises(ValueError):
+        dl.set_stroke_dash_offset(float("inf"))
+    miter_limit = dl.set_stroke_miter_limit(10)
+    dash_offset = dl.set_stroke_dash_offset(2)
+    with pytest.raises(ValueError):
+        dl.patch(miter_limit, [float("nan")])
+    with pytest.raises(ValueError):
+        dl.patch(dash_offset, [float("-inf")])
+    assert dl.params(miter_limit) == [10]
+    assert dl.params(dash_offset) == [2]
+
+
+def test_display_list_clear():
+    """clear で記録した命令を破棄する"""
+    dl, _, _ = _overlay()
+    dl.clear()
+    assert len(dl) == 0
+    img = bl.Image(10, 10)
+    with bl.Context(img) as ctx:
+        ctx.replay(dl)
+    assert img.asarray().sum() == 0
+
+
+def test_display_list_stroke_dash():
+    """set_stroke_options の破線と set_stroke_dash_offset を記録して再生できる"""
+    dl = bl.DisplayList()
+    dl.set_stroke_style_rgba(255, 255, 255)
+    dl.set_stroke_options(bl.StrokeOptions(width=10, dash_array=[20, 10]))
+    offset = dl.set_stroke_dash_offset(0)
+    path = bl.Path()
+    path.move_to(0, 50)
+    path.line_to(100, 50)
+    dl.stroke_path(path)
+    assert dl.params(offset) == [0]
+
+    img = bl.Image(100, 100)
+    ctx = bl.Context(img)
+    ctx.replay(dl)
+    ctx.flush()
+    row = img.asarray()[50, :, 3]
+    assert row[10] == 255
+    assert row[25] == 0
+
+    dl.patch(offset, [10])
+    ctx.clear_all()
+    ctx.replay(dl)
+    ctx.flush()
+    assert row[5] == 255
+    assert row[15] == 0
+    ctx.end()
+
+
+def test_display_list_apply_transform():
+    """apply_transform の行列を記録し、patch で書き換えて再生できる"""
+    dl = bl.DisplayList()
+    dl.set_fill_style_rgba(255, 0, 0)
+    m = dl.apply_transform(np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]))
+    dl.scale(2, 2)
+    dl.fill_rect(0, 0, 5, 5)
+    assert dl.params(m) == [1, 0, 0, 0, 1, 0]
+
+    dl.patch(m, [1, 0, 20, 0, 1, 20])
+    img = bl.Image(40, 40)
+    with bl.Context(img) as ctx:
+        ctx.replay(dl)
+    arr = img.asarray()
+    assert tuple(arr[25, 25]) == (0, 0, 255, 255)
+    assert tuple(arr[5, 5]) == (0, 0, 0, 0)
+
+
+def test_display_list_record_while_replaying():
+    """別スレッドで記録や patch をしながら replay しても記録は失われない"""
+    dl = bl.DisplayList()
+    color = dl.set_fill_style_rgba(255, 0, 0)
+    dl.fill_rect(0, 0, 10, 10)
+
+    def record():
+        for i in range(500):
+            dl.fill_rect(i % 20, 0, 1, 1)
+            dl.patch(color, [255, i % 256, 0, 255])
+
+    threads = [threading.Thread(target=record) for _ in range(2)]
+    for t in threads:
+        t.start()
+    img = bl.Image(20, 20)
+    with bl.Context(img) as ctx:
+        for _ in range(100):
+            ctx.replay(dl)
+    for t in threads:
+        t.join()
+    assert len(dl) == 2 + 2 * 500
@@ -0,0 +1,326 @@
+import gc
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import blend2d as bl
+
+# テストに使うフォント (見つからない環境ではスキップする)
+FONT_CANDIDATES = [
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+
+@pytest.fixture(scope="module")
+def font_path() -> str:
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    pytest.skip("no font available")
+
+
+@pytest.fixture(scope="module")
+def face(font_path) -> bl.FontFace:
+    face = bl.FontFace()
+    face.create_from_file(font_path)
+    return face
+
+
+def _render(draw) -> np.ndarray:
+    img = bl.Image(200, 60)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        draw(ctx)
+    return img.asarray().copy()
+
+
+def test_glyph_run(face):
+    """GlyphRun は整形済みのグリフ列とテキスト幅を持つ"""
+    font = bl.Font(face, 24.0)
+    run = font.shape("Hello")
+    assert isinstance(run, bl.GlyphRun)
+    assert run.text == "Hello"
+    assert run.size == 5
+    assert len(run) == 5
+    assert run.advance > 0
+    assert bl.GlyphRun(font, "Hello").advance == run.advance
+
+
+def test_fill_glyph_run_matches_fill_utf8_text(face):
+    """fill_glyph_run の描画結果は fill_utf8_text と一致する"""
+    font = bl.Font(face, 24.0)
+    run = font.shape("Hello, World")
+    expected = _render(lambda ctx: ctx.fill_utf8_text(10, 40, font, "Hello, World"))
+    actual = _render(lambda ctx: ctx.fill_glyph_run(10, 40, run))
+    assert expected.any()
+    np.testing.assert_array_equal(expected, actual)
+
+
+def test_text_cache_lru(face):
+    """fill_utf8_text は整形結果を LRU キャッシュに保持する"""
+    font = bl.Font(face, 16.0)
+    assert font.text_cache_capacity == 128
+    font.text_cache_capacity = 2
+    img = bl.Image(100, 30)
+    with bl.Context(img) as ctx:
+        ctx.fill_utf8_text(0, 20, font, "a")
+        ctx.fill_utf8_text(0, 20, font, "b")
+        ctx.fill_utf8_text(0, 20, font, "a")
+        assert font.text_cache_size == 2
+        ctx.fill_utf8_text(0, 20, font, "c")
+    assert font.text_cache_size == 2
+
+    font.text_cache_capacity = 1
+    assert font.text_cache_size == 1
+    font.clear_text_cache()
+    assert font.text_cache_size == 0
+
+    font.text_cache_capacity = 0
+    font.shape("d")
+    assert font.text_cache_size == 0
+
+
+def test_display_list_text(face):
+    """DisplayList に記録したテキストは整形済みのグリフ列として再生する"""
+    font = bl.Font(face, 24.0)
+    run = font.shape("Replay")
+    dl = bl.DisplayList()
+    dl.set_fill_style_rgba(255, 255, 255)
+    dl.fill_utf8_text(10, 40, font, "Replay")
+    dl.fill_glyph_run(100, 40, run)
+    expected = _render(
+        lambda ctx: (ctx.fill_utf8_text(10, 40, font, "Replay"), ctx.fill_glyph_run(100, 40, run))
+    )
+    actual = _render(lambda ctx: ctx.replay(dl))
+    np.testing.assert_array_equal(expected, actual)
+
+
+def test_font_metrics(face):
+    """Font.metrics でフォントの縦方向の寸法を取得できる"""
+    font = bl.Font(face, 32.0)
+    metrics = font.metrics
+    assert isinstance(metrics, bl.FontMetrics)
+    assert metrics.size == 32.0
+    assert metrics.ascent > 0
+    assert metrics.descent > 0
+    assert metrics.line_gap >= 0
+    assert metrics.line_height == pytest.approx(
+        metrics.ascent + metrics.descent + metrics.line_gap
+    )
+
+
+def test_measure(face):
+    """measure は [advance, x0, y0, x1, y1] を返す"""
+    font = bl.Font(face, 24.0)
+    m = font.measure("Hello")
+    assert m.shape == (5,)
+    assert m.dtype == np.float64
+    assert m[0] == pytest.approx(font.shape("Hello").advance)
+    assert m[3] > m[1]
+    assert m[4] > m[2]
+    assert font.measure("Hello Hello")[0] > m[0]
+
+
+def test_measure_many(face):
+    """measure_many は measure と同じ結果を (N, 5) でまとめて返す"""
+    font = bl.Font(face, 24.0)
+    texts = ["a", "Hello", "", "Hello, World"]
+    result = font.measure_many(texts)
+    assert result.shape == (4, 5)
+    for i, text in enumerate(texts):
+        np.testing.assert_allclose(result[i], font.measure(text))
+    assert font.measure_many([]).shape == (0, 5)
+
+
+def test_wrap_text(face):
+    """wrap_text は空白で折り返し、各行が幅に収まる"""
+    font = bl.Font(face, 20.0)
+    text = "the quick brown fox jumps over the lazy dog"
+    width = font.measure("the quick brown")[0] + 1
+    lines = font.wrap_text(text, width)
+    assert len(lines) > 1
+    assert " ".join(lines) == text
+    for line in lines:
+        assert line == line.strip()
+        assert font.measure(line)[0] <= width + 1e-6
+
+
+def test_wrap_text_newline_and_long_word(face):
+    """改行は維持し、幅を超える語は文字単位で分割する"""
+    font = bl.Font(face, 20.0)
+    assert font.wrap_text("a\n\nb", 1000) == ["a", "", "b"]
+    assert font.wrap_text("", 100) == [""]
+    lines = font.wrap_text("abcdefghijklmnop", font.measure("abcd")[0] + 0.5)
+    assert "".join(lines) == "abcdefghijklmnop"
+    assert all(len(line) <= 4 for line in lines)
+
+
+def test_wrap_text_cjk(face):
+    """CJK 文字は文字の間で折り返し、句読点を行頭に置かない"""
+    font = bl.Font(face, 20.0)
+    text = "あいうえお、かきくけこ。"
+    width = font.measure("あいうえ")[0] + 0.5
+    lines = font.wrap_text(text, width)
+    assert "".join(lines) == text
+    assert len(lines) > 1
+    for line in lines:
+        assert not line.startswith(("、", "。"))
+
+
+def test_font_manager_load_face(font_path):
+    """FontManager は同じファイルを 1 回だけ読み込み、ファミリー名で検索できる"""
+    manager = bl.FontManager()
+    face = manager.load_face(font_path)
+    assert face.family_name
+    assert manager.face_count == 1
+
+    again = manager.load_face(font_path)
+    assert again.family_name == face.family_name
+    assert manager.face_count == 1
+
+    found = manager.query_face(face.family_name, face.weight)
+    assert found is not None
+    assert found.family_name == face.family_name
+    assert manager.query_face("No Such Font Family") is None
+
+    manager.clear()
+    assert manager.face_count == 0
+    # 作成済みのフェイスはそのまま使える
+    assert bl.Font(face, 12.0).size == 12.0
+
+
+def test_font_manager_load_faces(font_path):
+    """load_faces はファイルに含まれるすべてのフェイスを返す"""
+    manager = bl.FontManager()
+    faces = manager.load_faces(font_path)
+    assert len(faces) >= 1
+    assert manager.face_count == len(faces)
+    assert len(manager.load_faces(font_path)) == len(faces)
+
+
+def test_font_manager_shared_across_threads(font_path):
+    """共有の FontManager は複数スレッドから同時に使える"""
+    manager = bl.FontManager.shared()
+    assert bl.FontManager.shared().face_count == manager.face_count
+
+    def worker(size: float) -> float:
+        face = bl.FontManager.shared().load_face(font_path)
+        return bl.Font(face, size).measure("Hello")[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        widths = list(executor.map(worker, [10.0, 20.0] * 16))
+    assert widths[0] < widths[1]
+    assert len(set(widths[0::2])) == 1
+
+
+def test_font_manager_missing_file():
+    """存在しないファイルは RuntimeError"""
+    with pytest.raises(RuntimeError):
+        bl.FontManager().load_face("/no/such/font.ttf")
+
+
+def test_font_face_create_from_data(font_path):
+    """bytes / memoryview / mmap からフォントを読み込める"""
+    expected = bl.FontFace()
+    expected.create_from_file(font_path)
+    with open(font_path, "rb") as f:
+        data = f.read()
+
+    face = bl.FontFace()
+    face.create_from_data(data)
+    assert face.family_name == expected.family_name
+    assert face.face_index == 0
+
+    view_face = bl.FontFace()
+    view_face.create_from_data(memoryview(data))
+    assert view_face.family_name == expected.family_name
+
+    with open(font_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mmap_face = bl.FontFace()
+            mmap_face.create_from_data(mm)
+            assert mmap_face.family_name == expected.family_name
+            # フォントが参照している間は mmap を閉じられない
+            with pytest.raises(BufferError):
+                mm.close()
+            del mmap_face
+            gc.collect()
+
+
+def test_font_face_create_from_data_keeps_buffer(font_path):
+    """元のバッファを解放してもフォントを使える"""
+    with open(font_path, "rb") as f:
+        data = bytearray(f.read())
+    face = bl.FontFace()
+    face.create_from_data(data)
+    del data
+    gc.collect()
+    font = bl.Font(face, 24.0)
+    assert font.measure("Hello")[0] > 0
+
+
+def test_font_face_face_index(font_path):
+    """フォントコレクションのフェイス番号を指定できる"""
+    faces = bl.FontManager().load_faces(font_path)
+    with open(font_path, "rb") as f:
+        data = f.read()
+    for i, loaded in enumerate(faces):
+        face = bl.FontFace()
+        face.create_from_data(data, face_index=i)
+        assert face.face_index == i
+        assert face.family_name == loaded.family_name
+
+        from_file = bl.FontFace()
+        from_file.create_from_file(font_path, face_index=i)
+        assert from_file.face_index == i
+
+
+def test_font_face_create_from_invalid_data():
+    """フォントではないデータは RuntimeError"""
+    face = bl.FontFace()
+    with pytest.raises(RuntimeError):
+        face.create_from_data(b"not a font")
+    with pytest.raises(TypeError):
+        face.create_from_data("not a buffer")
+
+
+def test_get_text_outlines(face):
+    """get_text_outlines のパスを塗ると fill_utf8_text とほぼ同じ結果になる"""
+    font = bl.Font(face, 32.0)
+    path = font.get_text_outlines("Hello", 10, 45)
+    assert isinstance(path, bl.Path)
+    assert path.size > 0
+
+    expected = _render(lambda ctx: ctx.fill_utf8_text(10, 45, font, "Hello"))
+    actual = _render(lambda ctx: ctx.fill_path(path))
+    diff = np.abs(expected.astype(np.int16) - actual.astype(np.int16))
+    assert expected.any()
+    assert diff.mean() < 1.0
+
+
+def test_get_text_outlines_origin(face):
+    """原点を指定するとパス全体が移動する"""
+    font = bl.Font(face, 32.0)
+    a = font.get_text_outlines("Hi").vertex_data
+    b = font.get_text_outlines("Hi", 100, 50).vertex_data
+    np.testing.assert_allclose(b - a, np.tile([100, 50], (len(a), 1)), atol=1e-9)
+
+
+def test_outline_cache(face):
+    """グリフのアウトラインはグリフごとにキャッシュする"""
+    font = bl.Font(face, 24.0)
+    assert font.outline_cache_size == 0
+    font.get_text_outlines("Hello")
+    # H, e, l, o
+    assert font.outline_cache_size == 4
+    font.get_text_outlines("hole")
+    assert font.outline_cache_size == 5
+    font.clear_outline_cache()
+    assert font.outline_cache_size == 0
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+import blend2d as bl
+
+
+def _record(ring: bl.FrameRing, r: int, g: int, b: int) -> None:
+    ctx = ring.begin_frame()
+    ctx.set_comp_op(bl.CompOp.SRC_COPY)
+    ctx.set_fill_style_rgba(r, g, b, 255)
+    ctx.fill_all()
+    ring.submit()
+
+
+def test_frame_ring_acquire_in_order():
+    """submit した順にフレームを取得できる"""
+    ring = bl.FrameRing(32, 16, count=3, thread_count=2)
+    assert ring.count == 3
+    _record(ring, 255, 0, 0)
+    _record(ring, 0, 255, 0)
+
+    first = ring.acquire()
+    assert first.shape == (16, 32, 4)
+    assert first.dtype == np.uint8
+    # BGRA
+    assert tuple(first[0, 0]) == (0, 0, 255, 255)
+
+    second = ring.acquire()
+    assert tuple(second[8, 16]) == (0, 255, 0, 255)
+
+
+def test_frame_ring_view_is_read_only():
+    """acquire したビューは読み取り専用"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=0)
+    _record(ring, 1, 2, 3)
+    frame = ring.acquire()
+    assert not frame.flags.writeable
+    with pytest.raises(ValueError):
+        frame[0, 0, 0] = 0
+
+
+def test_frame_ring_view_keeps_image():
+    """ビューはリングより長く生存できる"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=0)
+    _record(ring, 10, 20, 30)
+    frame = ring.acquire()
+    del ring
+    assert tuple(frame[0, 0]) == (30, 20, 10, 255)
+
+
+def test_frame_ring_full():
+    """空きスロットがない場合は begin_frame が RuntimeError"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=0)
+    _record(ring, 0, 0, 0)
+    _record(ring, 0, 0, 0)
+    with pytest.raises(RuntimeError):
+        ring.begin_frame()
+
+    frame = ring.acquire()
+    # ビューが残っているスロットは再利用されない
+    with pytest.raises(RuntimeError):
+        ring.begin_frame()
+
+    del frame
+    _record(ring, 0, 0, 0)
+
+
+def test_frame_ring_held_view_is_not_overwritten():
+    """保持しているビューのスロットは次のフレームで上書きされない"""
+    ring = bl.FrameRing(8, 8, count=3, thread_count=0)
+    _record(ring, 255, 0, 0)
+    first = ring.acquire()
+    # 派生したビューもスロットを保持する
+    queued = first[2:6]
+    del first
+    _record(ring, 0, 255, 0)
+    second = ring.acquire()
+    _record(ring, 0, 0, 255)
+    with pytest.raises(RuntimeError):
+        ring.begin_frame()
+    assert tuple(queued[0, 0]) == (0, 0, 255, 255)
+    assert tuple(second[0, 0]) == (0, 255, 0, 255)
+
+    del queued
+    _record(ring, 0, 0, 0)
+
+
+def test_frame_ring_state_errors():
+    """呼び出し順が正しくない場合は RuntimeError"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=0)
+    with pytest.raises(RuntimeError):
+        ring.submit()
+    with pytest.raises(RuntimeError):
+        ring.acquire()
+
+    ring.begin_frame()
+    with pytest.raises(RuntimeError):
+        ring.begin_frame()
+
+
+def test_frame_ring_submit_with_open_layer():
+    """レイヤーを合成する前の submit() は RuntimeError、合成後はレイヤーの内容を取得できる"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=2)
+    ctx = ring.begin_frame()
+    ctx.begin_layer()
+    ctx.set_fill_style_rgba(255, 0, 0)
+    ctx.fill_all()
+    with pytest.raises(RuntimeError):
+        ring.submit()
+    ctx.end_layer()
+    ring.submit()
+    assert tuple(ring.acquire()[4, 4]) == (0, 0, 255, 255)
+
+
+def test_frame_ring_reuses_images():
+    """スロットの Image は使い回され、フレームごとに generation が進む"""
+    ring = bl.FrameRing(8, 8, count=2, thread_count=0)
+    image = ring.image(0)
+    generation = image.generation
+    _record(ring, 0, 0, 0)
+    ring.acquire()
+    _record(ring, 0, 0, 0)
+    ring.acquire()
+    _record(ring, 0, 0, 0)
+    assert ring.image(0) is image
+    assert image.generation > generation
+
+
+def test_frame_ring_invalid_count():
+    """スロット数は 2 以上"""
+    with pytest.raises(ValueError):
+        bl.FrameRing(8, 8, count=1)
@@ -0,0 +1,350 @@
+import mmap
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import blend2d as bl
+
+
+def test_image_default_format():
+    """デフォルトのフォーマットは PRGB32"""
+    img = bl.Image(64, 32)
+    assert img.format == bl.Format.PRGB32
+    assert img.asarray().shape == (32, 64, 4)
+
+
+def test_image_a8():
+    """A8 フォーマットの Image は (H, W) の配列になる"""
+    img = bl.Image(64, 32, bl.Format.A8)
+    assert img.format == bl.Format.A8
+    assert img.asarray().shape == (32, 64)
+
+
+def test_image_from_buffer_ndarray():
+    """NumPy 配列に直接描画する"""
+    buf = np.zeros((100, 100, 4), dtype=np.uint8)
+    img = bl.Image.from_buffer(buf, 100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_rect(0, 0, 50, 50)
+    # BGRA
+    assert tuple(buf[10, 10]) == (0, 0, 255, 255)
+    assert tuple(buf[80, 80]) == (0, 0, 0, 0)
+
+
+def test_image_from_buffer_stride():
+    """stride を指定して大きなバッファの一部に描画する"""
+    buf = np.zeros((100, 200, 4), dtype=np.uint8)
+    img = bl.Image.from_buffer(buf, 100, 100, stride=200 * 4)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(0, 255, 0)
+        ctx.fill_all()
+    assert buf[50, 99, 1] == 255
+    assert buf[50, 100, 1] == 0
+
+
+def test_image_from_buffer_keeps_source_alive():
+    """Image が存在する間は元のバッファを保持する"""
+    img = bl.Image.from_buffer(bytearray(16 * 16 * 4), 16, 16)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.fill_all()
+    assert img.asarray()[8, 8, 0] == 255
+
+
+def test_image_from_buffer_shared_memory():
+    """共有メモリに直接描画する"""
+    shm = shared_memory.SharedMemory(create=True, size=64 * 64 * 4)
+    try:
+        img = bl.Image.from_buffer(shm.buf, 64, 64)
+        with bl.Context(img) as ctx:
+            ctx.set_fill_style_rgba(255, 255, 255)
+            ctx.fill_all()
+        del img
+        view = np.ndarray((64, 64, 4), dtype=np.uint8, buffer=shm.buf)
+        assert view[32, 32, 3] == 255
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_image_from_buffer_mmap():
+    """mmap に直接描画する"""
+    mm = mmap.mmap(-1, 32 * 32 * 4)
+    img = bl.Image.from_buffer(mm, 32, 32)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_all()
+    del img
+    assert mm[3] == 255
+    mm.close()
+
+
+def test_image_from_buffer_too_small():
+    """バッファが小さい場合は ValueError"""
+    with pytest.raises(ValueError):
+        bl.Image.from_buffer(bytearray(10), 16, 16)
+
+
+def test_image_from_buffer_readonly():
+    """書き込みできないバッファは BufferError"""
+    with pytest.raises(BufferError):
+        bl.Image.from_buffer(bytes(16 * 16 * 4), 16, 16)
+
+
+def test_asarray_keeps_image_alive():
+    """asarray() のビューが残っている間は Image が解放されない"""
+    img = bl.Image(32, 32)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_all()
+    arr = img.asarray()
+    del img
+    assert arr[16, 16, 2] == 255
+
+
+def test_memoryview_keeps_image_alive():
+    """memoryview() が残っている間は Image が解放されない"""
+    img = bl.Image(32, 32)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_all()
+    mv = img.memoryview()
+    del img
+    assert len(mv) >= 32 * 32 * 4
+    assert mv[3] == 255
+
+
+def test_image_buffer_protocol():
+    """Image はバッファプロトコルに対応する"""
+    img = bl.Image(16, 16)
+    mv = memoryview(img)
+    assert mv.nbytes >= 16 * 16 * 4
+    assert not mv.readonly
+
+
+def test_memoryview_padded_stride_from_buffer():
+    """最終行の stride の余白を含まないバッファでも memoryview はバッファの範囲に収まる"""
+    # stride 48, 行のバイト数 32 (8 ピクセル), 最終行は 32 バイトのみ
+    buf = bytearray(48 * 3 + 32)
+    img = bl.Image.from_buffer(buf, 8, 4, stride=48)
+    mv = memoryview(img)
+    assert mv.nbytes == len(buf)
+    assert img.memoryview().nbytes == len(buf)
+    mv[-1] = 255
+    assert buf[-1] == 255
+
+
+def test_image_generation_and_is_rendering():
+    """描画開始ごとに generation が増え、描画中は is_rendering が True"""
+    img = bl.Image(32, 32)
+    assert img.generation == 0
+    assert not img.is_rendering
+
+    ctx = bl.Context(img)
+    assert img.generation == 1
+    assert img.is_rendering
+    ctx.end()
+    assert not img.is_rendering
+
+    generation = img.generation
+    _ = img.asarray()
+    with bl.Context(img):
+        pass
+    # ビュー取得後に再描画されたことを検出できる
+    assert img.generation != generation
+
+
+def _filled_image(w, h, r, g, b, a=255):
+    img = bl.Image(w, h)
+    with bl.Context(img) as ctx:
+        ctx.set_comp_op(bl.CompOp.SRC_COPY)
+        ctx.set_fill_style_rgba(r, g, b, a)
+        ctx.fill_all()
+    return img
+
+
+def test_convert_to_rgba32_unpremultiplies():
+    """RGBA32 への変換で乗算済みアルファを戻す"""
+    img = _filled_image(8, 4, 255, 0, 0, 128)
+    dst = np.empty((4, 8, 4), dtype=np.uint8)
+    img.convert_to(dst, bl.PixelFormat.RGBA32)
+    r, g, b, a = (int(v) for v in dst[2, 3])
+    assert a == 128
+    assert abs(r - 255) <= 2
+    assert g == 0 and b == 0
+
+
+def test_convert_to_bgr24_and_rgb24():
+    """BGR24 / RGB24 への変換"""
+    img = _filled_image(8, 4, 10, 20, 30)
+    bgr = np.empty((4, 8, 3), dtype=np.uint8)
+    rgb = np.empty((4, 8, 3), dtype=np.uint8)
+    img.convert_to(bgr, bl.PixelFormat.BGR24)
+    img.convert_to(rgb, bl.PixelFormat.RGB24)
+    assert tuple(bgr[0, 0]) == (30, 20, 10)
+    assert tuple(rgb[0, 0]) == (10, 20, 30)
+
+
+def test_convert_to_after_flush_while_rendering():
+    """描画中の Image も Context.flush() 後は描画済みのピクセルを読み出せる"""
+    img = bl.Image(64, 64)
+    with bl.Context(img, thread_count=2) as ctx:
+        ctx.set_fill_style_rgba(10, 20, 30)
+        ctx.fill_all()
+        ctx.flush()
+        assert img.is_rendering
+        bgr = np.empty((64, 64, 3), dtype=np.uint8)
+        img.convert_to(bgr, bl.PixelFormat.BGR24)
+        y = np.empty((64, 64), dtype=np.uint8)
+        uv = np.empty((32, 64), dtype=np.uint8)
+        img.to_nv12(y, uv)
+        view = memoryview(img)
+    assert (bgr == (30, 20, 10)).all()
+    assert (y == y[0, 0]).all()
+    assert view[:4].tolist() == [30, 20, 10, 255]
+
+
+def test_convert_to_shape_mismatch():
+    """変換先の形状が異なる場合は ValueError"""
+    img = bl.Image(8, 4)
+    with pytest.raises(ValueError):
+        img.convert_to(np.empty((4, 8, 4), dtype=np.uint8), bl.PixelFormat.BGR24)
+
+
+def test_to_i420():
+    """I420 への変換 (白は Y=235, U=V=128)"""
+    img = _filled_image(16, 8, 255, 255, 255)
+    y = np.empty((8, 16), dtype=np.uint8)
+    u = np.empty((4, 8), dtype=np.uint8)
+    v = np.empty((4, 8), dtype=np.uint8)
+    img.to_i420(y, u, v)
+    assert np.all(y == 235)
+    assert np.all(u == 128)
+    assert np.all(v == 128)
+
+
+def test_to_i420_odd_size():
+    """幅 / 高さが奇数の場合はクロマプレーンを切り上げる"""
+    img = _filled_image(5, 3, 0, 0, 0)
+    y = np.empty((3, 5), dtype=np.uint8)
+    u = np.empty((2, 3), dtype=np.uint8)
+    v = np.empty((2, 3), dtype=np.uint8)
+    img.to_i420(y, u, v, bl.YuvMatrix.BT709)
+    assert np.all(y == 16)
+
+
+def test_to_nv12():
+    """NV12 への変換"""
+    img = _filled_image(16, 8, 255, 0, 0)
+    y = np.empty((8, 16), dtype=np.uint8)
+    uv = np.empty((4, 16), dtype=np.uint8)
+    img.to_nv12(y, uv)
+    i420_y = np.empty_like(y)
+    u = np.empty((4, 8), dtype=np.uint8)
+    v = np.empty((4, 8), dtype=np.uint8)
+    img.to_i420(i420_y, u, v)
+    np.testing.assert_array_equal(y, i420_y)
+    np.testing.assert_array_equal(uv[:, 0::2], u)
+    np.testing.assert_array_equal(uv[:, 1::2], v)
+
+
+@pytest.mark.parametrize("filter", list(bl.ScaleFilter))
+def test_scale_solid_color(filter):
+    """単色の画像はどのフィルタで拡大縮小しても同じ色になる"""
+    src = _filled_image(64, 36, 200, 100, 50)
+    for w, h in [(32, 18), (128, 72), (7, 5)]:
+        dst = bl.Image(w, h)
+        src.scale(dst, filter)
+        arr = dst.asarray()
+        assert np.all(np.abs(arr.astype(int) - [50, 100, 200, 255]) <= 1)
+
+
+def test_scale_nearest_exact():
+    """NEAREST の 2 倍拡大は画素を複製する"""
+    src = bl.Image(2, 1)
+    a = src.asarray()
+    a[0, 0] = (255, 0, 0, 255)
+    a[0, 1] = (0, 0, 255, 255)
+    dst = bl.Image(4, 2)
+    src.scale(dst, bl.ScaleFilter.NEAREST)
+    arr = dst.asarray()
+    assert tuple(arr[0, 0]) == tuple(arr[1, 1]) == (255, 0, 0, 255)
+    assert tuple(arr[0, 3]) == tuple(arr[1, 2]) == (0, 0, 255, 255)
+
+
+def test_scale_keeps_premultiplied():
+    """LANCZOS のオーバーシュートでも色がアルファを超えない"""
+    src = bl.Image(16, 16)
+    arr = src.asarray()
+    arr[:, ::2] = (255, 255, 255, 255)
+    dst = bl.Image(37, 37)
+    src.scale(dst, bl.ScaleFilter.LANCZOS)
+    out = dst.asarray()
+    assert np.all(out[..., :3] <= out[..., 3:4])
+
+
+def test_scaler_reuse():
+    """Scaler は同じサイズの拡大縮小を繰り返せ、Image.scale と同じ結果になる"""
+    scaler = bl.Scaler(64, 36, 32, 18, bl.ScaleFilter.BICUBIC)
+    assert (scaler.src_width, scaler.src_height) == (64, 36)
+    assert (scaler.dst_width, scaler.dst_height) == (32, 18)
+    assert scaler.filter == bl.ScaleFilter.BICUBIC
+
+    src = bl.Image(64, 36)
+    src.asarray()[:] = np.random.default_rng(0).integers(0, 256, (36, 64, 4), dtype=np.uint8)
+    # 乗算済みアルファとして正しい値にする
+    src.asarray()[..., 3] = 255
+    expected = bl.Image(32, 18)
+    src.scale(expected, bl.ScaleFilter.BICUBIC)
+    dst = bl.Image(32, 18)
+    for _ in range(3):
+        scaler.scale(src, dst)
+        np.testing.assert_array_equal(dst.asarray(), expected.asarray())
+
+
+def test_scale_into_attached_image():
+    """Context が描画中の Image には拡大縮小できない"""
+    src = bl.Image(8, 8)
+    dst = bl.Image(4, 4)
+    with bl.Context(dst):
+        with pytest.raises(RuntimeError):
+            src.scale(dst)
+    src.scale(dst)
+
+
+def test_scale_does_not_change_shared_pattern():
+    """dst を参照する Pattern の画素は拡大縮小で書き換わらない"""
+    dst = bl.Image(4, 4)
+    pattern = bl.Pattern()
+    pattern.create(dst)
+    src = bl.Image(8, 8)
+    with bl.Context(src) as ctx:
+        ctx.set_fill_style_rgba(255, 0, 0)
+        ctx.fill_all()
+    src.scale(dst)
+    assert tuple(dst.asarray()[0, 0]) == (0, 0, 255, 255)
+
+    img = bl.Image(4, 4)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_pattern(pattern)
+        ctx.fill_all()
+    assert tuple(img.asarray()[0, 0]) == (0, 0, 0, 0)
+
+
+def test_scale_errors():
+    """サイズ / フォーマットが一致しない場合は ValueError"""
+    scaler = bl.Scaler(8, 8, 4, 4)
+    with pytest.raises(ValueError):
+        scaler.scale(bl.Image(4, 4), bl.Image(4, 4))
+    with pytest.raises(ValueError):
+        scaler.scale(bl.Image(8, 8), bl.Image(8, 8))
+    with pytest.raises(ValueError):
+        scaler.scale(bl.Image(8, 8), bl.Image(4, 4, bl.Format.A8))
+    img = bl.Image(8, 8)
+    with pytest.raises(ValueError):
+        img.scale(img)
+    with pytest.raises(ValueError):
+        bl.Scaler(0, 8, 4, 4)
@@ -1,4 +1,8 @@
 import math
+import pickle
+
+import numpy as np
+import pytest
 
 import blend2d as bl
 
@@ -79,3 +83,263 @@ def test_path_elliptic_arc_to():
         path.elliptic_arc_to(20, 10, 0, True, True, 70, 50)
         ctx.set_fill_style_rgba(0, 255, 255)
         ctx.fill_path(path)
+
+
+def test_path_add_polyline():
+    """NumPy 配列からポリラインを追加"""
+    points = np.array([[10, 10], [90, 10], [90, 90]], dtype=np.float64)
+    path = bl.Path()
+    path.add_polyline(points)
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_stroke_style_rgba(255, 0, 0)
+        ctx.set_stroke_width(4)
+        ctx.stroke_path(path)
+    assert img.asarray()[10, 50, 2] > 0
+
+
+def test_path_add_polygon():
+    """NumPy 配列から多角形を追加"""
+    points = np.array([[10, 10], [90, 10], [90, 90], [10, 90]], dtype=np.float64)
+    path = bl.Path()
+    path.add_polygon(points)
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(0, 255, 0)
+        ctx.fill_path(path)
+    assert img.asarray()[50, 50, 1] == 255
+
+
+def test_path_from_arrays():
+    """コマンド配列と頂点配列からパスを作成"""
+    commands = np.array(
+        [bl.PathCmd.MOVE, bl.PathCmd.ON, bl.PathCmd.ON, bl.PathCmd.CLOSE], dtype=np.uint8
+    )
+    vertices = np.array([[10, 10], [90, 10], [50, 90], [0, 0]], dtype=np.float64)
+    path = bl.Path.from_arrays(commands, vertices)
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(0, 0, 255)
+        ctx.fill_path(path)
+    assert img.asarray()[30, 50, 0] == 255
+
+
+def test_path_from_arrays_length_mismatch():
+    """コマンド配列と頂点配列の長さが異なる場合は ValueError"""
+    commands = np.zeros(3, dtype=np.uint8)
+    vertices = np.zeros((2, 2), dtype=np.float64)
+    with pytest.raises(ValueError):
+        bl.Path.from_arrays(commands, vertices)
+
+
+def test_path_from_arrays_invalid_command():
+    """不正なコマンドは ValueError"""
+    commands = np.array([0, 255], dtype=np.uint8)
+    vertices = np.zeros((2, 2), dtype=np.float64)
+    with pytest.raises(ValueError):
+        bl.Path.from_arrays(commands, vertices)
+
+
+@pytest.mark.parametrize(
+    ("commands", "index"),
+    [
+        ([bl.PathCmd.ON, bl.PathCmd.ON], 0),
+        ([bl.PathCmd.MOVE, bl.PathCmd.QUAD, bl.PathCmd.CLOSE], 1),
+        ([bl.PathCmd.MOVE, bl.PathCmd.CUBIC, bl.PathCmd.ON], 1),
+        ([bl.PathCmd.MOVE, bl.PathCmd.CUBIC, bl.PathCmd.CUBIC], 1),
+        ([bl.PathCmd.MOVE, bl.PathCmd.CONIC, bl.PathCmd.ON, bl.PathCmd.ON], 1),
+        ([bl.PathCmd.MOVE, bl.PathCmd.WEIGHT, bl.PathCmd.ON], 1),
+    ],
+)
+def test_path_from_arrays_invalid_sequence(commands, index):
+    """コマンドの並びが不正な場合は位置を含む ValueError"""
+    vertices = np.zeros((len(commands), 2), dtype=np.float64)
+    with pytest.raises(ValueError, match=f"index {index} "):
+        bl.Path.from_arrays(np.array(commands, dtype=np.uint8), vertices)
+
+
+def test_path_from_arrays_curves():
+    """曲線を含むパスのコマンドと頂点をそのまま復元できる"""
+    path = bl.Path()
+    path.move_to(0, 0)
+    path.quad_to(10, 0, 10, 10)
+    path.cubic_to(10, 20, 0, 20, 0, 10)
+    path.close()
+    copy = bl.Path.from_arrays(path.command_data(), path.vertex_data())
+    assert copy.command_data().tolist() == path.command_data().tolist()
+
+
+def test_path_data_views():
+    """コマンド / 頂点を NumPy ビューとして取得"""
+    path = bl.Path()
+    path.move_to(10, 20)
+    path.line_to(30, 40)
+    path.close()
+    assert path.size == 3
+    assert len(path) == 3
+
+    commands = path.command_data()
+    vertices = path.vertex_data()
+    assert commands.dtype == np.uint8
+    assert commands.shape == (3,)
+    assert list(commands) == [bl.PathCmd.MOVE, bl.PathCmd.ON, bl.PathCmd.CLOSE]
+    assert vertices.dtype == np.float64
+    assert vertices.shape == (3, 2)
+    assert tuple(vertices[1]) == (30, 40)
+    assert not vertices.flags.writeable
+
+
+def test_path_data_views_snapshot():
+    """ビュー取得後に Path を変更してもビューの内容は変わらない"""
+    path = bl.Path()
+    path.move_to(10, 20)
+    vertices = path.vertex_data()
+    path.line_to(30, 40)
+    assert vertices.shape == (1, 2)
+    assert tuple(vertices[0]) == (10, 20)
+    del path
+    assert tuple(vertices[0]) == (10, 20)
+
+
+def test_path_init_from_arrays():
+    """コマンド配列と頂点配列を Path のコンストラクタに渡す"""
+    src = bl.Path()
+    src.move_to(0, 0)
+    src.cubic_to(10, 0, 20, 10, 20, 20)
+    path = bl.Path(src.command_data(), src.vertex_data())
+    np.testing.assert_array_equal(path.command_data(), src.command_data())
+    np.testing.assert_array_equal(path.vertex_data(), src.vertex_data())
+
+
+def test_path_pickle():
+    """Path を pickle で保存して復元"""
+    path = bl.Path()
+    path.move_to(10, 10)
+    path.quad_to(50, 0, 90, 10)
+    path.close()
+    restored = pickle.loads(pickle.dumps(path))
+    np.testing.assert_array_equal(restored.command_data(), path.command_data())
+    np.testing.assert_array_equal(restored.vertex_data(), path.vertex_data())
+
+
+def test_stroke_options():
+    """StrokeOptions の設定と検証"""
+    options = bl.StrokeOptions(width=4, join=bl.StrokeJoin.ROUND, dash_array=[10, 5])
+    assert options.width == 4
+    assert options.join == bl.StrokeJoin.ROUND
+    assert options.start_cap == bl.StrokeCap.BUTT
+    assert options.miter_limit == 4.0
+    assert options.dash_array == [10, 5]
+    options.set_caps(bl.StrokeCap.ROUND)
+    assert options.start_cap == bl.StrokeCap.ROUND
+    assert options.end_cap == bl.StrokeCap.ROUND
+    options.dash_array = []
+    assert options.dash_array == []
+    with pytest.raises(ValueError):
+        options.width = -1
+    with pytest.raises(ValueError):
+        options.dash_array = [5, -1]
+    with pytest.raises(ValueError):
+        bl.StrokeOptions(dash_array=[0, 0])
+    with pytest.raises(ValueError):
+        options.miter_limit = float("nan")
+    with pytest.raises(ValueError):
+        bl.StrokeOptions(dash_offset=float("inf"))
+
+
+def test_stroke_options_numpy_dash_array():
+    """dash_array に NumPy 配列を指定できる"""
+    options = bl.StrokeOptions(dash_array=np.array([6.0, 3.0, 1.0, 3.0]))
+    assert options.dash_array == [6, 3, 1, 3]
+    options.dash_array = np.arange(1.0, 3.0)
+    assert options.dash_array == [1, 2]
+    with pytest.raises(ValueError):
+        options.dash_array = np.array([1.0, -1.0])
+
+
+def test_add_stroked_path():
+    """add_stroked_path の輪郭を fill_path すると stroke_path と同じ範囲が塗られる"""
+    line = bl.Path()
+    line.move_to(10, 50)
+    line.line_to(90, 50)
+
+    outline = bl.Path()
+    outline.add_stroked_path(line, bl.StrokeOptions(width=10))
+    assert outline.size > 0
+    assert line.size == 2
+
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_path(outline)
+    arr = img.asarray()
+    assert arr[50, 50, 3] == 255
+    assert arr[47, 20, 3] == 255
+    assert arr[40, 50, 3] == 0
+    assert arr[50, 5, 3] == 0
+
+
+def test_add_stroked_path_dashed():
+    """dash_array を指定すると隙間の部分は塗られない"""
+    line = bl.Path()
+    line.move_to(0, 50)
+    line.line_to(100, 50)
+
+    outline = bl.Path()
+    outline.add_stroked_path(line, bl.StrokeOptions(width=10, dash_array=[20, 10]))
+
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_path(outline)
+    row = img.asarray()[50, :, 3]
+    # 線: 0-20, 30-50, 60-80, 90-100
+    assert row[10] == 255
+    assert row[25] == 0
+    assert row[40] == 255
+    assert row[55] == 0
+    assert row[95] == 255
+
+
+def test_add_stroked_path_dash_offset():
+    """dash_offset でパターンの開始位置をずらす"""
+    line = bl.Path()
+    line.move_to(0, 50)
+    line.line_to(100, 50)
+
+    outline = bl.Path()
+    outline.add_stroked_path(line, bl.StrokeOptions(width=10, dash_array=[20], dash_offset=10))
+
+    img = bl.Image(100, 100)
+    with bl.Context(img) as ctx:
+        ctx.set_fill_style_rgba(255, 255, 255)
+        ctx.fill_path(outline)
+    row = img.asarray()[50, :, 3]
+    # 奇数個のパターンは [20, 20] として扱う。線: 0-10, 30-50, 70-90
+    assert row[5] == 255
+    assert row[20] == 0
+    assert row[40] == 255
+    assert row[60] == 0
+    assert row[80] == 255
+
+
+def test_add_stroked_path_dashed_curve():
+    """曲線も破線化できる"""
+    circle = bl.Path()
+    circle.arc_to(50, 50, 40, 40, 0, 2 * math.pi, True)
+    circle.close()
+
+    solid = bl.Path()
+    solid.add_stroked_path(circle, bl.StrokeOptions(width=4))
+    dashed = bl.Path()
+    dashed.add_stroked_path(circle, bl.StrokeOptions(width=4, dash_array=[5, 5]))
+
+    def coverage(path: bl.Path) -> int:
+        img = bl.Image(100, 100)
+        with bl.Context(img) as ctx:
+            ctx.set_fill_style_rgba(255, 255, 255)
+            ctx.fill_path(path)
+        return int(img.asarray()[:, :, 3].astype(np.int64).sum())
+
+    ratio = coverage(dashed) / coverage(solid)
+    assert 0.4 < ratio < 0.6